@@ -0,0 +1,467 @@
+"""
+Dag build benchmarks.
+Times the config load, the movements setup and CompositionBase.build/build_multi_dag
+of synthetic compositions, comparing the results against the stored baselines.
+
+    python -m benchmarks.dag_build
+    python -m benchmarks.dag_build --sizes 10 100 --pipelines reverse_etl
+    python -m benchmarks.dag_build --update-baselines
+
+Every stage is timed with the garbage collector paused, after a full collection,
+and the median of the repeated runs is kept. The table definitions registry is
+cleared before each run, so config_load always parses the files.
+A fixed pure python reference workload is timed in the same run and stored with
+the baselines, the baselines are scaled by how much slower or faster it ran here,
+so a machine slower than the one that recorded them does not fail the comparison.
+Exits with status 1 if any measurement is slower than its scaled baseline by more
+than the tolerance.
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import inject
+
+from benchmarks.synthetic import PIPELINES, load_config, write_composition
+from debussy_concert.core.config.config_composition import ConfigComposition
+from debussy_concert.core.service.tables.registry import bigquery_table_registry
+from debussy_concert.core.service.workflow.protocol import PWorkflowService
+
+DEFAULT_SIZES = [10, 100, 1000, 5000]
+DEFAULT_BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+DEFAULT_TOLERANCE = 0.5
+# regressions smaller than this are timer noise, whatever the relative change
+MIN_REGRESSION_SECONDS = 0.01
+STAGES = ["config_load", "setup", "build", "build_multi_dag"]
+
+
+def airflow_available():
+    return importlib.util.find_spec("airflow") is not None
+
+
+def testing_workflow_service():
+    from tests.resource.workflow_for_testing import WorkflowServiceForTesting
+
+    return WorkflowServiceForTesting()
+
+
+def airflow_workflow_service():
+    from debussy_concert.core.service.workflow.airflow import AirflowService
+
+    # hooks log (and warn about) every connection lookup
+    logging.getLogger("airflow").setLevel(logging.ERROR)
+    return AirflowService()
+
+
+WORKFLOW_SERVICES: Dict[str, Callable[[], PWorkflowService]] = {
+    "testing": testing_workflow_service,
+    "airflow": airflow_workflow_service,
+}
+
+
+# movement builders for the testing workflow service: the pipeline movements
+# with dummy phrases, so only the framework overhead is measured
+def dummy_ingestion_movement_builder(composition):
+    from debussy_concert.pipeline.data_ingestion.movement.data_ingestion import (
+        DataIngestionMovement,
+    )
+    from tests.resource.core_for_testing import create_empty_phrase
+
+    def builder(movement_parameters):
+        movement = DataIngestionMovement(
+            name=f"DataIngestionMovement_{movement_parameters.name}",
+            start_phrase=create_empty_phrase("start_phrase"),
+            create_or_update_table_phrase=create_empty_phrase(
+                "create_or_update_table_phrase"
+            ),
+            ingestion_source_to_raw_vault_storage_phrase=create_empty_phrase(
+                "ingestion_source_to_raw_vault_storage_phrase"
+            ),
+            raw_vault_storage_to_data_warehouse_raw_phrase=create_empty_phrase(
+                "raw_vault_storage_to_data_warehouse_raw_phrase"
+            ),
+            end_phrase=create_empty_phrase("end_phrase"),
+        )
+        return movement.setup(movement_parameters)
+
+    return builder
+
+
+def dummy_reverse_etl_movement_builder(composition):
+    from debussy_concert.pipeline.reverse_etl.movement.reverse_etl import (
+        ReverseEtlMovement,
+    )
+    from tests.resource.core_for_testing import create_empty_phrase
+
+    def builder(movement_parameters):
+        movement = ReverseEtlMovement(
+            name=f"ReverseEtlMovement_{movement_parameters.name}",
+            start_phrase=create_empty_phrase("start_phrase"),
+            data_warehouse_to_reverse_etl_phrase=create_empty_phrase(
+                "data_warehouse_to_reverse_etl_phrase"
+            ),
+            data_warehouse_reverse_etl_to_storage_phrase=create_empty_phrase(
+                "data_warehouse_reverse_etl_to_storage_phrase"
+            ),
+            storage_to_destination_phrase=create_empty_phrase(
+                "storage_to_destination_phrase"
+            ),
+            end_phrase=create_empty_phrase("end_phrase"),
+        )
+        return movement.setup(movement_parameters)
+
+    return builder
+
+
+def dummy_transformation_movement_builder(composition):
+    from debussy_concert.pipeline.data_transformation.movement.transform import (
+        TransformationMovement,
+    )
+    from tests.resource.core_for_testing import create_empty_phrase
+
+    def builder(movement_parameters):
+        movement = TransformationMovement(
+            name=f"TransformationMovement_{movement_parameters.name}",
+            start_phrase=create_empty_phrase("start_phrase"),
+            data_warehouse_transformation_phrase=create_empty_phrase(
+                "data_warehouse_transformation_phrase"
+            ),
+            end_phrase=create_empty_phrase("end_phrase"),
+        )
+        return movement.setup()
+
+    return builder
+
+
+def base_composition():
+    from debussy_concert.core.composition.composition_base import CompositionBase
+
+    return CompositionBase()
+
+
+# real compositions and movement builders, used with the airflow workflow service
+def rdbms_ingestion_composition():
+    from debussy_concert.pipeline.data_ingestion.composition.rdbms_ingestion import (
+        RdbmsIngestionComposition,
+    )
+
+    return RdbmsIngestionComposition()
+
+
+def bigquery_ingestion_composition():
+    from debussy_concert.pipeline.data_ingestion.composition.bigquery_ingestion import (
+        BigQueryIngestionComposition,
+    )
+
+    return BigQueryIngestionComposition()
+
+
+def reverse_etl_composition():
+    from debussy_concert.pipeline.reverse_etl.composition.bigquery_to_storage import (
+        ReverseEtlBigQueryToStorageComposition,
+    )
+
+    return ReverseEtlBigQueryToStorageComposition()
+
+
+def dbt_transformation_composition():
+    from debussy_concert.pipeline.data_transformation.composition.dbt_transformation import (
+        DbtTransformationComposition,
+    )
+
+    return DbtTransformationComposition()
+
+
+def named_dbt_transformation_builder(composition):
+    # the dbt movements are not named after their parameters, so two of them
+    # collide on the same airflow dag
+    def builder(movement_parameters):
+        movement = composition.dbt_transformation_builder(movement_parameters)
+        movement.name = f"TransformationMovement_{movement_parameters.name}"
+        return movement
+
+    return builder
+
+
+# (composition factory, movement builder factory) for each workflow service and pipeline
+COMPOSITIONS = {
+    "testing": {
+        "rdbms_ingestion": (base_composition, dummy_ingestion_movement_builder),
+        "bigquery_ingestion": (base_composition, dummy_ingestion_movement_builder),
+        "reverse_etl": (base_composition, dummy_reverse_etl_movement_builder),
+        "dbt_transformation": (base_composition, dummy_transformation_movement_builder),
+    },
+    "airflow": {
+        "rdbms_ingestion": (
+            rdbms_ingestion_composition,
+            lambda composition: composition.rdbms_builder_fn(),
+        ),
+        "bigquery_ingestion": (
+            bigquery_ingestion_composition,
+            lambda composition: composition.bigquery_ingestion_movement_builder,
+        ),
+        "reverse_etl": (
+            reverse_etl_composition,
+            lambda composition: composition.bigquery_to_storage_reverse_etl_movement_builder,
+        ),
+        "dbt_transformation": (
+            dbt_transformation_composition,
+            named_dbt_transformation_builder,
+        ),
+    },
+}
+
+
+def reference_workload():
+    # object, dict and string churn, as building the tasks and their dependencies
+    nodes = {}
+    for index in range(20000):
+        node = {"task_id": f"movement_{index}.phrase.motif", "upstream": set()}
+        if index:
+            node["upstream"].add(nodes[f"movement_{index - 1}.phrase.motif"]["task_id"])
+        nodes[node["task_id"]] = node
+    return json.loads(json.dumps(sorted(nodes, reverse=True)))
+
+
+def run_reference(repeat):
+    return statistics.median(timed(reference_workload)[1] for _ in range(repeat))
+
+
+def timed(fn, *args, **kwargs):
+    # collections triggered by earlier stages would be charged to this one
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        return result, time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def prebuilt(movements):
+    # hands the already set up movements to the composition build, in order
+    movements = iter(movements)
+    return lambda movement_parameters: next(movements)
+
+
+def inject_dependencies(workflow_service, config):
+    def inject_fn(binder: inject.Binder):
+        binder.bind(PWorkflowService, workflow_service)
+        binder.bind(ConfigComposition, config)
+
+    inject.clear_and_configure(inject_fn, bind_in_runtime=False)
+
+
+def run_once(workflow_service_name, pipeline, composition_file, env_file):
+    timings = {}
+    # a warm registry would skip the table definition files of the previous run
+    bigquery_table_registry.clear()
+    config, timings["config_load"] = timed(
+        load_config, pipeline, composition_file, env_file
+    )
+    inject_dependencies(WORKFLOW_SERVICES[workflow_service_name](), config)
+    composition_factory, builder_factory = COMPOSITIONS[workflow_service_name][pipeline]
+    composition = composition_factory()
+    movement_builder = builder_factory(composition)
+
+    def setup_movements():
+        return [
+            movement_builder(movement_parameters)
+            for movement_parameters in config.movements_parameters
+        ]
+
+    movements, timings["setup"] = timed(setup_movements)
+    _, timings["build"] = timed(composition.build, prebuilt(movements))
+    # movements are built once, build_multi_dag gets a fresh set
+    _, timings["build_multi_dag"] = timed(
+        composition.build_multi_dag, prebuilt(setup_movements())
+    )
+    inject.clear()
+    return timings
+
+
+def run_benchmark(workflow_service_name, pipeline, size, repeat, work_dir):
+    directory = os.path.join(work_dir, f"{pipeline}_{size}")
+    composition_file, env_file = write_composition(pipeline, directory, size)
+    runs = [
+        run_once(workflow_service_name, pipeline, composition_file, env_file)
+        for _ in range(repeat)
+    ]
+    return {stage: statistics.median(run[stage] for run in runs) for stage in STAGES}
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {"tolerance": DEFAULT_TOLERANCE, "results": {}}
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_baselines(path, baselines):
+    for pipelines in baselines["results"].values():
+        for sizes in pipelines.values():
+            for timings in sizes.values():
+                for stage, seconds in timings.items():
+                    timings[stage] = round(seconds, 6)
+    with open(path, "w") as file:
+        json.dump(baselines, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def machine_scale(baselines, reference):
+    """How many times slower than the baselines machine this one runs the reference"""
+    if not baselines.get("reference"):
+        return 1.0
+    return reference / baselines["reference"]
+
+
+def compare(results, baselines, tolerance, scale=1.0) -> List[str]:
+    regressions = []
+    baseline_results = baselines.get("results", {})
+    for workflow_service_name, pipelines in results.items():
+        for pipeline, sizes in pipelines.items():
+            for size, timings in sizes.items():
+                baseline = (
+                    baseline_results.get(workflow_service_name, {})
+                    .get(pipeline, {})
+                    .get(size, {})
+                )
+                for stage, seconds in timings.items():
+                    if stage not in baseline:
+                        continue
+                    expected = baseline[stage] * scale
+                    limit = expected * (1 + tolerance)
+                    if seconds > limit and seconds - expected > MIN_REGRESSION_SECONDS:
+                        regressions.append(
+                            f"{workflow_service_name}/{pipeline}/{size}/{stage}: "
+                            f"{seconds:.4f}s > {expected:.4f}s scaled baseline "
+                            f"(+{tolerance:.0%} tolerance)"
+                        )
+    return regressions
+
+
+def merge_results(baselines, results):
+    baseline_results = baselines.setdefault("results", {})
+    for workflow_service_name, pipelines in results.items():
+        for pipeline, sizes in pipelines.items():
+            baseline_results.setdefault(workflow_service_name, {}).setdefault(
+                pipeline, {}
+            ).update(sizes)
+    return baselines
+
+
+def print_row(workflow_service_name, pipeline, size, timings, baseline, scale):
+    cells = []
+    for stage in STAGES:
+        cell = f"{stage}={timings[stage]:.4f}s"
+        if stage in baseline:
+            cell += f" ({timings[stage] / (baseline[stage] * scale):.2f}x)"
+        cells.append(cell)
+    print(f"{workflow_service_name:8} {pipeline:20} {size:>5}  " + "  ".join(cells))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--pipelines", nargs="+", choices=sorted(PIPELINES), default=sorted(PIPELINES)
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--workflow-services",
+        nargs="+",
+        choices=sorted(WORKFLOW_SERVICES),
+        default=None,
+        help="defaults to testing, plus airflow when it is installed",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--reference-repeat",
+        type=int,
+        default=15,
+        help="runs of the reference workload, the median is kept",
+    )
+    parser.add_argument("--baselines", default=DEFAULT_BASELINES_PATH)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=None,
+        help="allowed relative slowdown, defaults to the one stored with the baselines",
+    )
+    parser.add_argument(
+        "--update-baselines",
+        action="store_true",
+        help="store the results as the new baselines instead of comparing",
+    )
+    parser.add_argument("--output", help="also write the results as json to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workflow_service_names = args.workflow_services
+    if workflow_service_names is None:
+        workflow_service_names = ["testing"]
+        if airflow_available():
+            workflow_service_names.append("airflow")
+
+    baselines = load_baselines(args.baselines)
+    tolerance = args.tolerance
+    if tolerance is None:
+        tolerance = baselines.get("tolerance", DEFAULT_TOLERANCE)
+
+    reference = run_reference(args.reference_repeat)
+    scale = machine_scale(baselines, reference)
+    print(f"Reference workload: {reference:.4f}s ({scale:.2f}x the baselines machine)")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="debussy_benchmark_") as work_dir:
+        for workflow_service_name in workflow_service_names:
+            for pipeline in args.pipelines:
+                for size in sorted(args.sizes):
+                    timings = run_benchmark(
+                        workflow_service_name, pipeline, size, args.repeat, work_dir
+                    )
+                    results.setdefault(workflow_service_name, {}).setdefault(
+                        pipeline, {}
+                    )[str(size)] = timings
+                    baseline = (
+                        baselines.get("results", {})
+                        .get(workflow_service_name, {})
+                        .get(pipeline, {})
+                        .get(str(size), {})
+                    )
+                    print_row(
+                        workflow_service_name, pipeline, size, timings, baseline, scale
+                    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    if args.update_baselines:
+        baselines["tolerance"] = tolerance
+        baselines["reference"] = round(reference, 6)
+        save_baselines(args.baselines, merge_results(baselines, results))
+        print(f"Baselines updated: {args.baselines}")
+        return 0
+
+    regressions = compare(results, baselines, tolerance, scale)
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Synthetic compositions used by the dag build benchmarks.
+Every writer creates the composition yaml (and its table definitions, when the
+pipeline needs them) with `size` movements inside `directory`
+"""
+import os
+from typing import Callable, Dict, NamedTuple, Type
+
+import yaml
+
+from debussy_concert.core.config.config_composition import ConfigComposition
+from debussy_concert.pipeline.data_ingestion.config.bigquery_data_ingestion import (
+    ConfigBigQueryDataIngestion,
+)
+from debussy_concert.pipeline.data_ingestion.config.rdbms_data_ingestion import (
+    ConfigRdbmsDataIngestion,
+)
+from debussy_concert.pipeline.data_transformation.config.transform import (
+    ConfigTransformComposition,
+)
+from debussy_concert.pipeline.reverse_etl.config.reverse_etl import ConfigReverseEtl
+
+# referenced by the generated compositions, like the examples do for the ingestion window
+WINDOW_ENV_VARS = {
+    "BENCHMARK_WINDOW_START": "execution_date.strftime('%Y-%m-%d 00:00:00')",
+    "BENCHMARK_WINDOW_END": "next_execution_date.strftime('%Y-%m-%d 00:00:00')",
+}
+
+# hooks created while building the dags look their connection up
+CONNECTION_ENV_VARS = {
+    "AIRFLOW_CONN_GOOGLE_CLOUD_BENCHMARK": '{"conn_type": "google_cloud_platform"}',
+}
+
+ENVIRONMENT = {
+    "project": "benchmark-project",
+    "region": "us-central1",
+    "zone": "us-central1-a",
+    "artifact_bucket": "benchmark-artifact",
+    "reverse_etl_bucket": "benchmark-reverse-etl",
+    "raw_vault_bucket": "benchmark-raw-vault",
+    "staging_bucket": "benchmark-staging",
+    "landing_bucket": "benchmark-landing",
+    "raw_vault_dataset": "raw_vault",
+    "raw_dataset": "raw",
+    "trusted_dataset": "trusted",
+    "reverse_etl_dataset": "reverse_etl",
+    "temp_dataset": "temp",
+    "data_lakehouse_connection_id": "google_cloud_benchmark",
+}
+
+TABLE_DEFINITION = {
+    "fields": [
+        {"name": "id", "data_type": "INT64", "description": "Primary key"},
+        {"name": "name", "data_type": "STRING", "description": "Name"},
+        {"name": "amount", "data_type": "NUMERIC", "description": "Amount"},
+        {"name": "last_update", "data_type": "TIMESTAMP", "description": "Last update"},
+        {"name": "_load_flag", "data_type": "STRING"},
+        {"name": "_ts_window_start", "data_type": "TIMESTAMP"},
+        {"name": "_ts_window_end", "data_type": "TIMESTAMP"},
+        {"name": "_ts_logical", "data_type": "TIMESTAMP"},
+        {"name": "_ts_ingestion", "data_type": "TIMESTAMP"},
+        {"name": "_hash_key", "data_type": "STRING"},
+    ],
+    "partitioning": {"field": "_ts_window_start", "type": "time", "granularity": "DAY"},
+}
+
+GCS_PARTITION_SCHEMA = (
+    "_load_flag=incr/_ts_window_start={{ ${BENCHMARK_WINDOW_START} }}"
+    "/_ts_window_end={{ ${BENCHMARK_WINDOW_END} }}"
+    "/_ts_logical={{ execution_date.strftime('%Y-%m-%d %H:%M:%S%z') }}"
+    "/_ts_ingestion={{ dag_run.start_date.strftime('%Y-%m-%d %H:%M:%S%z') }}"
+)
+
+
+def dump_yaml(data, file_path):
+    with open(file_path, "w") as file:
+        yaml.safe_dump(data, file, sort_keys=False)
+    return file_path
+
+
+def dag_parameters(dag_id, source):
+    return {
+        "dag_id": dag_id,
+        "description": f"Synthetic {source} composition",
+        "catchup": False,
+        "schedule_interval": "@daily",
+        "max_active_runs": 1,
+        "start_date": {"year": 2022, "month": 1, "day": 1},
+        "tags": ["framework:debussy_concert", "project:benchmark"],
+        "default_args": {"owner": "debussy"},
+    }
+
+
+def write_environment(directory):
+    return dump_yaml(ENVIRONMENT, os.path.join(directory, "environment.yaml"))
+
+
+def table_name(index):
+    return f"table_{index:05d}"
+
+
+def ingestion_parameters(directory, size, extract_connection_id):
+    table_schemas = os.path.join(directory, "table_schemas")
+    os.makedirs(table_schemas, exist_ok=True)
+    parameters = []
+    for index in range(size):
+        name = table_name(index)
+        table_definition_file = dump_yaml(
+            TABLE_DEFINITION, os.path.join(table_schemas, f"{name}.yaml")
+        )
+        extraction_query = (
+            f"SELECT id, name, amount, last_update FROM benchmark.{name} "
+            "WHERE last_update >= '{{ ${BENCHMARK_WINDOW_START} }}' "
+            "AND last_update < '{{ ${BENCHMARK_WINDOW_END} }}'"
+        )
+        parameters.append(
+            {
+                "name": name,
+                "extraction_query": extraction_query,
+                "extract_connection_id": extract_connection_id,
+                "raw_table_definition": table_definition_file,
+                "data_partitioning": {
+                    "gcs_partition_schema": GCS_PARTITION_SCHEMA,
+                    "destination_partition": "{{ execution_date.strftime('%Y%m%d') }}",
+                },
+            }
+        )
+    return parameters
+
+
+def write_rdbms_ingestion(directory, size):
+    composition = {
+        "name": f"benchmark_rdbms_ingestion_{size}",
+        "source_name": "benchmark",
+        "source_type": "mysql",
+        "description": "synthetic mysql ingestion",
+        "secret_manager_uri": "projects/benchmark-project/secrets/benchmark",
+        "dataproc_config": {
+            "machine_type": "n1-standard-2",
+            "num_workers": 0,
+            "subnet": "subnet-benchmark",
+            "parallelism": 60,
+            "pip_packages": ["google-cloud-secret-manager"],
+        },
+        "dag_parameters": dag_parameters(f"benchmark_rdbms_ingestion_{size}", "mysql"),
+        "ingestion_parameters": ingestion_parameters(
+            directory, size, extract_connection_id="google_cloud_benchmark"
+        ),
+    }
+    return dump_yaml(composition, os.path.join(directory, "composition.yaml"))
+
+
+def write_bigquery_ingestion(directory, size):
+    composition = {
+        "name": f"benchmark_bigquery_ingestion_{size}",
+        "source_name": "benchmark",
+        "source_type": "bigquery",
+        "description": "synthetic bigquery ingestion",
+        "dag_parameters": dag_parameters(
+            f"benchmark_bigquery_ingestion_{size}", "bigquery"
+        ),
+        "ingestion_parameters": ingestion_parameters(
+            directory, size, extract_connection_id="google_cloud_benchmark"
+        ),
+    }
+    return dump_yaml(composition, os.path.join(directory, "composition.yaml"))
+
+
+def write_reverse_etl(directory, size):
+    extraction_movements = []
+    for index in range(size):
+        name = table_name(index)
+        extraction_movements.append(
+            {
+                "name": name,
+                "reverse_etl_query": f"SELECT * FROM trusted.{name}",
+                "reverse_etl_dataset_partition_type": "DAY",
+                "reverse_etl_dataset_partition_field": "_logical_ts",
+                "extraction_query_from_temp": "SELECT * FROM `{reverse_etl_table_uri}`",
+                "output_config": {
+                    "format": "CSV",
+                    "file_name": f"{name}.csv",
+                    "field_delimiter": ",",
+                },
+                "destination_type": "gcs",
+                "destination_uri": f"gs://benchmark-destination/{name}.csv",
+                "destination_connection_id": "google_cloud_benchmark",
+            }
+        )
+    composition = {
+        "name": f"benchmark_reverse_etl_{size}",
+        "description": "synthetic reverse etl",
+        "dag_parameters": dag_parameters(f"benchmark_reverse_etl_{size}", "reverse_etl"),
+        "extraction_movements": extraction_movements,
+    }
+    return dump_yaml(composition, os.path.join(directory, "composition.yaml"))
+
+
+def write_dbt_transformation(directory, size):
+    transformation_parameters = []
+    for index in range(size):
+        name = table_name(index)
+        transformation_parameters.append(
+            {
+                "name": name,
+                "dbt_run_parameters": {
+                    "dir": os.path.join(directory, "dbt"),
+                    "profiles_dir": os.path.join(directory, "dbt"),
+                    "models": name,
+                },
+            }
+        )
+    composition = {
+        "name": f"benchmark_dbt_transformation_{size}",
+        "description": "synthetic dbt transformation",
+        "dag_parameters": dag_parameters(
+            f"benchmark_dbt_transformation_{size}", "dbt"
+        ),
+        "transformation_parameters": transformation_parameters,
+    }
+    return dump_yaml(composition, os.path.join(directory, "composition.yaml"))
+
+
+class SyntheticPipeline(NamedTuple):
+    config_cls: Type[ConfigComposition]
+    write_composition: Callable[[str, int], str]
+
+
+PIPELINES: Dict[str, SyntheticPipeline] = {
+    "rdbms_ingestion": SyntheticPipeline(
+        ConfigRdbmsDataIngestion, write_rdbms_ingestion
+    ),
+    "bigquery_ingestion": SyntheticPipeline(
+        ConfigBigQueryDataIngestion, write_bigquery_ingestion
+    ),
+    "reverse_etl": SyntheticPipeline(ConfigReverseEtl, write_reverse_etl),
+    "dbt_transformation": SyntheticPipeline(
+        ConfigTransformComposition, write_dbt_transformation
+    ),
+}
+
+
+def write_composition(pipeline, directory, size):
+    """Returns the (composition, environment) file paths for the synthetic pipeline"""
+    os.makedirs(directory, exist_ok=True)
+    os.environ.update(WINDOW_ENV_VARS)
+    os.environ.update(CONNECTION_ENV_VARS)
+    composition_file = PIPELINES[pipeline].write_composition(directory, size)
+    return composition_file, write_environment(directory)
+
+
+def load_config(pipeline, composition_file, env_file) -> ConfigComposition:
+    return PIPELINES[pipeline].config_cls.load_from_file(
+        composition_config_file_path=composition_file, env_file_path=env_file
+    )
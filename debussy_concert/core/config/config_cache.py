@@ -0,0 +1,145 @@
+import hashlib
+import logging
+import os
+import pickle
+import re
+import stat
+import tempfile
+from dataclasses import fields
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from debussy_concert import __version__
+from debussy_concert.core.config.config_environment import ConfigEnvironment
+
+# same `${VAR}` and `${VAR|default}` syntax parsed by yaml_env_var_parser
+ENV_VAR_REGEXP = re.compile(r"\$\{(?P<name>[^}|]*)(\|[^}]*)?\}")
+CACHE_DIR_ENV_VAR = "DEBUSSY_CONCERT__CONFIG_CACHE_DIR"
+
+
+def referenced_env_vars(content: str) -> Iterable[str]:
+    return sorted({match.group("name") for match in ENV_VAR_REGEXP.finditer(content)})
+
+
+def environment_env_vars():
+    # env vars created by ConfigEnvironment are derived from the env file content,
+    # which is already part of the cache key
+    prefix = ConfigEnvironment.env_var_prefix
+    return {f"{prefix}__{field.name}".upper() for field in fields(ConfigEnvironment)}
+
+
+def default_cache_dir() -> str:
+    # per user, never the shared temp dir: entries are unpickled
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "debussy_concert", "config")
+
+
+def is_private(path) -> bool:
+    """
+    Whether path is owned by the current user and only writable by them, so no
+    other user could have planted the pickle loaded from it
+    """
+    path_stat = os.stat(path)
+    if hasattr(os, "getuid") and path_stat.st_uid != os.getuid():
+        return False
+    return not path_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def file_fingerprint(file_path) -> str:
+    """
+    Hash of the file content and of the values of every env var referenced by it,
+    since they are replaced while parsing the yaml
+    """
+    with open(file_path, "rb") as file:
+        content = file.read()
+    derived_env_vars = environment_env_vars()
+    digest = hashlib.sha256(content)
+    for name in referenced_env_vars(content.decode("utf-8", errors="replace")):
+        if name in derived_env_vars:
+            continue
+        digest.update(f"\0{name}={os.environ.get(name)}".encode())
+    return digest.hexdigest()
+
+
+class ConfigCache:
+    """
+    On disk cache of fully built composition configs.
+    The entry key is a content hash of the composition and environment files, the
+    files they reference (eg: raw_table_definition) are stored within the entry and
+    checked on every load. Entries are only read from a directory and files owned
+    by the current user and not writable by others
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        cache_dir = cache_dir or os.environ.get(CACHE_DIR_ENV_VAR)
+        self.cache_dir = Path(cache_dir or default_cache_dir())
+
+    def cache_key(self, config_cls, composition_config_file_path, env_file_path):
+        digest = hashlib.sha256()
+        digest.update(f"{config_cls.__module__}.{config_cls.__qualname__}".encode())
+        digest.update(__version__.encode())
+        digest.update(file_fingerprint(composition_config_file_path).encode())
+        digest.update(file_fingerprint(env_file_path).encode())
+        return digest.hexdigest()
+
+    def entry_path(self, key) -> Path:
+        return self.cache_dir / f"{key}.pickle"
+
+    def read(self, key):
+        entry_path = self.entry_path(key)
+        try:
+            if not (is_private(self.cache_dir) and is_private(entry_path)):
+                logging.warning(
+                    f"Ignoring config cache entry {entry_path}, it is not private"
+                )
+                return None
+            with open(entry_path, "rb") as file:
+                entry = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # corrupted or incompatible entry, it will be overwritten
+            return None
+        if not self.is_valid(entry):
+            return None
+        return entry["config"]
+
+    def write(self, key, config, dependency_files: Iterable[str]):
+        dependencies = {
+            file_path: file_fingerprint(file_path) for file_path in dependency_files
+        }
+        entry = {"config": config, "dependencies": dependencies}
+        self.cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # write and rename so concurrent parsers never read a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.entry_path(key))
+
+    @staticmethod
+    def is_valid(entry: Dict) -> bool:
+        for file_path, fingerprint in entry["dependencies"].items():
+            try:
+                if file_fingerprint(file_path) != fingerprint:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def load(self, config_cls, composition_config_file_path, env_file_path):
+        key = self.cache_key(config_cls, composition_config_file_path, env_file_path)
+        config = self.read(key)
+        if config is not None:
+            # unpickling does not run __post_init__
+            config.environment.export_env_vars()
+            return config
+        config = config_cls.load_from_file(
+            composition_config_file_path=composition_config_file_path,
+            env_file_path=env_file_path,
+        )
+        try:
+            self.write(key, config, config.dependency_files())
+        except (OSError, pickle.PicklingError) as error:
+            # the cache is an optimization, never fail the dag parsing because of it
+            logging.warning(f"Could not write config cache entry {key}: {error}")
+        return config
@@ -1,7 +1,8 @@
 from abc import ABC
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
+from debussy_concert.core.config.config_cache import ConfigCache
 from debussy_concert.core.config.config_environment import ConfigEnvironment
 from debussy_concert.core.config.config_dag_parameters import ConfigDagParameters
 from debussy_concert.core.config.movement_parameters.base import MovementParametersBase
@@ -17,3 +18,24 @@ class ConfigComposition(ABC):
 
     def load_from_file(cls, composition_config_file_path, env_file_path):
         raise NotImplementedError()
+
+    @classmethod
+    def load_from_file_cached(
+        cls, composition_config_file_path, env_file_path, cache_dir: Optional[str] = None
+    ):
+        """
+        Same as load_from_file, but reuses the config built on a previous parse
+        while none of the input files and env vars they reference changed
+        """
+        return ConfigCache(cache_dir).load(
+            cls,
+            composition_config_file_path=composition_config_file_path,
+            env_file_path=env_file_path,
+        )
+
+    def dependency_files(self) -> List[str]:
+        # files read while loading the config, besides the composition and env files
+        files = []
+        for movement_parameters in self.movements_parameters:
+            files.extend(movement_parameters.dependency_files())
+        return files
@@ -21,16 +21,20 @@ class ConfigEnvironment:
     data_lakehouse_connection_id: str
     landing_bucket: Optional[str] = None
 
+    env_var_prefix = "DEBUSSY_CONCERT"
+
     def __post_init__(self):
+        self.export_env_vars()
+
+    def export_env_vars(self):
         # create env vars from the env config class with the debussy prefix
         # this is to make possible to use those var on compositions and movements
-        prefix = "DEBUSSY_CONCERT"
         for key, value in self.__dict__.items():
             # dont create the env var if there is no value
             if value is None:
                 continue
 
-            env_key = f"{prefix}__{key}".upper()
+            env_key = f"{self.env_var_prefix}__{key}".upper()
             os.environ[env_key] = value
 
     @classmethod
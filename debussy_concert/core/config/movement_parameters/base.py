@@ -1,10 +1,13 @@
 from dataclasses import dataclass
-from typing import TypeVar
+from typing import List, TypeVar
 
 
 @dataclass(frozen=True)
 class MovementParametersBase:
     name: str
 
+    def dependency_files(self) -> List[str]:
+        return []
+
 
 MovementParametersType = TypeVar("MovementParametersType", bound=MovementParametersBase)
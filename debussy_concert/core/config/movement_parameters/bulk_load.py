@@ -0,0 +1,39 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class BulkLoad:
+    """
+    Loads the reverse etl csv into the rdbms table streaming it from storage. The
+    native method is LOAD DATA LOCAL INFILE on mysql and COPY FROM STDIN on
+    postgresql. executemany inserts batch_size rows at a time, committing every
+    commit_interval rows, for servers where the native load is disabled. batch_size
+    also bounds the rows of each upsert transaction. With parallel_connections
+    above 1, or the files of a sharded extract, the shards (the files or ranges of
+    shard_rows rows) are loaded through that many connections of the destination,
+    each shard retried shard_retries times, and written to the table once all of
+    them are staged
+    """
+
+    method: str = "native"
+    batch_size: int = 10000
+    commit_interval: int = 100000
+    parallel_connections: int = 1
+    shard_rows: int = 100000
+    shard_retries: int = 2
+
+    methods = ("native", "executemany")
+
+    def __post_init__(self):
+        if self.method not in self.methods:
+            raise ValueError(f"Invalid bulk load method: {self.method}")
+        if self.batch_size < 1 or self.commit_interval < 1:
+            raise ValueError("batch_size and commit_interval must be at least 1")
+        if self.parallel_connections < 1 or self.shard_rows < 1:
+            raise ValueError("parallel_connections and shard_rows must be at least 1")
+        if self.shard_retries < 0:
+            raise ValueError("shard_retries must not be negative")
+
+    @property
+    def parallel(self):
+        return self.parallel_connections > 1
@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from debussy_concert.core.config.movement_parameters.query_budget import parse_bytes
+
+
+@dataclass(frozen=True)
+class ChunkedTransfer:
+    """
+    Streams a storage object in chunk_size pieces through parallelism threads, so
+    the worker holds at most parallelism chunks in memory. The uploaded chunks are
+    recorded in the optional checkpoint store, any of the key value store types,
+    every checkpoint_every chunks or checkpoint_seconds seconds, and a restarted
+    transfer resumes from them. The destination is checked against the chunk
+    checksums when verify is set
+    """
+
+    chunk_size: Union[int, str] = "64MiB"
+    parallelism: int = 4
+    checkpoint: Optional[dict] = None
+    checkpoint_every: int = 16
+    checkpoint_seconds: int = 60
+    verify: bool = True
+
+    def __post_init__(self):
+        if self.chunk_bytes < 1:
+            raise ValueError(f"Invalid chunk_size: {self.chunk_size}")
+        if self.parallelism < 1:
+            raise ValueError("parallelism must be at least 1")
+        if self.checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be at least 1")
+
+    @property
+    def chunk_bytes(self) -> int:
+        return parse_bytes(self.chunk_size)
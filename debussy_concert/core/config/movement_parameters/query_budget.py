@@ -0,0 +1,54 @@
+import re
+from dataclasses import dataclass
+from typing import Optional, Union
+
+BYTE_UNITS = {
+    "B": 1,
+    "KB": 10**3,
+    "MB": 10**6,
+    "GB": 10**9,
+    "TB": 10**12,
+    "KIB": 2**10,
+    "MIB": 2**20,
+    "GIB": 2**30,
+    "TIB": 2**40,
+}
+
+
+def parse_bytes(value: Union[int, str]) -> int:
+    """Number of bytes from an int or a size like 500GB or 1.5 TiB"""
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*([0-9.]+)\s*([A-Za-z]*)\s*", str(value))
+    unit = match and (match.group(2).upper() or "B")
+    if not match or unit not in BYTE_UNITS:
+        raise ValueError(f"Invalid size: {value}")
+    return int(float(match.group(1)) * BYTE_UNITS[unit])
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """
+    Bytes a movement query may process, checked with a BigQuery dry run before the
+    job is submitted. on_exceed is fail or warn. The estimates are cached by query
+    hash in the optional cache store, any of the key value store types, for
+    cache_ttl seconds, as the source tables grow
+    """
+
+    max_bytes_processed: Union[int, str]
+    on_exceed: str = "fail"
+    cache: Optional[dict] = None
+    cache_ttl: int = 3600
+
+    on_exceed_actions = ("fail", "warn")
+
+    def __post_init__(self):
+        if self.on_exceed not in self.on_exceed_actions:
+            raise ValueError(f"Invalid on_exceed: {self.on_exceed}")
+        parse_bytes(self.max_bytes_processed)
+        if self.cache_ttl < 0:
+            raise ValueError(f"Invalid cache_ttl: {self.cache_ttl}")
+
+    @property
+    def max_bytes(self) -> int:
+        return parse_bytes(self.max_bytes_processed)
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class SkipIfUnchanged:
+    """
+    Skips a query job, and everything downstream of it, when neither the rendered
+    query nor its sources changed since the last successful run. Sources are the
+    last_modified_time of the tables referenced by the query, or the rows of
+    freshness_query when given (e.g. for views or external tables). Queries rendered
+    with the logical date never repeat, so they are never skipped. The fingerprints
+    are kept in store, any of the key value store types
+    """
+
+    store: dict
+    freshness_query: Optional[str] = None
@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass(frozen=True)
+class SnapshotDiff:
+    """
+    Delivers only the rows inserted or updated since the previous delivery, plus a
+    tombstone file with the key columns of the deleted rows. The delivered rows are
+    kept as key and row hashes in a snapshot table, replaced once the delivery
+    succeeds, so a failed run delivers the same delta again
+    """
+
+    key: List[str]
+    tombstone_suffix: str = ".tombstones"
+
+    def __post_init__(self):
+        if not self.key:
+            raise ValueError("snapshot_diff requires the key columns of the rows")
+        if not self.tombstone_suffix:
+            raise ValueError("tombstone_suffix can not be empty")
+
+    def tombstone_uri(self, uri):
+        """uri with the suffix before the extensions of its file name"""
+        folder, slash, file_name = uri.rpartition("/")
+        root, dot, extensions = file_name.partition(".")
+        return f"{folder}{slash}{root}{self.tombstone_suffix}{dot}{extensions}"
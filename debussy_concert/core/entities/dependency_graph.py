@@ -0,0 +1,150 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+def node_name(node):
+    return getattr(node, "name", repr(node))
+
+
+def unknown_node(node):
+    return ValueError(f"Dependency on unknown node: {node_name(node)}")
+
+
+@lru_cache(maxsize=256)
+def reduced_edges(
+    upstreams: Tuple[Tuple[int, ...], ...], order: Tuple[int, ...]
+) -> Tuple[Tuple[int, int], ...]:
+    """
+    (upstream, downstream) position pairs of the graph of the given shape, the
+    positions of the upstreams of each node, without the dependencies already
+    implied by others (transitive reduction). The movements of a composition
+    repeat the same few shapes, so each one is reduced once
+    """
+    ancestors = {}
+    edges = []
+    for node in order:
+        node_upstreams = upstreams[node]
+        mask = 0
+        for upstream in node_upstreams:
+            mask |= 1 << upstream | ancestors[upstream]
+        ancestors[node] = mask
+        if len(node_upstreams) < 2:
+            # a single dependency is never implied, chains stay linear
+            edges.extend((upstream, node) for upstream in node_upstreams)
+            continue
+        for upstream in node_upstreams:
+            bit = 1 << upstream
+            implied = any(
+                ancestors[other] & bit for other in node_upstreams if other != upstream
+            )
+            if not implied:
+                edges.append((upstream, node))
+    return tuple(edges)
+
+
+class DependencyGraph:
+    """
+    Dependencies between the phrases of a movement or the motifs of a phrase.
+    `dependencies` maps a node to the nodes it depends on, nodes without an entry
+    start with their parent group. Without dependencies the nodes are chained
+    in the given order.
+    """
+
+    def __init__(
+        self,
+        nodes: Sequence[Any],
+        dependencies: Optional[Mapping[Any, Sequence[Any]]] = None,
+    ):
+        self.nodes = list(nodes)
+        # positions in nodes of the upstreams of each node
+        self._upstream_positions: List[List[int]] = [[] for _ in self.nodes]
+        if dependencies is None:
+            # a chain, already in topological order
+            for index, upstreams in enumerate(self._upstream_positions[1:]):
+                upstreams.append(index)
+            self._order = self.nodes
+            self._shape = None
+            return
+        position = {node: index for index, node in enumerate(self.nodes)}
+        in_order = True
+        for node, upstreams in dependencies.items():
+            node_position = position.get(node)
+            if node_position is None:
+                raise unknown_node(node)
+            node_upstreams = self._upstream_positions[node_position]
+            for upstream in upstreams:
+                upstream_position = position.get(upstream)
+                if upstream_position is None:
+                    raise unknown_node(upstream)
+                if upstream_position in node_upstreams:
+                    continue
+                node_upstreams.append(upstream_position)
+                if upstream_position > node_position:
+                    in_order = False
+        # nodes declared after their upstreams need no sort
+        self._order = self.nodes
+        order = range(len(self.nodes))
+        if not in_order:
+            order = self.topological_positions()
+            self._order = [self.nodes[index] for index in order]
+        # positions only, the edges of a shape are reduced once
+        self._shape = (tuple(map(tuple, self._upstream_positions)), tuple(order))
+
+    @property
+    def upstreams(self) -> Dict[Any, List[Any]]:
+        nodes = self.nodes
+        return {
+            node: [nodes[index] for index in upstreams]
+            for node, upstreams in zip(nodes, self._upstream_positions)
+        }
+
+    def topological_positions(self) -> List[int]:
+        # kahn's algorithm, ties are broken by the declaration order
+        pending = [len(upstreams) for upstreams in self._upstream_positions]
+        downstreams: List[List[int]] = [[] for _ in self.nodes]
+        for index, upstreams in enumerate(self._upstream_positions):
+            for upstream in upstreams:
+                downstreams[upstream].append(index)
+        ready = [index for index, count in enumerate(pending) if count == 0]
+        order = []
+        while ready:
+            index = ready.pop(0)
+            order.append(index)
+            for downstream in downstreams[index]:
+                pending[downstream] -= 1
+                if pending[downstream] == 0:
+                    ready.append(downstream)
+                    ready.sort()
+        if len(order) != len(self.nodes):
+            cycle = [
+                node_name(node) for node, count in zip(self.nodes, pending) if count > 0
+            ]
+            raise ValueError(f"Dependency cycle between: {', '.join(cycle)}")
+        return order
+
+    def edges(self) -> List[Tuple[Any, Any]]:
+        """
+        (upstream, downstream) pairs, without the dependencies already implied by
+        others (transitive reduction), in build order
+        """
+        nodes = self.nodes
+        if self._shape is None:
+            return list(zip(nodes, nodes[1:]))
+        return [
+            (nodes[upstream], nodes[node])
+            for upstream, node in reduced_edges(*self._shape)
+        ]
+
+    def stages(self) -> List[List[Any]]:
+        """Nodes grouped by the earliest step they can run in"""
+        upstreams = self.upstreams
+        level = {}
+        for node in self._order:
+            level[node] = max((level[up] + 1 for up in upstreams[node]), default=0)
+        stages = [[] for _ in range(max(level.values(), default=-1) + 1)]
+        for node in self._order:
+            stages[level[node]].append(node)
+        return stages
+
+    def __iter__(self):
+        return iter(self._order)
@@ -63,7 +63,7 @@ class BigQueryTableField:
     mode: str = "NULLABLE"
     fields: Optional[List["BigQueryTableField"]] = None
     policy_tags: Optional[BigQueryPolicyTags] = dataclass_field(
-        default=BigQueryPolicyTags([])
+        default_factory=lambda: BigQueryPolicyTags([])
     )
 
     def __post_init__(self):
@@ -182,14 +182,14 @@ class BigQueryTableSchema(TableSchema):
         return cls(fields=fields)
 
 
-@dataclass
+@dataclass(frozen=True)
 class BigQueryTable:
+    # frozen since the same instance is shared by every movement using the definition
     schema: BigQueryTableSchema
     partitioning: BigQueryTimePartitioning
 
     @classmethod
     def load_from_dict(cls, table_dict):
-        print(table_dict)
         schema = BigQueryTableSchema.load_from_dict(table_dict)
         partitioning = None
         if partitioning_dict := table_dict.get("partitioning"):
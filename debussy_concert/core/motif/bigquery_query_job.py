@@ -1,4 +1,8 @@
 from typing import Optional
+from debussy_concert.core.config.movement_parameters.query_budget import QueryBudget
+from debussy_concert.core.config.movement_parameters.skip_unchanged import (
+    SkipIfUnchanged,
+)
 from debussy_concert.core.motif.motif_base import MotifBase
 from debussy_concert.core.motif.mixins.bigquery_job import (
     BigQueryJobMixin,
@@ -17,6 +21,9 @@ class BigQueryQueryJobMotif(MotifBase, BigQueryJobMixin, PExecuteQueryMotif):
         create_disposition=None,
         time_partitioning: Optional[BigQueryTimePartitioning] = None,
         gcp_conn_id="google_cloud_default",
+        query_budget: Optional[QueryBudget] = None,
+        skip_if_unchanged: Optional[SkipIfUnchanged] = None,
+        fingerprint_key: Optional[str] = None,
         **op_kw_args
     ):
         super().__init__(name=name)
@@ -25,6 +32,10 @@ class BigQueryQueryJobMotif(MotifBase, BigQueryJobMixin, PExecuteQueryMotif):
         self.time_partitioning = time_partitioning
         self.create_disposition = create_disposition
         self.gcp_conn_id = gcp_conn_id
+        self.query_budget = query_budget
+        self.skip_if_unchanged = skip_if_unchanged
+        # unique per movement, the motif name is appended
+        self.fingerprint_key = fingerprint_key
         self.op_kw_args = op_kw_args
 
     def setup(self, sql_query, destination_table=None):
@@ -33,17 +44,40 @@ class BigQueryQueryJobMotif(MotifBase, BigQueryJobMixin, PExecuteQueryMotif):
         return self
 
     def build(self, dag, phrase_group):
+        configuration = self.query_configuration(
+            sql_query=self.sql_query,
+            destination_table=self.destination_table,
+            create_disposition=self.create_disposition,
+            write_disposition=self.write_disposition,
+            time_partitioning=self.time_partitioning,
+        )
+        task_group = phrase_group
+        if self.query_budget is not None or self.skip_if_unchanged is not None:
+            # the pre-flight tasks are the entry of the motif, downstream of the
+            # motifs before it
+            task_group = self.workflow_service.motif_group(
+                group_id=self.name, workflow_dag=dag, phrase_group=phrase_group
+            )
         bigquery_job_operator = self.insert_job_operator(
-            dag,
-            phrase_group,
-            self.query_configuration(
-                sql_query=self.sql_query,
-                destination_table=self.destination_table,
-                create_disposition=self.create_disposition,
-                write_disposition=self.write_disposition,
-                time_partitioning=self.time_partitioning,
-            ),
-            self.gcp_conn_id,
-            **self.op_kw_args
+            dag, task_group, configuration, self.gcp_conn_id, **self.op_kw_args
         )
-        return bigquery_job_operator
+        tasks = [bigquery_job_operator]
+        if self.query_budget is not None:
+            dry_run = self.dry_run_operator(
+                dag, task_group, configuration, self.query_budget, self.gcp_conn_id
+            )
+            tasks.insert(0, dry_run)
+        if self.skip_if_unchanged is not None:
+            check_changed, save = self.skip_if_unchanged_operators(
+                dag,
+                task_group,
+                configuration,
+                self.skip_if_unchanged,
+                f"{self.fingerprint_key or self.config.name}/{self.name}",
+                self.gcp_conn_id,
+            )
+            tasks = [check_changed, *tasks, save]
+        if len(tasks) == 1:
+            return bigquery_job_operator
+        self.workflow_service.chain_tasks(*tasks)
+        return task_group
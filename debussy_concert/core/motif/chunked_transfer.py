@@ -0,0 +1,58 @@
+from typing import Optional
+
+from debussy_concert.core.config.movement_parameters.chunked_transfer import (
+    ChunkedTransfer,
+)
+from debussy_concert.core.motif.motif_base import MotifBase
+from debussy_concert.core.service.storage.transfer import chunked_transfer
+
+
+class ChunkedStorageTransferMotif(MotifBase):
+    """
+    Streaming alternative to StorageToStorageMotif for gs://, s3://, sftp:// and
+    local uris, see ChunkedTransfer
+    """
+
+    def __init__(
+        self,
+        *,
+        destination_uri,
+        transfer: Optional[ChunkedTransfer] = None,
+        origin_conn_id=None,
+        destination_conn_id=None,
+        gcp_conn_id="google_cloud_default",
+        name=None,
+    ) -> None:
+        super().__init__(name=name)
+        self.destination_uri = destination_uri
+        self.transfer = transfer or ChunkedTransfer()
+        self.origin_conn_id = origin_conn_id
+        self.destination_conn_id = destination_conn_id
+        self.gcp_conn_id = gcp_conn_id
+
+    def setup(self, storage_uri_prefix):
+        self.origin_uri = storage_uri_prefix
+        return self
+
+    def build(self, dag, parent_task_group):
+        from airflow.operators.python import PythonOperator
+
+        return PythonOperator(
+            task_id=self.name,
+            python_callable=chunked_transfer,
+            op_kwargs={
+                "origin_uri": self.origin_uri,
+                "destination_uri": self.destination_uri,
+                "origin_conn_id": self.origin_conn_id,
+                "destination_conn_id": self.destination_conn_id,
+                "chunk_size": self.transfer.chunk_bytes,
+                "parallelism": self.transfer.parallelism,
+                "checkpoint": self.transfer.checkpoint,
+                "checkpoint_every": self.transfer.checkpoint_every,
+                "checkpoint_seconds": self.transfer.checkpoint_seconds,
+                "verify": self.transfer.verify,
+                "gcp_conn_id": self.gcp_conn_id,
+            },
+            dag=dag,
+            task_group=parent_task_group,
+        )
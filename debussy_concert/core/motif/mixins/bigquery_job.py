@@ -1,13 +1,19 @@
+import hashlib
+import json
+import logging
 import re
+import time
 from typing import Optional, List, Union
-from airflow.providers.google.cloud.operators.bigquery import BigQueryInsertJobOperator
-from google.cloud.bigquery.external_config import HivePartitioningOptions
 
+from debussy_concert.core.config.movement_parameters.query_budget import QueryBudget
+from debussy_concert.core.config.movement_parameters.skip_unchanged import (
+    SkipIfUnchanged,
+)
 from debussy_concert.core.motif.motif_base import PMotif
+from debussy_concert.core.service.key_value.store import key_value_store_from_dict
 
-
-class BigQueryInsertJobOperator(BigQueryInsertJobOperator):
-    template_ext = (".json", ".sql")
+# bigquery_config keys forwarded to every BigQueryInsertJobOperator of the composition
+BIGQUERY_JOB_CONFIG_KEYS = ("deferrable", "poll_interval")
 
 
 class TableReference:
@@ -72,6 +78,133 @@ class BigQueryTimePartitioning:
         return ret
 
 
+class HivePartitioningOptions:
+    """
+    NOTE: same api representation as google.cloud.bigquery HivePartitioningOptions,
+    kept here so building the dags does not import the bigquery sdk
+    https://cloud.google.com/bigquery/docs/reference/rest/v2/tables#hivepartitioningoptions
+    {
+       "mode": string,
+       "sourceUriPrefix": string,
+       "requirePartitionFilter": boolean
+    }
+    """
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        source_uri_prefix: Optional[str] = None,
+        require_partition_filter: Optional[bool] = None,
+    ):
+        self.mode = mode
+        self.source_uri_prefix = source_uri_prefix
+        self.require_partition_filter = require_partition_filter
+
+    def to_api_repr(self) -> dict:
+        ret = {
+            "mode": self.mode,
+            "sourceUriPrefix": self.source_uri_prefix,
+            "requirePartitionFilter": self.require_partition_filter,
+        }
+        return {key: value for key, value in ret.items() if value is not None}
+
+
+def cached_estimate(cache_store, cache_key, cache_ttl) -> Optional[int]:
+    """Bytes processed of the cached dry run, unless older than cache_ttl seconds"""
+    cached = cache_store.get(cache_key) if cache_store else None
+    try:
+        estimate = json.loads(cached)
+        age = time.time() - estimate["estimated_at"]
+    except (TypeError, ValueError, KeyError):
+        # no estimate, or one stored without its time
+        return None
+    return estimate["bytes_processed"] if 0 <= age < cache_ttl else None
+
+
+def dry_run_query(
+    configuration, max_bytes, on_exceed, cache, gcp_conn_id, motif, cache_ttl=3600
+):
+    """
+    Estimated bytes processed by the query job configuration, failing or warning
+    when they exceed max_bytes. The return value is kept as the task xcom
+    """
+    query_config = configuration["query"]
+    query = query_config["query"]
+    cache_store = cache and key_value_store_from_dict(cache, gcp_conn_id)
+    cache_key = f"dry_run/{hashlib.sha256(query.encode('utf-8')).hexdigest()}"
+    bytes_processed = cached_estimate(cache_store, cache_key, cache_ttl)
+    if bytes_processed is None:
+        from airflow.providers.google.cloud.hooks.bigquery import BigQueryHook
+        from google.cloud.bigquery import QueryJobConfig
+
+        client = BigQueryHook(gcp_conn_id=gcp_conn_id).get_client()
+        job_config = QueryJobConfig(
+            dry_run=True,
+            use_query_cache=False,
+            use_legacy_sql=query_config.get("useLegacySql", False),
+        )
+        bytes_processed = client.query(query, job_config=job_config).total_bytes_processed
+        if cache_store:
+            estimate = {"bytes_processed": bytes_processed, "estimated_at": time.time()}
+            cache_store.set(cache_key, json.dumps(estimate))
+
+    logging.info(f"{motif} will process {bytes_processed} bytes, budget {max_bytes}")
+    if bytes_processed > max_bytes:
+        message = (
+            f"{motif} query would process {bytes_processed} bytes, "
+            f"over the budget of {max_bytes} bytes"
+        )
+        if on_exceed == "fail":
+            raise ValueError(message)
+        logging.warning(message)
+    return bytes_processed
+
+
+def query_fingerprint(configuration, freshness_query, gcp_conn_id) -> str:
+    """Hash of the query and of the freshness of its source tables"""
+    from airflow.providers.google.cloud.hooks.bigquery import BigQueryHook
+    from google.cloud.bigquery import QueryJobConfig
+
+    query_config = configuration["query"]
+    client = BigQueryHook(gcp_conn_id=gcp_conn_id).get_client()
+    if freshness_query:
+        sources = [
+            tuple(row.values()) for row in client.query(freshness_query).result()
+        ]
+    else:
+        job_config = QueryJobConfig(
+            dry_run=True,
+            use_query_cache=False,
+            use_legacy_sql=query_config.get("useLegacySql", False),
+        )
+        dry_run = client.query(query_config["query"], job_config=job_config)
+        sources = sorted(
+            (
+                f"{table.project}.{table.dataset_id}.{table.table_id}",
+                client.get_table(table).modified,
+            )
+            for table in dry_run.referenced_tables
+        )
+    fingerprint = repr((query_config["query"], sources))
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+def check_query_changed(configuration, freshness_query, store, gcp_conn_id, key):
+    """
+    Condition of the ShortCircuitOperator, the new fingerprint (kept as xcom)
+    or None when it is the one stored by the last successful run
+    """
+    fingerprint = query_fingerprint(configuration, freshness_query, gcp_conn_id)
+    if key_value_store_from_dict(store, gcp_conn_id).get(key) == fingerprint:
+        logging.info(f"{key} sources did not change since the last run, skipping")
+        return None
+    return fingerprint
+
+
+def save_fingerprint(store, gcp_conn_id, key, fingerprint):
+    key_value_store_from_dict(store, gcp_conn_id).set(key, fingerprint)
+
+
 class BigQueryJobMixin:
     def query_configuration(
         self,
@@ -107,6 +240,8 @@ class BigQueryJobMixin:
         field_delimiter: str = ",",
         destination_format: str = "CSV",
         print_header: bool = True,
+        compression: Optional[str] = None,
+        use_avro_logical_types: Optional[bool] = None,
     ):
         """
         https://cloud.google.com/bigquery/docs/reference/rest/v2/Job#jobconfigurationextract
@@ -139,18 +274,25 @@ class BigQueryJobMixin:
         ):
             raise ValueError(
                 f"Invalid destination_format: {destination_format}")
+        if compression not in (None, "NONE", "GZIP", "DEFLATE", "SNAPPY", "ZSTD"):
+            raise ValueError(f"Invalid compression: {compression}")
         source_table_ref = TableReference(source_table_uri).to_dict()
         if isinstance(destination_uris, str):
             destination_uris = [destination_uris]
-        return {
-            "extract": {
-                "sourceTable": source_table_ref,
-                "destinationUris": destination_uris,
-                "printHeader": print_header,
-                "fieldDelimiter": field_delimiter,
-                "destinationFormat": destination_format,
-            }
+        extract = {
+            "sourceTable": source_table_ref,
+            "destinationUris": destination_uris,
+            "destinationFormat": destination_format,
         }
+        # header and delimiter only apply to csv files
+        if destination_format == "CSV":
+            extract["printHeader"] = print_header
+            extract["fieldDelimiter"] = field_delimiter
+        if compression is not None:
+            extract["compression"] = compression
+        if use_avro_logical_types is not None:
+            extract["useAvroLogicalTypes"] = use_avro_logical_types
+        return {"extract": extract}
 
     def load_configuration(
         self,
@@ -198,12 +340,111 @@ class BigQueryJobMixin:
         gcp_conn_id="google_cloud_default",
         **op_kw_args,
     ):
+        from debussy_concert.core.operators.bigquery import BigQueryInsertJobOperator
+
         bigquery_job_operator = BigQueryInsertJobOperator(
             task_id=self.name,
             configuration=configuration,
             dag=dag,
             task_group=task_group,
             gcp_conn_id=gcp_conn_id,
-            **op_kw_args,
+            **{**self.bigquery_job_defaults(), **op_kw_args},
         )
         return bigquery_job_operator
+
+    def dry_run_operator(
+        self: PMotif,
+        dag,
+        task_group,
+        configuration,
+        query_budget: QueryBudget,
+        gcp_conn_id="google_cloud_default",
+    ):
+        """Pre-flight of a query configuration against the movement query budget"""
+        from airflow.operators.python import PythonOperator
+
+        # op_kwargs is templated, so the query is dry run as it will be executed
+        return PythonOperator(
+            task_id=f"{self.name}_dry_run",
+            python_callable=dry_run_query,
+            op_kwargs={
+                "configuration": configuration,
+                "max_bytes": query_budget.max_bytes,
+                "on_exceed": query_budget.on_exceed,
+                "cache": query_budget.cache,
+                "cache_ttl": query_budget.cache_ttl,
+                "gcp_conn_id": gcp_conn_id,
+                "motif": self.name,
+            },
+            dag=dag,
+            task_group=task_group,
+        )
+
+    def skip_if_unchanged_operators(
+        self: PMotif,
+        dag,
+        task_group,
+        configuration,
+        skip_if_unchanged: SkipIfUnchanged,
+        fingerprint_key: str,
+        gcp_conn_id="google_cloud_default",
+    ):
+        """
+        Check task short-circuiting the job when its fingerprint did not change,
+        and the task storing the new fingerprint once the job succeeded
+        """
+        from airflow.operators.python import PythonOperator, ShortCircuitOperator
+
+        check_changed = ShortCircuitOperator(
+            task_id=f"{self.name}_check_changed",
+            python_callable=check_query_changed,
+            op_kwargs={
+                "configuration": configuration,
+                "freshness_query": skip_if_unchanged.freshness_query,
+                "store": skip_if_unchanged.store,
+                "gcp_conn_id": gcp_conn_id,
+                "key": fingerprint_key,
+            },
+            # the skip propagates by trigger rules, so ALL_DONE cleanups still run
+            ignore_downstream_trigger_rules=False,
+            dag=dag,
+            task_group=task_group,
+        )
+        save = PythonOperator(
+            task_id=f"{self.name}_save_fingerprint",
+            python_callable=save_fingerprint,
+            op_kwargs={
+                "store": skip_if_unchanged.store,
+                "gcp_conn_id": gcp_conn_id,
+                "key": fingerprint_key,
+                "fingerprint": (
+                    f"{{{{ ti.xcom_pull(task_ids='{check_changed.task_id}') }}}}"
+                ),
+            },
+            dag=dag,
+            task_group=task_group,
+        )
+        return check_changed, save
+
+    def bigquery_job_defaults(self: PMotif) -> dict:
+        """
+        Composition-wide operator arguments from bigquery_config, e.g.
+        {deferrable: true, poll_interval: 10} to wait for the jobs on the triggerer.
+        Arguments passed to the motif take precedence
+        """
+        # compositions without bigquery jobs do not declare bigquery_config
+        bigquery_config = getattr(self.config, "bigquery_config", None) or {}
+        return {
+            key: bigquery_config[key]
+            for key in BIGQUERY_JOB_CONFIG_KEYS
+            if key in bigquery_config
+        }
+
+
+def __getattr__(name):
+    # operators moved to debussy_concert.core.operators.bigquery, imported on access
+    if name == "BigQueryInsertJobOperator":
+        from debussy_concert.core.operators import bigquery
+
+        return getattr(bigquery, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
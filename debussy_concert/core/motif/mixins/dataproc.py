@@ -1,26 +1,24 @@
+from typing import TYPE_CHECKING
+
 from airflow.utils.trigger_rule import TriggerRule
-from airflow.providers.google.cloud.operators.dataproc import (
-    DataprocCreateClusterOperator,
-    DataprocDeleteClusterOperator,
-)
 
 from debussy_concert.core.motif.motif_base import PClusterMotifMixin
 
-
-class DebussyDataprocDeleteClusterOperator(DataprocDeleteClusterOperator):
-    def execute(self, context: dict):
-        from google.api_core.exceptions import NotFound
-
-        try:
-            super().execute(context)
-        except NotFound:
-            self.log.info("Cluster not found. It may already have been deleted.")
+if TYPE_CHECKING:
+    from airflow.providers.google.cloud.operators.dataproc import (
+        DataprocCreateClusterOperator,
+        DataprocDeleteClusterOperator,
+    )
 
 
 class DataprocClusterHandlerMixin:
     def delete_dataproc_cluster(
         self: PClusterMotifMixin, dag, task_group
-    ) -> DataprocDeleteClusterOperator:
+    ) -> "DataprocDeleteClusterOperator":
+        from debussy_concert.core.operators.dataproc import (
+            DebussyDataprocDeleteClusterOperator,
+        )
+
         delete_dataproc_cluster = DebussyDataprocDeleteClusterOperator(
             task_id="delete_dataproc_cluster",
             project_id=self.config.environment.project,
@@ -34,7 +32,11 @@ class DataprocClusterHandlerMixin:
 
     def create_dataproc_cluster(
         self: PClusterMotifMixin, dag, task_group
-    ) -> DataprocCreateClusterOperator:
+    ) -> "DataprocCreateClusterOperator":
+        from airflow.providers.google.cloud.operators.dataproc import (
+            DataprocCreateClusterOperator,
+        )
+
         create_dataproc_cluster = DataprocCreateClusterOperator(
             task_id="create_dataproc_cluster",
             project_id=self.config.environment.project,
@@ -45,3 +47,12 @@ class DataprocClusterHandlerMixin:
             task_group=task_group,
         )
         return create_dataproc_cluster
+
+
+def __getattr__(name):
+    # operators moved to debussy_concert.core.operators.dataproc, imported on access
+    if name == "DebussyDataprocDeleteClusterOperator":
+        from debussy_concert.core.operators import dataproc
+
+        return getattr(dataproc, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,7 @@
-from typing import Protocol, Sequence
+from typing import Mapping, Optional, Protocol, Sequence
 import inject
 from debussy_concert.core.config.config_composition import ConfigComposition
+from debussy_concert.core.entities.dependency_graph import DependencyGraph
 from debussy_concert.core.entities.protocols import PMovementGroup
 from debussy_concert.core.phrase.phrase_base import PPhrase
 from debussy_concert.core.service.workflow.protocol import PWorkflowService
@@ -26,11 +27,14 @@ class MovementBase(PMovement):
         config: ConfigComposition,
         workflow_service: PWorkflowService,
         phrases: Sequence[PPhrase],
-        name=None
+        name=None,
+        dependencies: Optional[Mapping[PPhrase, Sequence[PPhrase]]] = None
     ) -> None:
         self.name = name or self.__class__.__name__
         self.config = config
         self.phrases = phrases
+        # phrase -> phrases it depends on, the phrases are chained in order if None
+        self.dependencies = dependencies
         self.workflow_service = workflow_service
 
     def play(self, *args, **kwargs):
@@ -40,10 +44,22 @@ class MovementBase(PMovement):
         movement_group = self.workflow_service.movement_group(
             group_id=self.name, workflow_dag=workflow_dag
         )
-        current_task_group = self.phrases[0].build(workflow_dag, movement_group)
-
-        for phrase in self.phrases[1:]:
-            phrase_task_group = phrase.build(workflow_dag, movement_group)
-            current_task_group >> phrase_task_group
-            current_task_group = phrase_task_group
+        if self.dependencies is None:
+            # the usual chain needs no graph
+            current_task_group = self.phrases[0].build(workflow_dag, movement_group)
+            for phrase in self.phrases[1:]:
+                phrase_task_group = phrase.build(workflow_dag, movement_group)
+                current_task_group >> phrase_task_group
+                current_task_group = phrase_task_group
+            return movement_group
+        dependency_graph = self.dependency_graph
+        phrase_groups = {}
+        for phrase in dependency_graph:
+            phrase_groups[phrase] = phrase.build(workflow_dag, movement_group)
+        for upstream, downstream in dependency_graph.edges():
+            phrase_groups[upstream] >> phrase_groups[downstream]
         return movement_group
+
+    @property
+    def dependency_graph(self) -> DependencyGraph:
+        return DependencyGraph(self.phrases, self.dependencies)
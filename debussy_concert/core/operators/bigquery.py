@@ -0,0 +1,5 @@
+from airflow.providers.google.cloud.operators import bigquery
+
+
+class BigQueryInsertJobOperator(bigquery.BigQueryInsertJobOperator):
+    template_ext = (".json", ".sql")
@@ -0,0 +1,47 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from debussy_airflow.hooks.storage_hook import SFTPHook
+from debussy_airflow.operators.storage_to_storage_operator import (
+    StorageToStorageOperator,
+)
+
+
+class ParallelStorageToStorageOperator(StorageToStorageOperator):
+    """
+    Transfers every file of the origin folder with a bounded pool of threads.
+    The storage hooks open a connection per call, so they are shared between the
+    threads
+    """
+
+    def __init__(self, max_parallel_transfers=8, **kwargs):
+        super().__init__(is_dir=True, **kwargs)
+        self.max_parallel_transfers = max_parallel_transfers
+
+    def destination_uri(self, file_name):
+        # sftp uploads into the destination folder under the origin file name
+        if isinstance(self.destination_storage_hook, SFTPHook):
+            return self.destination_file_uri
+        return os.path.join(self.destination_file_uri, file_name)
+
+    def folder_to_folder(self, context):
+        file_names = [
+            file_name
+            for file_name in self.origin_storage_hook.list_dir(self.origin_file_uri)
+            if self.file_filter_fn(context, file_name)
+        ]
+        self.log.info(
+            f"ParallelStorageToStorageOperator - Transferring {len(file_names)} files"
+        )
+        with ThreadPoolExecutor(max_workers=self.max_parallel_transfers) as pool:
+            transfers = [
+                pool.submit(
+                    self.file_to_file,
+                    os.path.join(self.origin_file_uri, file_name),
+                    self.destination_uri(file_name),
+                )
+                for file_name in file_names
+            ]
+            for transfer in transfers:
+                # raises the first failed transfer
+                transfer.result()
@@ -1,6 +1,7 @@
-from typing import Protocol, Sequence
+from typing import Mapping, Optional, Protocol, Sequence
 import inject
 from debussy_concert.core.config.config_composition import ConfigComposition
+from debussy_concert.core.entities.dependency_graph import DependencyGraph
 from debussy_concert.core.entities.protocols import PPhraseGroup
 from debussy_concert.core.motif.motif_base import PMotif
 from debussy_concert.core.service.workflow.protocol import PWorkflowService
@@ -21,11 +22,14 @@ class PhraseBase(PPhrase):
         config: ConfigComposition,
         workflow_service: PWorkflowService,
         motifs: Sequence[PMotif] = None,
-        name=None
+        name=None,
+        dependencies: Optional[Mapping[PMotif, Sequence[PMotif]]] = None
     ) -> None:
         self.name = name or self.__class__.__name__
         self.config = config
         self.motifs = motifs or list()
+        # motif -> motifs it depends on, the motifs are chained in order if None
+        self.dependencies = dependencies
         self.workflow_service = workflow_service
 
     def add_motif(self, motif):
@@ -38,9 +42,22 @@ class PhraseBase(PPhrase):
         phrase_group = self.workflow_service.phrase_group(
             group_id=self.name, workflow_dag=workflow_dag, movement_group=movement_group
         )
-        current_task = self.motifs[0].build(workflow_dag, phrase_group)
-        for motif in self.motifs[1:]:
-            motif_task = motif.build(workflow_dag, phrase_group)
-            current_task >> motif_task
-            current_task = motif_task
+        if self.dependencies is None:
+            # the usual chain needs no graph
+            current_task = self.motifs[0].build(workflow_dag, phrase_group)
+            for motif in self.motifs[1:]:
+                motif_task = motif.build(workflow_dag, phrase_group)
+                current_task >> motif_task
+                current_task = motif_task
+            return phrase_group
+        dependency_graph = self.dependency_graph
+        motif_tasks = {}
+        for motif in dependency_graph:
+            motif_tasks[motif] = motif.build(workflow_dag, phrase_group)
+        for upstream, downstream in dependency_graph.edges():
+            motif_tasks[upstream] >> motif_tasks[downstream]
         return phrase_group
+
+    @property
+    def dependency_graph(self) -> DependencyGraph:
+        return DependencyGraph(self.motifs, self.dependencies)
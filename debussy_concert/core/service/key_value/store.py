@@ -0,0 +1,166 @@
+"""
+Key value stores of the small strings kept between dag runs: the last extracted
+value (high-water mark) of incremental movements, the chunked transfer checkpoints
+and the query fingerprints and dry runs of the BigQuery jobs. They are used while
+the dag runs, so the provider hooks are only imported then.
+"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Optional, Protocol
+
+try:
+    import fcntl
+except ImportError:  # windows, without concurrent local runs
+    fcntl = None
+
+
+class PKeyValueStore(Protocol):
+    def get(self, key: str) -> Optional[str]:
+        pass
+
+    def set(self, key: str, value: str):
+        pass
+
+
+class LocalFileKeyValueStore(PKeyValueStore):
+    """All the keys in one json file, for local runs and tests"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _load(self) -> Dict[str, str]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as file:
+            return json.load(file)
+
+    def get(self, key):
+        return self._load().get(key)
+
+    @contextmanager
+    def _locked(self):
+        # the json file is replaced on every set, so the lock is on its own file;
+        # flock locks exclude the threads of a process too
+        with open(f"{self.path}.lock", "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def set(self, key, value):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._locked():
+            values = self._load()
+            values[key] = value
+            # write and rename so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=directory or ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as file:
+                    json.dump(values, file, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+
+class GcsKeyValueStore(PKeyValueStore):
+    """One object per key under the gs://bucket/prefix uri"""
+
+    def __init__(self, uri: str, gcp_conn_id="google_cloud_default"):
+        if not uri.startswith("gs://"):
+            raise ValueError(f"Invalid gcs uri: {uri}")
+        self.bucket, _, self.prefix = uri[len("gs://"):].partition("/")
+        self.gcp_conn_id = gcp_conn_id
+
+    def object_name(self, key):
+        return "/".join(part for part in (self.prefix.strip("/"), key) if part)
+
+    @property
+    def hook(self):
+        from airflow.providers.google.cloud.hooks.gcs import GCSHook
+
+        return GCSHook(gcp_conn_id=self.gcp_conn_id)
+
+    def get(self, key):
+        hook = self.hook
+        object_name = self.object_name(key)
+        if not hook.exists(self.bucket, object_name):
+            return None
+        return hook.download(self.bucket, object_name).decode("utf-8")
+
+    def set(self, key, value):
+        self.hook.upload(self.bucket, self.object_name(key), data=value)
+
+
+class BigQueryKeyValueStore(PKeyValueStore):
+    """(key, value, updated_at) rows of a BigQuery table, created on the first set"""
+
+    def __init__(self, table: str, gcp_conn_id="google_cloud_default"):
+        self.table = table
+        self.gcp_conn_id = gcp_conn_id
+
+    def _query(self, sql, key, value=None):
+        from airflow.providers.google.cloud.hooks.bigquery import BigQueryHook
+        from google.cloud import bigquery
+
+        client = BigQueryHook(
+            gcp_conn_id=self.gcp_conn_id, use_legacy_sql=False
+        ).get_client()
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("key", "STRING", key),
+                bigquery.ScalarQueryParameter("value", "STRING", value),
+            ]
+        )
+        return list(client.query(sql, job_config=job_config).result())
+
+    def get(self, key):
+        from google.api_core.exceptions import NotFound
+
+        try:
+            rows = self._query(
+                f"SELECT value FROM `{self.table}` WHERE key = @key "
+                "ORDER BY updated_at DESC LIMIT 1",
+                key,
+            )
+        except NotFound:
+            return None
+        return rows[0]["value"] if rows else None
+
+    def set(self, key, value):
+        self._query(
+            f"CREATE TABLE IF NOT EXISTS `{self.table}` "
+            "(key STRING, value STRING, updated_at TIMESTAMP);\n"
+            f"MERGE `{self.table}` T USING (SELECT @key AS key, @value AS value) S "
+            "ON T.key = S.key "
+            "WHEN MATCHED THEN UPDATE SET value = S.value, "
+            "updated_at = CURRENT_TIMESTAMP() "
+            "WHEN NOT MATCHED THEN INSERT (key, value, updated_at) "
+            "VALUES (S.key, S.value, CURRENT_TIMESTAMP())",
+            key,
+            value,
+        )
+
+
+KEY_VALUE_STORES = {
+    "local": lambda store, gcp_conn_id: LocalFileKeyValueStore(store["path"]),
+    "gcs": lambda store, gcp_conn_id: GcsKeyValueStore(store["uri"], gcp_conn_id),
+    "bigquery": lambda store, gcp_conn_id: BigQueryKeyValueStore(
+        store["table"], gcp_conn_id
+    ),
+}
+
+
+def key_value_store_from_dict(
+    store: Dict, gcp_conn_id="google_cloud_default"
+) -> PKeyValueStore:
+    store_type = store.get("type", "gcs")
+    factory = KEY_VALUE_STORES.get(store_type)
+    if factory is None:
+        raise NotImplementedError(
+            f"Invalid key value store: {store_type} not implemented"
+        )
+    return factory(store, gcp_conn_id)
@@ -1,6 +1,21 @@
 from debussy_concert.core.entities.table import BigQueryTable
 
 
+def split_gcs_uri(uri):
+    bucket, _, object_name = uri[len("gs://"):].partition("/")
+    return bucket, object_name
+
+
+def delete_gcs_prefix(uri_prefix, gcp_conn_id="google_cloud_default"):
+    """Deletes every object under uri_prefix, eg the shards of a previous extract"""
+    from airflow.providers.google.cloud.hooks.gcs import GCSHook
+
+    hook = GCSHook(gcp_conn_id=gcp_conn_id)
+    bucket, prefix = split_gcs_uri(uri_prefix)
+    for object_name in hook.list(bucket, prefix=prefix):
+        hook.delete(bucket, object_name)
+
+
 class GoogleCloudLakeHouseService:
     @staticmethod
     def get_table_schema(table: BigQueryTable):
@@ -20,3 +35,4 @@ class GoogleCloudLakeHouseService:
     @staticmethod
     def get_table_resource(table: BigQueryTable):
         return table.as_dict()
+
@@ -0,0 +1,624 @@
+"""
+Bulk loads of csv files from storage into rdbms tables. The file is streamed, so
+the worker never holds it, and the columns are mapped by the csv header. The rows
+are appended to the table, or loaded into a session scoped staging table and then
+merged into it by key (upsert) or swapped for its rows (replace). The native loads
+are LOAD DATA on mysql, COPY on postgresql and the bulk copy protocol with TABLOCK
+on sql server. The database drivers are only imported while the dag runs.
+"""
+import csv
+import errno
+import io
+import os
+import shutil
+import tempfile
+import threading
+from itertools import islice
+from typing import List, Optional
+
+from debussy_concert.core.service.storage.chunked import open_chunked
+
+DIALECTS = ("mysql", "postgresql", "mssql")
+WRITE_MODES = ("append", "replace", "upsert")
+# numbers the staging rows, so they are merged in batches of consecutive rows
+STAGING_ROW_COLUMN = "_staging_row"
+
+
+def quote_identifier(name, dialect):
+    if dialect == "mssql":
+        return "[" + name.replace("]", "]]") + "]"
+    quote = "`" if dialect == "mysql" else '"'
+    return quote + name.replace(quote, quote * 2) + quote
+
+
+def quote_table(table, dialect):
+    return ".".join(quote_identifier(part, dialect) for part in table.split("."))
+
+
+def sql_string(value, dialect):
+    if dialect == "mysql":
+        value = value.replace("\\", "\\\\")
+    return "'" + value.replace("'", "''") + "'"
+
+
+def read_header(stream, field_delimiter) -> List[str]:
+    line = stream.readline().decode("utf-8")
+    return next(csv.reader([line], delimiter=field_delimiter))
+
+
+def mysql_load_data(
+    connection, table, stream, columns, field_delimiter=",", commit=True
+):
+    """
+    LOAD DATA LOCAL INFILE of a named pipe fed with stream. The connection must
+    allow local_infile. Empty fields are loaded as NULL
+    """
+    directory = tempfile.mkdtemp()
+    fifo_path = os.path.join(directory, "bulk_load.csv")
+    os.mkfifo(fifo_path)
+    errors = []
+    stop = threading.Event()
+
+    def feed_fifo():
+        try:
+            while True:
+                try:
+                    fd = os.open(fifo_path, os.O_WRONLY | os.O_NONBLOCK)
+                    break
+                except OSError as error:
+                    if error.errno != errno.ENXIO:
+                        raise
+                    # no reader yet, unless the statement failed before opening it
+                    if stop.wait(0.05):
+                        return
+            os.set_blocking(fd, True)
+            with open(fd, "wb") as fifo:
+                shutil.copyfileobj(stream, fifo)
+        except Exception as error:  # reraised by the loading thread
+            errors.append(error)
+
+    writer = threading.Thread(target=feed_fifo, daemon=True)
+    writer.start()
+    variables = [f"@column_{index}" for index in range(len(columns))]
+    assignments = ", ".join(
+        f"{quote_identifier(column, 'mysql')} = NULLIF({variable}, '')"
+        for column, variable in zip(columns, variables)
+    )
+    sql = (
+        f"LOAD DATA LOCAL INFILE {sql_string(fifo_path, 'mysql')} "
+        f"INTO TABLE {quote_table(table, 'mysql')} CHARACTER SET utf8mb4 "
+        f"FIELDS TERMINATED BY {sql_string(field_delimiter, 'mysql')} "
+        "OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' LINES TERMINATED BY '\\n' "
+        f"({', '.join(variables)}) SET {assignments}"
+    )
+    try:
+        cursor = connection.cursor()
+        cursor.execute(sql)
+        if commit:
+            connection.commit()
+        rowcount = cursor.rowcount
+    finally:
+        stop.set()
+        writer.join()
+        shutil.rmtree(directory)
+    if errors:
+        raise errors[0]
+    return rowcount
+
+
+def postgresql_copy(
+    connection, table, stream, columns, field_delimiter=",", commit=True
+):
+    """COPY FROM STDIN with psycopg2 copy_expert or pg8000 stream"""
+    column_list = ", ".join(
+        quote_identifier(column, "postgresql") for column in columns
+    )
+    sql = (
+        f"COPY {quote_table(table, 'postgresql')} ({column_list}) FROM STDIN "
+        f"WITH (FORMAT csv, DELIMITER {sql_string(field_delimiter, 'postgresql')})"
+    )
+    cursor = connection.cursor()
+    if hasattr(cursor, "copy_expert"):
+        cursor.copy_expert(sql, stream)
+    else:
+        cursor.execute(sql, stream=stream)
+    if commit:
+        connection.commit()
+    return cursor.rowcount
+
+
+def csv_rows(stream, field_delimiter=","):
+    """Rows of the csv stream with empty fields as None"""
+    rows = csv.reader(
+        io.TextIOWrapper(stream, encoding="utf-8", newline=""),
+        delimiter=field_delimiter,
+    )
+    for row in rows:
+        yield [value if value != "" else None for value in row]
+
+
+def mssql_bulk_copy(
+    connection,
+    table,
+    stream,
+    columns,
+    field_delimiter=",",
+    batch_size=10000,
+    commit=True,
+):
+    """
+    pymssql bulk_copy with TABLOCK, batch_size rows per bulk batch. The csv columns
+    are mapped to the table columns by their position
+    """
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT TOP 0 * FROM {quote_table(table, 'mssql')}")
+    positions = {
+        column[0]: index + 1 for index, column in enumerate(cursor.description)
+    }
+    cursor.fetchall()
+    loaded = 0
+
+    def counted_rows():
+        nonlocal loaded
+        for row in csv_rows(stream, field_delimiter):
+            loaded += 1
+            yield tuple(row)
+
+    connection.bulk_copy(
+        quote_table(table, "mssql"),
+        counted_rows(),
+        column_ids=[positions[column] for column in columns],
+        batch_size=batch_size,
+        tablock=True,
+    )
+    if commit:
+        connection.commit()
+    return loaded
+
+
+def executemany_load(
+    connection,
+    table,
+    stream,
+    columns,
+    dialect,
+    field_delimiter=",",
+    batch_size=10000,
+    commit_interval=100000,
+    commit=True,
+):
+    """
+    Inserts batch_size rows per executemany, committing every commit_interval
+    rows unless commit is off
+    """
+    column_list = ", ".join(quote_identifier(column, dialect) for column in columns)
+    placeholders = ", ".join(["%s"] * len(columns))
+    sql = (
+        f"INSERT INTO {quote_table(table, dialect)} ({column_list}) "
+        f"VALUES ({placeholders})"
+    )
+    rows = csv_rows(stream, field_delimiter)
+    cursor = connection.cursor()
+    loaded = uncommitted = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        cursor.executemany(sql, batch)
+        loaded += len(batch)
+        uncommitted += len(batch)
+        if commit and uncommitted >= commit_interval:
+            connection.commit()
+            uncommitted = 0
+    if commit:
+        connection.commit()
+    return loaded
+
+
+def load_rows(
+    connection,
+    table,
+    stream,
+    columns,
+    dialect,
+    method="native",
+    field_delimiter=",",
+    batch_size=10000,
+    commit_interval=100000,
+    commit=True,
+):
+    """Loads the csv rows of stream, after its header, with the bulk load method"""
+    if method != "native":
+        return executemany_load(
+            connection,
+            table,
+            stream,
+            columns,
+            dialect,
+            field_delimiter,
+            batch_size,
+            commit_interval,
+            commit,
+        )
+    if dialect == "mssql":
+        return mssql_bulk_copy(
+            connection, table, stream, columns, field_delimiter, batch_size, commit
+        )
+    load = mysql_load_data if dialect == "mysql" else postgresql_copy
+    return load(connection, table, stream, columns, field_delimiter, commit)
+
+
+def create_table_like(cursor, table, copy, dialect, temporary=False, columns=None):
+    """Empty copy of the table columns, or of columns, plus the staging row number"""
+    source = quote_table(table, dialect)
+    target = quote_table(copy, dialect)
+    select = "*"
+    if columns:
+        select = ", ".join(quote_identifier(column, dialect) for column in columns)
+    if dialect == "mssql":
+        # temporary tables are named #copy, the union drops the identity property
+        cursor.execute(
+            f"SELECT TOP 0 {select} INTO {target} FROM {source} "
+            f"UNION ALL SELECT TOP 0 {select} FROM {source}"
+        )
+        # a heap, so parallel bulk copies with TABLOCK do not block each other
+        row_column = "BIGINT IDENTITY(1, 1) NOT NULL"
+        cursor.execute(f"ALTER TABLE {target} ADD {STAGING_ROW_COLUMN} {row_column}")
+        return
+    if dialect == "mysql":
+        create = "CREATE TEMPORARY TABLE" if temporary else "CREATE TABLE"
+        cursor.execute(f"{create} {target} SELECT {select} FROM {source} LIMIT 0")
+        row_column = "BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY"
+    else:
+        create = "CREATE TEMP TABLE" if temporary else "CREATE TABLE"
+        cursor.execute(f"{create} {target} AS SELECT {select} FROM {source} LIMIT 0")
+        row_column = "BIGSERIAL"
+    cursor.execute(
+        f"ALTER TABLE {target} ADD COLUMN {STAGING_ROW_COLUMN} {row_column}"
+    )
+
+
+def create_staging_table(
+    connection, table, dialect, columns=None, prefix="debussy_staging_"
+):
+    """Empty session scoped copy of table columns, plus the staging row number"""
+    name = prefix + table.split(".")[-1]
+    cursor = connection.cursor()
+    if dialect == "mysql":
+        # temporary tables live in the database of the table
+        staging = ".".join(table.split(".")[:-1] + [name])
+        cursor.execute(
+            f"DROP TEMPORARY TABLE IF EXISTS {quote_table(staging, dialect)}"
+        )
+    elif dialect == "mssql":
+        staging = f"#{name}"
+        cursor.execute(f"DROP TABLE IF EXISTS {quote_table(staging, dialect)}")
+    else:
+        staging = name
+        cursor.execute(f"DROP TABLE IF EXISTS pg_temp.{quote_table(staging, dialect)}")
+    create_table_like(cursor, table, staging, dialect, temporary=True, columns=columns)
+    connection.commit()
+    return staging
+
+
+def check_merge_key(connection, table, dialect, merge_key):
+    """
+    mysql upserts on any unique key of the table, so one of them must be merge_key
+    or the rows would be appended. SHOW INDEX also lists temporary tables, which
+    information_schema.statistics does not
+    """
+    if dialect != "mysql":
+        # on conflict fails without a matching key and merge joins on merge_key
+        return
+    cursor = connection.cursor()
+    cursor.execute(
+        f"SHOW INDEX FROM {quote_table(table, dialect)} WHERE Non_unique = 0"
+    )
+    unique_keys = {}
+    # Table, Non_unique, Key_name, Seq_in_index, Column_name
+    for row in cursor.fetchall():
+        unique_keys.setdefault(row[2], set()).add(row[4])
+    if set(merge_key) not in unique_keys.values():
+        raise ValueError(
+            f"merge_key {merge_key} is not the primary or a unique key of {table}"
+        )
+
+
+def upsert_statement(staging, table, columns, dialect, merge_key, condition=None):
+    """
+    Merge of the staging rows between two staging row numbers, and matching the
+    optional condition, into table
+    """
+
+    def quote(column):
+        return quote_identifier(column, dialect)
+
+    column_list = ", ".join(map(quote, columns))
+    updated = [column for column in columns if column not in merge_key]
+    insert = f"INSERT INTO {quote_table(table, dialect)} ({column_list}) SELECT "
+    source = (
+        f"FROM {quote_table(staging, dialect)} "
+        f"WHERE {STAGING_ROW_COLUMN} > %s AND {STAGING_ROW_COLUMN} <= %s"
+    )
+    if condition:
+        source += f" AND {condition}"
+    if dialect == "mysql":
+        # the duplicate key is the unique key of the table including merge_key
+        assignments = ", ".join(
+            f"{quote(column)} = VALUES({quote(column)})"
+            for column in updated or merge_key[:1]
+        )
+        # the rows are inserted in this order, so the last staged row wins
+        return (
+            f"{insert}{column_list} {source} ORDER BY {STAGING_ROW_COLUMN} "
+            f"ON DUPLICATE KEY UPDATE {assignments}"
+        )
+    if dialect == "mssql":
+        return mssql_merge_statement(staging, table, columns, merge_key, condition)
+    key_list = ", ".join(map(quote, merge_key))
+    assignments = ", ".join(
+        f"{quote(column)} = EXCLUDED.{quote(column)}" for column in updated
+    )
+    action = f"DO UPDATE SET {assignments}" if updated else "DO NOTHING"
+    # a statement can not update the same row twice, the last staged row wins
+    return (
+        f"{insert}DISTINCT ON ({key_list}) {column_list} {source} "
+        f"ORDER BY {key_list}, {STAGING_ROW_COLUMN} DESC "
+        f"ON CONFLICT ({key_list}) {action}"
+    )
+
+
+def mssql_merge_statement(staging, table, columns, merge_key, condition=None):
+    """MERGE of the last staged row of each key between two staging row numbers"""
+
+    def quote(column):
+        return quote_identifier(column, "mssql")
+
+    column_list = ", ".join(map(quote, columns))
+    key_list = ", ".join(map(quote, merge_key))
+    updated = [column for column in columns if column not in merge_key]
+    where = f"WHERE {STAGING_ROW_COLUMN} > %s AND {STAGING_ROW_COLUMN} <= %s"
+    if condition:
+        where += f" AND {condition}"
+    source = (
+        f"SELECT {column_list} FROM (SELECT {column_list}, ROW_NUMBER() OVER "
+        f"(PARTITION BY {key_list} ORDER BY {STAGING_ROW_COLUMN} DESC) AS _rank "
+        f"FROM {quote_table(staging, 'mssql')} {where}) AS ranked WHERE _rank = 1"
+    )
+    condition = " AND ".join(
+        f"target.{quote(column)} = source.{quote(column)}" for column in merge_key
+    )
+    update = ""
+    if updated:
+        assignments = ", ".join(
+            f"{quote(column)} = source.{quote(column)}" for column in updated
+        )
+        update = f"WHEN MATCHED THEN UPDATE SET {assignments} "
+    values = ", ".join(f"source.{quote(column)}" for column in columns)
+    # HOLDLOCK keeps concurrent merges from inserting the same key twice
+    return (
+        f"MERGE INTO {quote_table(table, 'mssql')} WITH (HOLDLOCK) AS target "
+        f"USING ({source}) AS source ON {condition} {update}"
+        f"WHEN NOT MATCHED THEN INSERT ({column_list}) VALUES ({values});"
+    )
+
+
+def merge_staging_table(
+    connection,
+    staging,
+    table,
+    columns,
+    dialect,
+    merge_key,
+    batch_size=10000,
+    shard_column=None,
+):
+    """
+    Upserts the staging rows batch_size rows per transaction. With shard_column
+    the shards are merged one after the other in its order, so the last shard of
+    a key wins whatever the staging row numbers, the rows staged without a shard
+    first
+    """
+    cursor = connection.cursor()
+    if dialect == "mssql":
+        # the staging heap is indexed once loaded, for the batch range scans
+        staging_table = quote_table(staging, dialect)
+        cursor.execute(f"DROP INDEX IF EXISTS staging_row ON {staging_table}")
+        cursor.execute(
+            f"CREATE CLUSTERED INDEX staging_row ON {staging_table} "
+            f"({STAGING_ROW_COLUMN})"
+        )
+    if shard_column is None:
+        cursor.execute(
+            f"SELECT MAX({STAGING_ROW_COLUMN}) FROM {quote_table(staging, dialect)}"
+        )
+        last_row = cursor.fetchone()[0] or 0
+        sql = upsert_statement(staging, table, columns, dialect, merge_key)
+        for first_row in range(0, last_row, batch_size):
+            cursor.execute(sql, (first_row, first_row + batch_size))
+            connection.commit()
+        return last_row
+    shard = f"COALESCE({quote_identifier(shard_column, dialect)}, -1)"
+    cursor.execute(
+        f"SELECT {shard}, MIN({STAGING_ROW_COLUMN}), MAX({STAGING_ROW_COLUMN}), "
+        f"COUNT(*) FROM {quote_table(staging, dialect)} GROUP BY {shard} "
+        f"ORDER BY {shard}"
+    )
+    shards = cursor.fetchall()
+    sql = upsert_statement(
+        staging, table, columns, dialect, merge_key, condition=f"{shard} = %s"
+    )
+    for shard_index, first_row, last_row, _ in shards:
+        for batch_row in range(first_row - 1, last_row, batch_size):
+            cursor.execute(sql, (batch_row, batch_row + batch_size, shard_index))
+            connection.commit()
+    return sum(row_count for *_, row_count in shards)
+
+
+def replace_from_staging(connection, staging, table, columns, dialect):
+    """Swaps the table rows for the staging rows in a single transaction"""
+    column_list = ", ".join(quote_identifier(column, dialect) for column in columns)
+    cursor = connection.cursor()
+    cursor.execute(f"DELETE FROM {quote_table(table, dialect)}")
+    cursor.execute(
+        f"INSERT INTO {quote_table(table, dialect)} ({column_list}) "
+        f"SELECT {column_list} FROM {quote_table(staging, dialect)}"
+    )
+    connection.commit()
+    return cursor.rowcount
+
+
+def delete_from_staging(connection, staging, table, dialect, key):
+    """Deletes the table rows with the keys of the staging rows"""
+    condition = " AND ".join(
+        f"target.{quote_identifier(column, dialect)} = "
+        f"staging.{quote_identifier(column, dialect)}"
+        for column in key
+    )
+    target = quote_table(table, dialect)
+    source = quote_table(staging, dialect)
+    if dialect == "postgresql":
+        sql = (
+            f"DELETE FROM {target} AS target USING {source} AS staging "
+            f"WHERE {condition}"
+        )
+    else:
+        sql = (
+            f"DELETE target FROM {target} AS target "
+            f"JOIN {source} AS staging ON {condition}"
+        )
+    cursor = connection.cursor()
+    cursor.execute(sql)
+    connection.commit()
+    return cursor.rowcount
+
+
+def rdbms_connection(dialect, rdbms_conn_id, local_infile=False):
+    if dialect == "mssql":
+        from airflow.providers.microsoft.mssql.hooks.mssql import MsSqlHook
+
+        return MsSqlHook(mssql_conn_id=rdbms_conn_id).get_conn()
+    from debussy_airflow.hooks.db_api_hook import (
+        MySqlConnectorHook,
+        PostgreSQLConnectorHook,
+    )
+
+    if dialect == "postgresql":
+        return PostgreSQLConnectorHook(rdbms_conn_id=rdbms_conn_id).get_conn()
+    hook = MySqlConnectorHook(rdbms_conn_id=rdbms_conn_id)
+    if not local_infile:
+        return hook.get_conn()
+    import MySQLdb
+
+    conn_config = hook._get_conn_config_mysql_client(
+        hook.get_connection(conn_id=rdbms_conn_id)
+    )
+    return MySQLdb.connect(local_infile=1, **conn_config)
+
+
+def bulk_load_csv(
+    storage_file_uri,
+    table,
+    dialect,
+    rdbms_conn_id,
+    method="native",
+    field_delimiter=",",
+    batch_size=10000,
+    commit_interval=100000,
+    storage_conn_id=None,
+    write_mode="append",
+    merge_key: Optional[List[str]] = None,
+    connection=None,
+):
+    """
+    Streams the csv file, with a header line, from storage into the table. upsert
+    merges batch_size staged rows per transaction on merge_key
+    """
+    if dialect not in DIALECTS:
+        raise NotImplementedError(f"Invalid rdbms dialect: {dialect}")
+    if write_mode not in WRITE_MODES:
+        raise ValueError(f"Invalid write_mode: {write_mode}")
+    if write_mode == "upsert" and not merge_key:
+        raise ValueError("upsert requires a merge_key")
+    native = method == "native"
+    own_connection = connection is None
+    if own_connection:
+        connection = rdbms_connection(
+            dialect, rdbms_conn_id, local_infile=native and dialect == "mysql"
+        )
+    try:
+        if write_mode == "upsert":
+            check_merge_key(connection, table, dialect, merge_key)
+        with open_chunked(storage_file_uri, storage_conn_id) as stream:
+            columns = read_header(stream, field_delimiter)
+            target = table
+            if write_mode != "append":
+                target = create_staging_table(connection, table, dialect)
+            loaded = load_rows(
+                connection,
+                target,
+                stream,
+                columns,
+                dialect,
+                method,
+                field_delimiter,
+                batch_size,
+                commit_interval,
+            )
+        if write_mode == "upsert":
+            return merge_staging_table(
+                connection, target, table, columns, dialect, merge_key, batch_size
+            )
+        if write_mode == "replace":
+            return replace_from_staging(connection, target, table, columns, dialect)
+        return loaded
+    finally:
+        if own_connection:
+            connection.close()
+
+
+def bulk_delete_csv(
+    storage_file_uri,
+    table,
+    dialect,
+    rdbms_conn_id,
+    key: List[str],
+    method="native",
+    field_delimiter=",",
+    batch_size=10000,
+    commit_interval=100000,
+    storage_conn_id=None,
+    connection=None,
+):
+    """
+    Deletes the table rows with the keys of the csv file, like the tombstones of a
+    snapshot diff, bulk loaded into a staging table of the key columns
+    """
+    if dialect not in DIALECTS:
+        raise NotImplementedError(f"Invalid rdbms dialect: {dialect}")
+    own_connection = connection is None
+    if own_connection:
+        connection = rdbms_connection(
+            dialect,
+            rdbms_conn_id,
+            local_infile=method == "native" and dialect == "mysql",
+        )
+    try:
+        with open_chunked(storage_file_uri, storage_conn_id) as stream:
+            columns = read_header(stream, field_delimiter)
+            staging = create_staging_table(connection, table, dialect, columns=key)
+            load_rows(
+                connection,
+                staging,
+                stream,
+                columns,
+                dialect,
+                method,
+                field_delimiter,
+                batch_size,
+                commit_interval,
+            )
+        return delete_from_staging(connection, staging, table, dialect, key)
+    finally:
+        if own_connection:
+            connection.close()
@@ -0,0 +1,332 @@
+"""
+Bulk load of a large export through several connections. The export is split in
+shards, the files of a sharded extract or row ranges of a single file, and each
+shard is loaded into a shared staging table by one of the pool connections, in
+its own transaction together with its ledger row, and retried on its own. Shard
+ids hold the version of their object, so a rerun skips the shards already in the
+ledger only when the export was not written again in between. Once every shard
+is staged, the rows are written to the table in the write mode, the only step
+visible to its readers. Upserted shards are staged with their index in the
+export and merged in that order, so the last row of a key wins as in a single
+connection load.
+"""
+import csv
+import io
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from debussy_concert.core.service.rdbms.bulk_load import (
+    DIALECTS,
+    STAGING_ROW_COLUMN,
+    WRITE_MODES,
+    check_merge_key,
+    create_staging_table,
+    create_table_like,
+    load_rows,
+    merge_staging_table,
+    quote_identifier,
+    quote_table,
+    rdbms_connection,
+    read_header,
+    replace_from_staging,
+)
+from debussy_concert.core.service.storage.chunked import (
+    chunked_storage_from_uri,
+    open_chunked,
+)
+
+logger = logging.getLogger(__name__)
+
+# shard id and a function opening the shard csv, header line included
+Shard = Tuple[str, Callable[[], io.BufferedIOBase]]
+# index in the export of the shard of each upserted staging row
+STAGING_SHARD_COLUMN = "_staging_shard"
+
+
+def file_shards(storage_uri, storage_conn_id=None) -> List[Shard]:
+    """One shard per file of the storage_uri folder"""
+    storage = chunked_storage_from_uri(storage_uri, storage_conn_id)
+    try:
+        versions = {uri: storage.version(uri) for uri in storage.list(storage_uri)}
+    finally:
+        storage.close()
+    return [
+        (f"{uri}@{version}", lambda uri=uri: open_chunked(uri, storage_conn_id))
+        for uri, version in versions.items()
+    ]
+
+
+def storage_version(storage_uri, storage_conn_id=None):
+    storage = chunked_storage_from_uri(storage_uri, storage_conn_id)
+    try:
+        return storage.version(storage_uri)
+    finally:
+        storage.close()
+
+
+def row_range_shards(
+    storage_uri, shard_rows, field_delimiter=",", storage_conn_id=None, version=""
+) -> Iterator[Shard]:
+    """
+    Shards of shard_rows rows of a single file, each under the file header. The
+    file is read once, a shard is held in memory until it is loaded
+    """
+    with open_chunked(storage_uri, storage_conn_id) as stream:
+        rows = csv.reader(
+            io.TextIOWrapper(stream, encoding="utf-8", newline=""),
+            delimiter=field_delimiter,
+        )
+        header = next(rows)
+        index = 0
+        while True:
+            batch = list(islice(rows, shard_rows))
+            if not batch:
+                return
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, delimiter=field_delimiter, lineterminator="\n")
+            writer.writerow(header)
+            writer.writerows(batch)
+            data = buffer.getvalue().encode("utf-8")
+            # the range size is part of the id, a rerun with another one starts over
+            shard_id = f"{storage_uri}@{version}#{shard_rows}:{index}"
+            yield shard_id, lambda data=data: io.BytesIO(data)
+            index += 1
+
+
+def staging_tables(table):
+    """Names of the shared staging table and of its ledger of loaded shards"""
+    parts = table.split(".")
+    staging = ".".join(parts[:-1] + [f"debussy_staging_{parts[-1]}"])
+    return staging, f"{staging}_shards"
+
+
+def prepare_staging_tables(connection, table, dialect, is_shard) -> set:
+    """
+    Returns the shards already loaded when the ledger only holds shards of this
+    export, else creates the staging tables anew, dropping the rows staged from
+    another one
+    """
+    staging, ledger = staging_tables(table)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"SELECT shard FROM {quote_table(ledger, dialect)}")
+        loaded = {row[0] for row in cursor.fetchall()}
+    except Exception:
+        # no ledger, no interrupted load
+        connection.rollback()
+        loaded = None
+    if loaded is not None and all(map(is_shard, loaded)):
+        return loaded
+    for name in (staging, ledger):
+        cursor.execute(f"DROP TABLE IF EXISTS {quote_table(name, dialect)}")
+    create_table_like(cursor, table, staging, dialect)
+    add_column = "ADD" if dialect == "mssql" else "ADD COLUMN"
+    cursor.execute(
+        f"ALTER TABLE {quote_table(staging, dialect)} {add_column} "
+        f"{quote_identifier(STAGING_SHARD_COLUMN, dialect)} BIGINT"
+    )
+    # within the primary key length limits of mysql utf8mb4 and sql server
+    cursor.execute(
+        f"CREATE TABLE {quote_table(ledger, dialect)} "
+        "(shard VARCHAR(700) NOT NULL PRIMARY KEY)"
+    )
+    connection.commit()
+    return set()
+
+
+def copy_shard(connection, shard_staging, staging, columns, dialect, index):
+    """Inserts the rows of the session staging table of a shard with its index"""
+    column_list = ", ".join(quote_identifier(column, dialect) for column in columns)
+    shard_column = quote_identifier(STAGING_SHARD_COLUMN, dialect)
+    connection.cursor().execute(
+        f"INSERT INTO {quote_table(staging, dialect)} ({column_list}, {shard_column}) "
+        f"SELECT {column_list}, %s FROM {quote_table(shard_staging, dialect)} "
+        f"ORDER BY {STAGING_ROW_COLUMN}",
+        (index,),
+    )
+
+
+def append_from_staging(connection, staging, ledger, table, columns, dialect):
+    """
+    Inserts the staging rows into table, emptying the staging tables in the same
+    transaction so a rerun never appends them twice
+    """
+    column_list = ", ".join(quote_identifier(column, dialect) for column in columns)
+    cursor = connection.cursor()
+    cursor.execute(
+        f"INSERT INTO {quote_table(table, dialect)} ({column_list}) "
+        f"SELECT {column_list} FROM {quote_table(staging, dialect)}"
+    )
+    appended = cursor.rowcount
+    for name in (staging, ledger):
+        cursor.execute(f"DELETE FROM {quote_table(name, dialect)}")
+    connection.commit()
+    return appended
+
+
+def parallel_bulk_load_csv(
+    storage_uri,
+    table,
+    dialect,
+    rdbms_conn_id,
+    method="native",
+    field_delimiter=",",
+    batch_size=10000,
+    commit_interval=100000,
+    storage_conn_id=None,
+    write_mode="append",
+    merge_key: Optional[List[str]] = None,
+    parallel_connections=4,
+    shard_rows=100000,
+    shard_retries=2,
+    connect: Optional[Callable] = None,
+):
+    """
+    Loads the csv files of the storage_uri folder, when it ends with /, or row
+    ranges of the storage_uri file through parallel_connections connections. A
+    failed shard is retried shard_retries times on a new connection. Upserted rows
+    staged by different shards are merged in the order of their shards
+    """
+    if dialect not in DIALECTS:
+        raise NotImplementedError(f"Invalid rdbms dialect: {dialect}")
+    if write_mode not in WRITE_MODES:
+        raise ValueError(f"Invalid write_mode: {write_mode}")
+    if write_mode == "upsert" and not merge_key:
+        raise ValueError("upsert requires a merge_key")
+    if connect is None:
+
+        def connect():
+            return rdbms_connection(
+                dialect,
+                rdbms_conn_id,
+                local_infile=method == "native" and dialect == "mysql",
+            )
+
+    if storage_uri.endswith("/"):
+        shards = file_shards(storage_uri, storage_conn_id)
+        shard_ids = {shard_id for shard_id, _ in shards}
+        is_shard = shard_ids.__contains__
+    else:
+        version = storage_version(storage_uri, storage_conn_id)
+        shards = row_range_shards(
+            storage_uri, shard_rows, field_delimiter, storage_conn_id, version
+        )
+        prefix = f"{storage_uri}@{version}#{shard_rows}:"
+
+        def is_shard(shard_id):
+            return shard_id.startswith(prefix)
+
+    staging, ledger = staging_tables(table)
+    local = threading.local()
+    connections = []
+    lock = threading.Lock()
+    # one shard at a time, so the staging rows of a shard are numbered contiguously
+    # and merged in few batches
+    copy_lock = threading.Lock()
+
+    def pool_connection(new=False):
+        if new or getattr(local, "connection", None) is None:
+            local.connection = connect()
+            with lock:
+                connections.append(local.connection)
+        return local.connection
+
+    def load_shard(index, shard_id, open_shard):
+        for attempt in range(shard_retries + 1):
+            connection = pool_connection(new=attempt > 0)
+            try:
+                target = staging
+                if write_mode == "upsert":
+                    # the bulk loads can not set the shard index of the rows
+                    target = create_staging_table(
+                        connection, table, dialect, prefix="debussy_shard_"
+                    )
+                with open_shard() as stream:
+                    columns = read_header(stream, field_delimiter)
+                    load_rows(
+                        connection,
+                        target,
+                        stream,
+                        columns,
+                        dialect,
+                        method,
+                        field_delimiter,
+                        batch_size,
+                        commit_interval,
+                        commit=False,
+                    )
+                if write_mode == "upsert":
+                    with copy_lock:
+                        copy_shard(connection, target, staging, columns, dialect, index)
+                connection.cursor().execute(
+                    f"INSERT INTO {quote_table(ledger, dialect)} (shard) VALUES (%s)",
+                    (shard_id,),
+                )
+                connection.commit()
+                return
+            except Exception:
+                logger.exception(f"Shard {shard_id} failed, attempt {attempt + 1}")
+                try:
+                    connection.rollback()
+                except Exception:
+                    # the connection is replaced on retry
+                    pass
+                if attempt == shard_retries:
+                    raise
+
+    main_connection = connect()
+    try:
+        if write_mode == "upsert":
+            check_merge_key(main_connection, table, dialect, merge_key)
+        loaded = prepare_staging_tables(main_connection, table, dialect, is_shard)
+        columns = None
+        with ThreadPoolExecutor(max_workers=parallel_connections) as pool:
+            pending = set()
+            for index, (shard_id, open_shard) in enumerate(shards):
+                if columns is None:
+                    with open_shard() as stream:
+                        columns = read_header(stream, field_delimiter)
+                if shard_id in loaded:
+                    continue
+                # bounds the row range shards held in memory
+                while len(pending) >= 2 * parallel_connections:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                pending.add(pool.submit(load_shard, index, shard_id, open_shard))
+            for future in pending:
+                future.result()
+        # every shard is staged, the barrier before the table is written
+        if columns is None:
+            # an empty export
+            result = 0
+        elif write_mode == "upsert":
+            result = merge_staging_table(
+                main_connection,
+                staging,
+                table,
+                columns,
+                dialect,
+                merge_key,
+                batch_size,
+                shard_column=STAGING_SHARD_COLUMN,
+            )
+        elif write_mode == "replace":
+            result = replace_from_staging(
+                main_connection, staging, table, columns, dialect
+            )
+        else:
+            result = append_from_staging(
+                main_connection, staging, ledger, table, columns, dialect
+            )
+        cursor = main_connection.cursor()
+        for name in (staging, ledger):
+            cursor.execute(f"DROP TABLE IF EXISTS {quote_table(name, dialect)}")
+        main_connection.commit()
+        return result
+    finally:
+        for connection in [main_connection, *connections]:
+            connection.close()
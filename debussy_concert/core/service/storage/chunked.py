@@ -0,0 +1,429 @@
+"""
+Storages read and written in chunks by the chunked transfer. Every chunk is an
+independent request, so the chunks of an object can be moved by several threads
+at once and an interrupted upload can be completed later from its recorded parts.
+The provider clients are only imported while the dag runs.
+"""
+import base64
+import hashlib
+import io
+import os
+import posixpath
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from debussy_concert.core.service.lakehouse.google_cloud import split_gcs_uri
+
+# gcs compose accepts up to 32 source objects per request
+COMPOSE_MAX_SOURCES = 32
+
+
+def md5_hex(data: bytes) -> str:
+    return hashlib.md5(data).hexdigest()
+
+
+class ChunkedStorage(ABC):
+    # the smallest chunk the upload accepts, but for the last one
+    min_chunk_size = 1
+
+    @abstractmethod
+    def size(self, uri) -> int:
+        pass
+
+    @abstractmethod
+    def read_chunk(self, uri, offset, length) -> bytes:
+        pass
+
+    @abstractmethod
+    def version(self, uri) -> str:
+        """Changes whenever the object at uri is written again"""
+
+    def list(self, uri_prefix) -> List[str]:
+        """Uris of the files directly under the uri_prefix folder, sorted"""
+        raise NotImplementedError(f"{type(self).__name__} can not list files")
+
+    @abstractmethod
+    def start_upload(self, uri, upload: Optional[Dict]) -> Dict:
+        """Starts an upload, or returns upload when resuming it"""
+
+    @abstractmethod
+    def upload_chunk(self, uri, upload, index, offset, data) -> Dict:
+        """Uploads one chunk and returns the part needed to complete the upload"""
+
+    @abstractmethod
+    def complete_upload(self, uri, upload, parts: List[Dict], size):
+        """Assembles the object from its parts, keeping the parts"""
+
+    def cleanup_upload(self, uri, upload, parts: List[Dict]):
+        """Removes the parts of a completed upload, safe to call again"""
+
+    def close(self):
+        """Closes the connections opened by the threads"""
+
+    def verify(self, uri, size, parts: List[Dict], chunk_size) -> bool:
+        """Reads the destination back, one chunk at a time, against the chunk md5s"""
+        if self.size(uri) != size:
+            return False
+        for index, part in enumerate(parts):
+            offset = index * chunk_size
+            length = min(chunk_size, size - offset)
+            if md5_hex(self.read_chunk(uri, offset, length)) != part["md5"]:
+                return False
+        return True
+
+
+class LocalChunkedStorage(ChunkedStorage):
+    """Local files, the chunks are written in place in a .part file"""
+
+    @staticmethod
+    def path(uri):
+        return uri[len("file://"):] if uri.startswith("file://") else uri
+
+    def size(self, uri):
+        return os.path.getsize(self.path(uri))
+
+    def version(self, uri):
+        stat = os.stat(self.path(uri))
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def read_chunk(self, uri, offset, length):
+        with open(self.path(uri), "rb") as file:
+            file.seek(offset)
+            return file.read(length)
+
+    def list(self, uri_prefix):
+        directory = self.path(uri_prefix)
+        return [
+            os.path.join(uri_prefix, name)
+            for name in sorted(os.listdir(directory))
+            if os.path.isfile(os.path.join(directory, name))
+        ]
+
+    def start_upload(self, uri, upload):
+        part_path = f"{self.path(uri)}.part"
+        if upload is None or not os.path.exists(part_path):
+            directory = os.path.dirname(part_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            open(part_path, "wb").close()
+            upload = {"part_path": part_path}
+        return upload
+
+    def upload_chunk(self, uri, upload, index, offset, data):
+        fd = os.open(upload["part_path"], os.O_WRONLY)
+        try:
+            os.pwrite(fd, data, offset)
+        finally:
+            os.close(fd)
+        return {}
+
+    def complete_upload(self, uri, upload, parts, size):
+        os.truncate(upload["part_path"], size)
+        os.replace(upload["part_path"], self.path(uri))
+
+
+class SftpChunkedStorage(ChunkedStorage):
+    """
+    sftp://path on the server of the connection. Each thread opens its own sftp
+    connection, so the chunks are moved over parallel channels
+    """
+
+    def __init__(self, sftp_conn_id):
+        self.sftp_conn_id = sftp_conn_id
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path(uri):
+        return uri[len("sftp://"):]
+
+    def new_connection(self):
+        from debussy_airflow.hooks.storage_hook import SFTPHook
+
+        return SFTPHook(self.sftp_conn_id).get_conn()
+
+    @property
+    def client(self):
+        if getattr(self._local, "connection", None) is None:
+            # the pysftp connection closes its sftp client once collected, it is
+            # kept until the storage is closed
+            self._local.connection = self.new_connection()
+            with self._lock:
+                self._connections.append(self._local.connection)
+        return self._local.connection.sftp_client
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def size(self, uri):
+        return self.client.stat(self.path(uri)).st_size
+
+    def version(self, uri):
+        attributes = self.client.stat(self.path(uri))
+        return f"{attributes.st_mtime}-{attributes.st_size}"
+
+    def read_chunk(self, uri, offset, length):
+        with self.client.open(self.path(uri), "rb") as file:
+            file.seek(offset)
+            return file.read(length)
+
+    def list(self, uri_prefix):
+        from stat import S_ISREG
+
+        return [
+            posixpath.join(uri_prefix, attributes.filename)
+            for attributes in sorted(
+                self.client.listdir_attr(self.path(uri_prefix)),
+                key=lambda attributes: attributes.filename,
+            )
+            if S_ISREG(attributes.st_mode)
+        ]
+
+    def start_upload(self, uri, upload):
+        part_path = f"{self.path(uri)}.part"
+        try:
+            exists = upload is not None and self.client.stat(part_path)
+        except IOError:
+            exists = False
+        if not exists:
+            with self.client.open(part_path, "wb"):
+                pass
+            upload = {"part_path": part_path}
+        return upload
+
+    def upload_chunk(self, uri, upload, index, offset, data):
+        with self.client.open(upload["part_path"], "r+b") as file:
+            file.seek(offset)
+            file.write(data)
+        return {}
+
+    def complete_upload(self, uri, upload, parts, size):
+        self.client.truncate(upload["part_path"], size)
+        self.client.posix_rename(upload["part_path"], self.path(uri))
+
+
+class GcsChunkedStorage(ChunkedStorage):
+    """
+    gs://bucket/object uploaded as md5 validated part objects, composed into the
+    object on the server side
+    """
+
+    def __init__(self, gcp_conn_id="google_cloud_default"):
+        self.gcp_conn_id = gcp_conn_id
+
+    @property
+    def hook(self):
+        from airflow.providers.google.cloud.hooks.gcs import GCSHook
+
+        return GCSHook(gcp_conn_id=self.gcp_conn_id)
+
+    def blob(self, uri):
+        bucket, object_name = split_gcs_uri(uri)
+        return self.hook.get_conn().bucket(bucket).blob(object_name)
+
+    def size(self, uri):
+        blob = self.blob(uri)
+        blob.reload()
+        return blob.size
+
+    def version(self, uri):
+        blob = self.blob(uri)
+        blob.reload()
+        return str(blob.generation)
+
+    def read_chunk(self, uri, offset, length):
+        if length == 0:
+            return b""
+        return self.blob(uri).download_as_bytes(start=offset, end=offset + length - 1)
+
+    def list(self, uri_prefix):
+        bucket, prefix = split_gcs_uri(uri_prefix.rstrip("/") + "/")
+        objects = self.hook.list(bucket, prefix=prefix, delimiter="/")
+        return [f"gs://{bucket}/{name}" for name in sorted(objects) if name != prefix]
+
+    def start_upload(self, uri, upload):
+        return upload or {"parts_uri": f"{uri}.parts/"}
+
+    def upload_chunk(self, uri, upload, index, offset, data):
+        part_uri = f"{upload['parts_uri']}{index:06}"
+        blob = self.blob(part_uri)
+        # gcs rejects the upload when the data does not match the md5
+        blob.md5_hash = base64.b64encode(hashlib.md5(data).digest()).decode()
+        blob.upload_from_string(data)
+        return {"part_uri": part_uri}
+
+    def complete_upload(self, uri, upload, parts, size):
+        hook = self.hook
+        bucket, destination = split_gcs_uri(uri)
+        sources = [split_gcs_uri(part["part_uri"])[1] for part in parts]
+        hook.compose(bucket, sources[:COMPOSE_MAX_SOURCES], destination)
+        step = COMPOSE_MAX_SOURCES - 1
+        for i in range(COMPOSE_MAX_SOURCES, len(sources), step):
+            hook.compose(bucket, [destination, *sources[i:i + step]], destination)
+
+    def cleanup_upload(self, uri, upload, parts):
+        from google.api_core.exceptions import NotFound
+
+        hook = self.hook
+        for part in parts:
+            bucket, source = split_gcs_uri(part["part_uri"])
+            try:
+                hook.delete(bucket, source)
+            except NotFound:
+                # deleted by an interrupted cleanup
+                pass
+
+    def verify(self, uri, size, parts, chunk_size):
+        # the parts were md5 validated on upload and compose is server side
+        return self.size(uri) == size
+
+
+class S3ChunkedStorage(ChunkedStorage):
+    """s3://bucket/key uploaded as a multipart upload"""
+
+    # s3 multipart parts but the last one are at least 5 MiB
+    min_chunk_size = 5 * 2**20
+
+    def __init__(self, aws_conn_id="aws_default"):
+        self.aws_conn_id = aws_conn_id
+        self._local = threading.local()
+
+    @staticmethod
+    def split_uri(uri):
+        bucket, _, key = uri[len("s3://"):].partition("/")
+        return bucket, key
+
+    @property
+    def client(self):
+        if getattr(self._local, "client", None) is None:
+            from airflow.providers.amazon.aws.hooks.s3 import S3Hook
+
+            self._local.client = S3Hook(aws_conn_id=self.aws_conn_id).get_conn()
+        return self._local.client
+
+    def size(self, uri):
+        bucket, key = self.split_uri(uri)
+        return self.client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+
+    def version(self, uri):
+        bucket, key = self.split_uri(uri)
+        return self.client.head_object(Bucket=bucket, Key=key)["ETag"].strip('"')
+
+    def read_chunk(self, uri, offset, length):
+        if length == 0:
+            return b""
+        bucket, key = self.split_uri(uri)
+        response = self.client.get_object(
+            Bucket=bucket, Key=key, Range=f"bytes={offset}-{offset + length - 1}"
+        )
+        return response["Body"].read()
+
+    def list(self, uri_prefix):
+        bucket, prefix = self.split_uri(uri_prefix.rstrip("/") + "/")
+        pages = self.client.get_paginator("list_objects_v2").paginate(
+            Bucket=bucket, Prefix=prefix, Delimiter="/"
+        )
+        keys = [item["Key"] for page in pages for item in page.get("Contents", [])]
+        return [f"s3://{bucket}/{key}" for key in sorted(keys) if key != prefix]
+
+    def start_upload(self, uri, upload):
+        if upload is not None:
+            return upload
+        bucket, key = self.split_uri(uri)
+        response = self.client.create_multipart_upload(Bucket=bucket, Key=key)
+        return {"upload_id": response["UploadId"]}
+
+    def upload_chunk(self, uri, upload, index, offset, data):
+        bucket, key = self.split_uri(uri)
+        response = self.client.upload_part(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload["upload_id"],
+            PartNumber=index + 1,
+            Body=data,
+            # s3 rejects the part when the data does not match the md5
+            ContentMD5=base64.b64encode(hashlib.md5(data).digest()).decode(),
+        )
+        return {"etag": response["ETag"]}
+
+    def complete_upload(self, uri, upload, parts, size):
+        from botocore.exceptions import ClientError
+
+        bucket, key = self.split_uri(uri)
+        try:
+            self.client.complete_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload["upload_id"],
+                MultipartUpload={
+                    "Parts": [
+                        {"PartNumber": index + 1, "ETag": part["etag"]}
+                        for index, part in enumerate(parts)
+                    ]
+                },
+            )
+        except ClientError as error:
+            # completed before the worker restarted, when the object is this upload
+            completed = error.response.get("Error", {}).get("Code") == "NoSuchUpload"
+            if not (completed and self.verify(uri, size, parts, None)):
+                raise
+
+    def verify(self, uri, size, parts, chunk_size):
+        # multipart etag is the md5 of the part md5s followed by the part count
+        bucket, key = self.split_uri(uri)
+        head = self.client.head_object(Bucket=bucket, Key=key)
+        digests = b"".join(bytes.fromhex(part["md5"]) for part in parts)
+        etag = f'"{md5_hex(digests)}-{len(parts)}"'
+        return head["ContentLength"] == size and head["ETag"] == etag
+
+
+def chunked_storage_from_uri(uri, conn_id=None) -> ChunkedStorage:
+    if uri.startswith("gs://"):
+        return GcsChunkedStorage(conn_id or "google_cloud_default")
+    if uri.startswith("s3://"):
+        return S3ChunkedStorage(conn_id or "aws_default")
+    if uri.startswith("sftp://"):
+        return SftpChunkedStorage(conn_id)
+    if "://" in uri and not uri.startswith("file://"):
+        raise NotImplementedError(f"Invalid chunked storage uri: {uri}")
+    return LocalChunkedStorage()
+
+
+class ChunkedReader(io.RawIOBase):
+    """Sequential file object over the ranged reads of a chunked storage"""
+
+    def __init__(self, storage: ChunkedStorage, uri, chunk_size):
+        self.storage = storage
+        self.uri = uri
+        self.chunk_size = chunk_size
+        self.size = storage.size(uri)
+        self.offset = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        length = min(len(buffer), self.chunk_size, self.size - self.offset)
+        if length <= 0:
+            return 0
+        data = self.storage.read_chunk(self.uri, self.offset, length)
+        buffer[: len(data)] = data
+        self.offset += len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self.storage.close()
+        super().close()
+
+
+def open_chunked(uri, conn_id=None, chunk_size=8 * 2**20) -> io.BufferedReader:
+    """Streams uri holding at most chunk_size bytes in memory"""
+    reader = ChunkedReader(chunked_storage_from_uri(uri, conn_id), uri, chunk_size)
+    return io.BufferedReader(reader, buffer_size=chunk_size)
@@ -0,0 +1,152 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from debussy_concert.core.service.storage.chunked import (
+    chunked_storage_from_uri,
+    md5_hex,
+)
+from debussy_concert.core.service.key_value.store import key_value_store_from_dict
+
+logger = logging.getLogger(__name__)
+
+
+def chunked_transfer(
+    origin_uri,
+    destination_uri,
+    origin_conn_id=None,
+    destination_conn_id=None,
+    chunk_size=64 * 2**20,
+    parallelism=4,
+    checkpoint: Optional[Dict] = None,
+    checkpoint_key=None,
+    checkpoint_every=16,
+    checkpoint_seconds=60,
+    verify=True,
+    gcp_conn_id="google_cloud_default",
+):
+    """
+    Copies origin_uri to destination_uri in chunk_size chunks, parallelism chunks
+    at a time. The uploaded chunks are saved under checkpoint_key in the checkpoint
+    store every checkpoint_every chunks or checkpoint_seconds seconds, and when the
+    transfer stops, and only the missing chunks of an interrupted transfer of the
+    same object are moved again. The checkpoint records the completed upload
+    before its parts are removed, so a transfer interrupted then only cleans up
+    """
+    origin = chunked_storage_from_uri(origin_uri, origin_conn_id)
+    destination = chunked_storage_from_uri(destination_uri, destination_conn_id)
+    try:
+        size = origin.size(origin_uri)
+        offsets = range(0, size, chunk_size) if size else [0]
+        if len(offsets) > 1 and chunk_size < destination.min_chunk_size:
+            raise ValueError(
+                f"chunk_size of {destination_uri} must be at least "
+                f"{destination.min_chunk_size} bytes"
+            )
+
+        store = checkpoint and key_value_store_from_dict(checkpoint, gcp_conn_id)
+        key = checkpoint_key or "chunked_transfer/" + md5_hex(
+            f"{origin_uri}>{destination_uri}".encode()
+        )
+        # the checkpoint is only valid for the same version of the object, split the
+        # same way: a rewritten origin would leave stale chunks behind
+        identity = {
+            "origin_uri": origin_uri,
+            "origin_version": origin.version(origin_uri),
+            "size": size,
+            "chunk_size": chunk_size,
+        }
+        state = store and json.loads(store.get(key) or "{}")
+        if not state or {name: state.get(name) for name in identity} != identity:
+            state = {**identity, "upload": None, "parts": {}}
+        lock = threading.Lock()
+        save_lock = threading.Lock()
+        # state changes, and the last one saved, so a slow save of an older state
+        # never overwrites a newer one
+        revisions = {"changed": 0, "saved": 0, "saved_at": time.monotonic()}
+
+        def save():
+            if not store:
+                return
+            with lock:
+                revisions["changed"] += 1
+                revision = revisions["changed"]
+                value = json.dumps(state, sort_keys=True)
+            # outside of lock, the other chunks keep recording their parts
+            with save_lock:
+                if revision > revisions["saved"]:
+                    store.set(key, value)
+                    revisions.update(saved=revision, saved_at=time.monotonic())
+
+        def ordered_parts():
+            return [state["parts"][str(index)] for index in range(len(offsets))]
+
+        if not state.get("completed"):
+            upload = destination.start_upload(destination_uri, state["upload"])
+            if upload != state["upload"]:
+                # a new upload, the parts of the previous one are gone
+                state.update(upload=upload, parts={})
+            save()
+
+            def transfer_chunk(index, offset):
+                length = min(chunk_size, size - offset)
+                data = origin.read_chunk(origin_uri, offset, length)
+                if len(data) != length:
+                    raise IOError(f"Short read of {origin_uri} at {offset}")
+                md5 = md5_hex(data)
+                part = destination.upload_chunk(
+                    destination_uri, state["upload"], index, offset, data
+                )
+                with lock:
+                    state["parts"][str(index)] = {"md5": md5, **part}
+                    revisions["changed"] += 1
+                    unsaved = revisions["changed"] - revisions["saved"]
+                    elapsed = time.monotonic() - revisions["saved_at"]
+                    due = unsaved >= checkpoint_every or elapsed >= checkpoint_seconds
+                if due:
+                    save()
+
+            pending = [
+                (index, offset)
+                for index, offset in enumerate(offsets)
+                if str(index) not in state["parts"]
+            ]
+            logger.info(
+                f"chunked_transfer - {len(pending)} of {len(offsets)} chunks of "
+                f"{origin_uri} to {destination_uri}"
+            )
+            try:
+                with ThreadPoolExecutor(max_workers=parallelism) as pool:
+                    transfers = [
+                        pool.submit(transfer_chunk, *chunk) for chunk in pending
+                    ]
+                    for transfer in transfers:
+                        # raises the first failed chunk, the others are saved below
+                        transfer.result()
+            finally:
+                save()
+
+            destination.complete_upload(
+                destination_uri, state["upload"], ordered_parts(), size
+            )
+            # a restart from here on only cleans up, the parts may already be gone
+            state["completed"] = True
+            save()
+
+        parts = ordered_parts()
+        destination.cleanup_upload(destination_uri, state["upload"], parts)
+        verified = not verify or destination.verify(
+            destination_uri, size, parts, chunk_size
+        )
+        if store:
+            # the object is complete or corrupt, a new run starts over
+            store.set(key, "")
+        if not verified:
+            raise ValueError(f"Checksum mismatch of {destination_uri}")
+        return {"size": size, "chunks": len(offsets)}
+    finally:
+        origin.close()
+        destination.close()
@@ -0,0 +1,62 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from yaml_env_var_parser import load as yaml_load
+
+from debussy_concert.core.config.config_cache import referenced_env_vars
+from debussy_concert.core.entities.table import BigQueryTable
+
+# (mtime and size, referenced env var names, their values, table)
+RegistryEntry = Tuple[
+    Tuple[int, int], Tuple[str, ...], Tuple[Optional[str], ...], BigQueryTable
+]
+
+
+class BigQueryTableRegistry:
+    """
+    Process wide registry of table definitions loaded from files.
+    Each file is parsed once and the same BigQueryTable instance is returned to every
+    caller while the file mtime and size, and the values of the env vars it
+    references, are unchanged
+    """
+
+    def __init__(self) -> None:
+        self._tables: Dict[str, RegistryEntry] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def file_stamp(file_path: str) -> Tuple[int, int]:
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def env_var_values(env_var_names: Tuple[str, ...]) -> Tuple[Optional[str], ...]:
+        # replaced while parsing, eg: the project exported by the composition config
+        return tuple(os.environ.get(name) for name in env_var_names)
+
+    def load_from_file(self, file_path: str) -> BigQueryTable:
+        file_path = os.path.abspath(file_path)
+        stamp = self.file_stamp(file_path)
+        with self._lock:
+            cached = self._tables.get(file_path)
+            if cached is not None:
+                cached_stamp, env_var_names, env_var_values, table = cached
+                if cached_stamp == stamp and env_var_values == self.env_var_values(
+                    env_var_names
+                ):
+                    return table
+            with open(file_path) as file:
+                content = file.read()
+            env_var_names = tuple(referenced_env_vars(content))
+            env_var_values = self.env_var_values(env_var_names)
+            table = BigQueryTable.load_from_dict(yaml_load(content))
+            self._tables[file_path] = (stamp, env_var_names, env_var_values, table)
+        return table
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+
+
+bigquery_table_registry = BigQueryTableRegistry()
@@ -21,6 +21,14 @@ from debussy_concert.pipeline.data_ingestion.motif.load_table import (
 from debussy_concert.pipeline.data_ingestion.motif.create_update_table_schema import (
     CreateBigQueryTableMotif,
 )
+from debussy_concert.pipeline.data_ingestion.motif.watermark import (
+    AdvanceWatermarkMotif,
+    ReadWatermarkMotif,
+)
+from debussy_concert.pipeline.data_ingestion.phrase.watermark import (
+    AdvanceWatermarkPhrase,
+    ReadWatermarkPhrase,
+)
 
 
 class DataIngestionBase(CompositionBase):
@@ -42,6 +50,9 @@ class DataIngestionBase(CompositionBase):
             )
         )
         end_phrase = EndPhrase()
+        read_watermark_phrase, advance_watermark_phrase = self.watermark_phrases(
+            movement_parameters
+        )
 
         name = f"DataIngestionMovement_{movement_parameters.name}"
         movement = DataIngestionMovement(
@@ -51,6 +62,8 @@ class DataIngestionBase(CompositionBase):
             ingestion_source_to_raw_vault_storage_phrase=ingestion_to_raw_vault_phrase,
             raw_vault_storage_to_data_warehouse_raw_phrase=gcs_raw_vault_to_bigquery_raw_phrase,
             end_phrase=end_phrase,
+            read_watermark_phrase=read_watermark_phrase,
+            advance_watermark_phrase=advance_watermark_phrase,
         )
         movement.setup(movement_parameters)
         return movement
@@ -107,3 +120,22 @@ class DataIngestionBase(CompositionBase):
             create_table_motif=create_table_motif
         )
         return create_or_update_table_phrase
+
+    def watermark_phrases(
+        self, movement_parameters: TimePartitionedDataIngestionMovementParameters
+    ):
+        watermark = getattr(movement_parameters, "watermark", None)
+        if watermark is None:
+            return None, None
+        gcp_conn_id = self.config.environment.data_lakehouse_connection_id
+        read_watermark_phrase = ReadWatermarkPhrase(
+            read_watermark_motif=ReadWatermarkMotif(
+                watermark=watermark, gcp_conn_id=gcp_conn_id
+            )
+        )
+        advance_watermark_phrase = AdvanceWatermarkPhrase(
+            advance_watermark_motif=AdvanceWatermarkMotif(
+                watermark=watermark, gcp_conn_id=gcp_conn_id
+            )
+        )
+        return read_watermark_phrase, advance_watermark_phrase
@@ -37,6 +37,9 @@ class BigQueryIngestionComposition(DataIngestionBase):
             gcs_partition=gcs_partition,
             extraction_query=movement_parameters.extraction_query,
             gcp_conn_id=movement_parameters.extract_connection_id,
+            query_budget=movement_parameters.query_budget,
+            skip_if_unchanged=movement_parameters.skip_if_unchanged,
+            fingerprint_key=f"{self.config.name}/{movement_parameters.name}",
         )
         ingestion_to_raw_vault_phrase = IngestionSourceToRawVaultStoragePhrase(
             export_data_to_storage_motif=export_motif
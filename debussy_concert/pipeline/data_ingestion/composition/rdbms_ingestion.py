@@ -16,6 +16,8 @@ from debussy_concert.pipeline.data_ingestion.phrase.ingestion_to_raw_vault impor
 )
 from debussy_concert.pipeline.data_ingestion.motif.export_table import (
     DataprocExportRdbmsTableToGcsMotif,
+    DataprocRdbmsClusterMotif,
+    DataprocServerlessRdbmsBatchMotif,
     DataprocServerlessExportRdbmsTableToGcsMotif,
 )
 
@@ -31,6 +33,43 @@ class RdbmsIngestionComposition(DataIngestionBase):
         self.dataproc_main_python_file_uri = (
             f"{pyspark_scripts_uri}/jdbc-to-gcs/jdbc_to_gcs.py"
         )
+        self.dataproc_hash_key_main_python_file_uri = (
+            f"{pyspark_scripts_uri}/jdbc-to-gcs/jdbc_to_gcs_hash_key.py"
+        )
+        self.dataproc_manifest_main_python_file_uri = (
+            f"{pyspark_scripts_uri}/jdbc-to-gcs/jdbc_to_gcs_manifest.py"
+        )
+        # helpers imported by every jdbc-to-gcs script, shipped with their jobs
+        self.dataproc_common_python_file_uri = (
+            f"{pyspark_scripts_uri}/jdbc-to-gcs/jdbc_common.py"
+        )
+        self.shared_dataproc_cluster = None
+        self.shared_dataproc_batch = None
+        self.setup_dataproc_scope()
+
+    def setup_dataproc_scope(self):
+        """With the composition scope all the movements share a cluster or batch"""
+        dataproc_scope = self.config.dataproc_config.get("scope", "movement")
+        if dataproc_scope == "movement":
+            return
+        if dataproc_scope != "composition":
+            raise NotImplementedError(
+                f"Invalid dataproc scope: {dataproc_scope} not implemented"
+            )
+        if self.config.dataproc_config.get("type", "managed") == "serverless":
+            self.shared_dataproc_batch = DataprocServerlessRdbmsBatchMotif(
+                name="shared_dataproc_serverless",
+                main_python_file_uri=self.dataproc_manifest_main_python_file_uri,
+                python_file_uris=[
+                    self.dataproc_common_python_file_uri,
+                    self.dataproc_main_python_file_uri,
+                    self.dataproc_hash_key_main_python_file_uri,
+                ],
+            )
+        else:
+            self.shared_dataproc_cluster = DataprocRdbmsClusterMotif(
+                name="shared_dataproc_cluster"
+            )
 
     def auto_play(self):
         rdbms_builder_fn = self.rdbms_builder_fn()
@@ -123,6 +162,14 @@ class RdbmsIngestionComposition(DataIngestionBase):
         )
         return ingestion_to_raw_vault_phrase
 
+    def main_python_file_uri(
+        self, movement_parameters: RdbmsDataIngestionMovementParameters
+    ):
+        # only the hash key script takes the hash key configuration
+        if movement_parameters.hash_key is not None:
+            return self.dataproc_hash_key_main_python_file_uri
+        return self.dataproc_main_python_file_uri
+
     def dataproc_managed_export_rdbms_table_to_gcs(
         self,
         jdbc_driver,
@@ -134,7 +181,9 @@ class RdbmsIngestionComposition(DataIngestionBase):
             gcs_partition=movement_parameters.data_partitioning.gcs_partition_schema,
             jdbc_driver=jdbc_driver,
             jdbc_url=jdbc_url,
-            main_python_file_uri=self.dataproc_main_python_file_uri,
+            main_python_file_uri=self.main_python_file_uri(movement_parameters),
+            python_file_uris=[self.dataproc_common_python_file_uri],
+            shared_cluster=self.shared_dataproc_cluster,
         )
 
     def dataproc_serverless_export_rdbms_table_to_gcs(
@@ -148,5 +197,7 @@ class RdbmsIngestionComposition(DataIngestionBase):
             gcs_partition=movement_parameters.data_partitioning.gcs_partition_schema,
             jdbc_driver=jdbc_driver,
             jdbc_url=jdbc_url,
-            main_python_file_uri=self.dataproc_main_python_file_uri,
+            main_python_file_uri=self.main_python_file_uri(movement_parameters),
+            python_file_uris=[self.dataproc_common_python_file_uri],
+            shared_batch=self.shared_dataproc_batch,
         )
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 from yaml_env_var_parser import load as yaml_load
 
 from debussy_concert.core.config.config_environment import ConfigEnvironment
@@ -11,6 +12,8 @@ from debussy_concert.pipeline.data_ingestion.config.movement_parameters.bigquery
 
 @dataclass(frozen=True)
 class ConfigBigQueryDataIngestion(ConfigDataIngestionBase):
+    bigquery_config: Optional[dict] = None
+
     @classmethod
     def load_from_file(cls, composition_config_file_path, env_file_path):
 
@@ -1,6 +1,12 @@
 from dataclasses import dataclass
+from typing import Optional
+from debussy_concert.core.config.movement_parameters.query_budget import QueryBudget
+from debussy_concert.core.config.movement_parameters.skip_unchanged import (
+    SkipIfUnchanged,
+)
 from debussy_concert.pipeline.data_ingestion.config.movement_parameters.time_partitioned import (
     TimePartitionedDataIngestionMovementParameters,
+    Watermark,
 )
 
 
@@ -9,3 +15,14 @@ class BigQueryDataIngestionMovementParameters(
     TimePartitionedDataIngestionMovementParameters
 ):
     extraction_query: str
+    watermark: Optional[Watermark] = None
+    query_budget: Optional[QueryBudget] = None
+    skip_if_unchanged: Optional[SkipIfUnchanged] = None
+
+    def __post_init__(self):
+        super().__post_init__()
+        if isinstance(self.query_budget, dict):
+            object.__setattr__(self, "query_budget", QueryBudget(**self.query_budget))
+        if isinstance(self.skip_if_unchanged, dict):
+            skip_if_unchanged = SkipIfUnchanged(**self.skip_if_unchanged)
+            object.__setattr__(self, "skip_if_unchanged", skip_if_unchanged)
@@ -1,14 +1,152 @@
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Union
 from debussy_concert.pipeline.data_ingestion.config.movement_parameters.time_partitioned import (
     TimePartitionedDataIngestionMovementParameters,
+    Watermark,
 )
 
 
+@dataclass(frozen=True)
+class JdbcReadOptions:
+    """
+    Parallel jdbc read of the extraction query, either split in num_partitions
+    ranges of partition_column between the bounds or one partition per predicate.
+    Without bounds the script probes MIN/MAX/COUNT of partition_column and uses
+    up to num_partitions partitions of about rows_per_partition rows.
+    max_connections caps the concurrent connections opened on the source database
+    """
+
+    partition_column: Optional[str] = None
+    lower_bound: Optional[Union[int, str]] = None
+    upper_bound: Optional[Union[int, str]] = None
+    num_partitions: Optional[int] = None
+    fetchsize: Optional[int] = None
+    predicates: Optional[List[str]] = None
+    max_connections: Optional[int] = None
+    rows_per_partition: int = 1_000_000
+
+    def __post_init__(self):
+        if self.partition_column is not None and self.predicates:
+            raise ValueError("Use either partition_column or predicates, not both!")
+        if (self.lower_bound is None) != (self.upper_bound is None):
+            raise ValueError("Set both lower_bound and upper_bound, or none of them")
+
+    @property
+    def discover_bounds(self) -> bool:
+        return self.partition_column is not None and self.lower_bound is None
+
+    def spark_options(
+        self,
+        default_num_partitions: Optional[int] = None,
+        default_max_connections: Optional[int] = None,
+    ) -> Dict:
+        """Spark jdbc reader options, predicates are sent in the predicates key"""
+        max_connections = self.max_connections or default_max_connections
+        options = {}
+        if self.fetchsize is not None:
+            options["fetchsize"] = self.fetchsize
+        if self.partition_column is not None:
+            num_partitions = self.num_partitions or default_num_partitions or 1
+            if max_connections:
+                num_partitions = min(num_partitions, max_connections)
+            options["partitionColumn"] = self.partition_column
+            options["numPartitions"] = num_partitions
+            if self.discover_bounds:
+                # not a spark option, the script uses it to choose numPartitions
+                options["rowsPerPartition"] = self.rows_per_partition
+            else:
+                options["lowerBound"] = self.lower_bound
+                options["upperBound"] = self.upper_bound
+        elif self.predicates:
+            options["predicates"] = self.capped_predicates(max_connections)
+        return options
+
+    def capped_predicates(self, max_connections: Optional[int]) -> List[str]:
+        if not max_connections or len(self.predicates) <= max_connections:
+            return list(self.predicates)
+        # every partition opens a connection, so predicates are OR-ed together
+        return [
+            " OR ".join(
+                f"({predicate})" for predicate in self.predicates[i::max_connections]
+            )
+            for i in range(max_connections)
+        ]
+
+
+@dataclass(frozen=True)
+class HashKey:
+    """
+    _hash_key column computed by jdbc_to_gcs_hash_key.py, algorithm is one of
+    md5, sha2-256, xxhash64 or none (no column). The safe encoding length prefixes
+    the values and marks nulls, concat is the plain concatenation of older versions
+    """
+
+    algorithm: str = "md5"
+    columns: Optional[List[str]] = None
+    encoding: str = "safe"
+
+    algorithms = ("md5", "sha2-256", "xxhash64", "none")
+    encodings = ("safe", "concat")
+
+    def __post_init__(self):
+        if self.algorithm not in self.algorithms:
+            raise ValueError(f"Invalid hash key algorithm: {self.algorithm}")
+        if self.encoding not in self.encodings:
+            raise ValueError(f"Invalid hash key encoding: {self.encoding}")
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class OutputFiles:
+    """
+    Parquet files written to the raw vault, sized by rows_per_file or by an
+    estimated target_file_size_mb, with the given compression codec
+    """
+
+    target_file_size_mb: Optional[int] = None
+    rows_per_file: Optional[int] = None
+    compression: Optional[str] = None
+
+    compressions = ("snappy", "zstd", "gzip", "none")
+
+    def __post_init__(self):
+        if self.target_file_size_mb is not None and self.rows_per_file is not None:
+            raise ValueError(
+                "Use either target_file_size_mb or rows_per_file, not both!"
+            )
+        if self.compression is not None and self.compression not in self.compressions:
+            raise ValueError(f"Invalid compression: {self.compression}")
+
+    def script_options(self) -> Dict:
+        options = {
+            "targetFileSizeMb": self.target_file_size_mb,
+            "rowsPerFile": self.rows_per_file,
+            "compression": self.compression,
+        }
+        return {key: value for key, value in options.items() if value is not None}
+
+
 @dataclass(frozen=True)
 class RdbmsDataIngestionMovementParameters(
     TimePartitionedDataIngestionMovementParameters
 ):
     extraction_query: str
+    jdbc_read_options: Optional[JdbcReadOptions] = None
+    watermark: Optional[Watermark] = None
+    hash_key: Optional[HashKey] = None
+    output_files: Optional[OutputFiles] = None
+
+    def __post_init__(self):
+        super().__post_init__()
+        if isinstance(self.jdbc_read_options, dict):
+            jdbc_read_options = JdbcReadOptions(**self.jdbc_read_options)
+            object.__setattr__(self, "jdbc_read_options", jdbc_read_options)
+        if isinstance(self.hash_key, dict):
+            object.__setattr__(self, "hash_key", HashKey(**self.hash_key))
+        if isinstance(self.output_files, dict):
+            object.__setattr__(self, "output_files", OutputFiles(**self.output_files))
 
     @classmethod
     def load_from_dict(cls, movement_data):
@@ -1,7 +1,9 @@
-from typing import Optional
-from dataclasses import dataclass
+import re
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
 from debussy_concert.core.config.movement_parameters.base import MovementParametersBase
 from debussy_concert.core.entities.table import BigQueryTable
+from debussy_concert.core.service.tables.registry import bigquery_table_registry
 
 
 @dataclass(frozen=True)
@@ -10,11 +12,38 @@ class BigQueryDataPartitioning:
     destination_partition: str
 
 
+# replaced in the extraction query by the watermark read when the dag runs
+WATERMARK_PLACEHOLDER = re.compile(r"\{\{\s*watermark\s*\}\}")
+
+
+@dataclass(frozen=True)
+class Watermark:
+    """
+    Last extracted value of column, kept in store ({"type": "local"|"gcs"|"bigquery",
+    "path"|"uri"|"table": ...}) and advanced only after the load into raw succeeds
+    """
+
+    column: str
+    store: Dict
+    initial_value: str
+
+    @staticmethod
+    def xcom_key(movement_name) -> str:
+        return f"watermark__{movement_name}"
+
+    def xcom_template(self, movement_name) -> str:
+        return f"{{{{ ti.xcom_pull(key='{self.xcom_key(movement_name)}') }}}}"
+
+
 @dataclass(frozen=True)
 class TimePartitionedDataIngestionMovementParameters(MovementParametersBase):
     extract_connection_id: str
     data_partitioning: BigQueryDataPartitioning
     raw_table_definition: str or BigQueryTable
+    # file the raw_table_definition was loaded from, if any
+    raw_table_definition_file: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
         if not isinstance(self.data_partitioning, BigQueryDataPartitioning):
@@ -24,10 +53,28 @@ class TimePartitionedDataIngestionMovementParameters(MovementParametersBase):
             object.__setattr__(self, "data_partitioning", data_partitioning)
         if self.raw_table_definition is not None:
             self.load_raw_table_definition_attr(self.raw_table_definition)
+        # declared by the movements with an extraction_query, after it
+        if getattr(self, "watermark", None) is not None:
+            self.load_watermark_attr(self.watermark)
+
+    def load_watermark_attr(self, watermark):
+        if isinstance(watermark, dict):
+            watermark = Watermark(**watermark)
+            object.__setattr__(self, "watermark", watermark)
+        if not WATERMARK_PLACEHOLDER.search(self.extraction_query):
+            raise ValueError(
+                f"Movement {self.name} has a watermark but no {{{{ watermark }}}}"
+                " in its extraction_query"
+            )
+        extraction_query = WATERMARK_PLACEHOLDER.sub(
+            watermark.xcom_template(self.name), self.extraction_query
+        )
+        object.__setattr__(self, "extraction_query", extraction_query)
 
     def load_raw_table_definition_attr(self, raw_table_definition):
         if isinstance(raw_table_definition, str):
-            raw_table_definition = BigQueryTable.load_from_file(
+            object.__setattr__(self, "raw_table_definition_file", raw_table_definition)
+            raw_table_definition = bigquery_table_registry.load_from_file(
                 self.raw_table_definition
             )
         elif isinstance(raw_table_definition, dict):
@@ -37,3 +84,8 @@ class TimePartitionedDataIngestionMovementParameters(MovementParametersBase):
         else:
             raise TypeError("Invalid type for raw_table_definition.")
         object.__setattr__(self, "raw_table_definition", raw_table_definition)
+
+    def dependency_files(self) -> List[str]:
+        if self.raw_table_definition_file is None:
+            return []
+        return [self.raw_table_definition_file]
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 from yaml_env_var_parser import load as yaml_load
 
 
@@ -14,6 +15,7 @@ from debussy_concert.pipeline.data_ingestion.config.movement_parameters.rdbms_da
 class ConfigRdbmsDataIngestion(ConfigDataIngestionBase):
     secret_manager_uri: str
     dataproc_config: dict
+    bigquery_config: Optional[dict] = None
 
     @classmethod
     def load_from_file(cls, composition_config_file_path, env_file_path):
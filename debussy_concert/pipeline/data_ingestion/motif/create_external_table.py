@@ -1,10 +1,13 @@
-from airflow.providers.google.cloud.operators.bigquery import (
-    BigQueryCreateExternalTableOperator,
-)
+from typing import TYPE_CHECKING
 
 from debussy_concert.core.motif.motif_base import MotifBase
 from debussy_concert.core.phrase.protocols import PCreateExternalTableMotif
 
+if TYPE_CHECKING:
+    from airflow.providers.google.cloud.operators.bigquery import (
+        BigQueryCreateExternalTableOperator,
+    )
+
 
 class CreateExternalBigQueryTableMotif(MotifBase, PCreateExternalTableMotif):
     def __init__(self, gcp_conn_id="google_cloud_default", name=None) -> None:
@@ -34,7 +37,11 @@ class CreateExternalBigQueryTableMotif(MotifBase, PCreateExternalTableMotif):
 
     def create_raw_vault_external_table(
         self, dag, task_group
-    ) -> BigQueryCreateExternalTableOperator:
+    ) -> "BigQueryCreateExternalTableOperator":
+        from airflow.providers.google.cloud.operators.bigquery import (
+            BigQueryCreateExternalTableOperator,
+        )
+
         create_raw_vault_external_table = BigQueryCreateExternalTableOperator(
             task_id=self.name,
             bucket=self.source_storage_uri_prefix,
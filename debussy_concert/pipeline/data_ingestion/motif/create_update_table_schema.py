@@ -1,8 +1,4 @@
 from airflow.utils.task_group import TaskGroup
-from airflow.providers.google.cloud.operators.bigquery import (
-    BigQueryCreateEmptyTableOperator,
-    BigQueryUpdateTableOperator,
-)
 from debussy_concert.core.motif.mixins.bigquery_job import TableReference
 from debussy_concert.core.motif.motif_base import MotifBase
 from debussy_concert.core.service.lakehouse.google_cloud import (
@@ -23,6 +19,11 @@ class CreateBigQueryTableMotif(MotifBase):
         self.table_ref = TableReference(table_uri=table_uri)
 
     def build(self, workflow_dag, phrase_group):
+        from airflow.providers.google.cloud.operators.bigquery import (
+            BigQueryCreateEmptyTableOperator,
+            BigQueryUpdateTableOperator,
+        )
+
         task_group = TaskGroup(
             group_id=self.name, dag=workflow_dag, parent_group=phrase_group
         )
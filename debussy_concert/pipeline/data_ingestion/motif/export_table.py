@@ -1,17 +1,19 @@
+import json
+from typing import TYPE_CHECKING, List, Optional
 from airflow import DAG
 from airflow.utils.task_group import TaskGroup
-from typing import Any, Optional, Sequence, Dict
-from google.protobuf.duration_pb2 import Duration
 from airflow.operators.python_operator import PythonOperator
-from airflow.providers.google.cloud.operators.dataproc import (
-    DataprocSubmitJobOperator,
-    DataprocCreateBatchOperator,
-)
+from airflow.utils.trigger_rule import TriggerRule
 
+from debussy_concert.core.config.movement_parameters.query_budget import QueryBudget
+from debussy_concert.core.config.movement_parameters.skip_unchanged import (
+    SkipIfUnchanged,
+)
 from debussy_concert.core.phrase.protocols import PExportDataToStorageMotif
 from debussy_concert.core.motif.motif_base import MotifBase, PClusterMotifMixin
 from debussy_concert.core.motif.mixins.dataproc import DataprocClusterHandlerMixin
 from debussy_concert.core.motif.bigquery_query_job import BigQueryQueryJobMotif
+from debussy_concert.core.service.lakehouse.google_cloud import split_gcs_uri
 from debussy_concert.pipeline.data_ingestion.config.rdbms_data_ingestion import (
     ConfigRdbmsDataIngestion,
 )
@@ -21,6 +23,71 @@ from debussy_concert.pipeline.data_ingestion.config.movement_parameters.rdbms_da
 
 from debussy_airflow.operators.basic_operator import StartOperator
 
+if TYPE_CHECKING:
+    from debussy_concert.core.operators.dataproc import (
+        DataprocServerlessSubmitJobOperator,
+    )
+
+
+JDBC_READ_OPTIONS_FLAG = "--jdbc-read-options="
+
+
+def jdbc_spark_options(
+    movement_parameters: RdbmsDataIngestionMovementParameters, dataproc_config: dict
+) -> dict:
+    if movement_parameters.jdbc_read_options is None:
+        return {}
+    return movement_parameters.jdbc_read_options.spark_options(
+        default_num_partitions=dataproc_config.get("parallelism"),
+        default_max_connections=dataproc_config.get("max_jdbc_connections"),
+    )
+
+
+def jdbc_read_options_args(
+    movement_parameters: RdbmsDataIngestionMovementParameters, dataproc_config: dict
+) -> List[str]:
+    """Optional last argument of the jdbc-to-gcs scripts with the spark read options"""
+    if movement_parameters.jdbc_read_options is None:
+        return []
+    spark_options = jdbc_spark_options(movement_parameters, dataproc_config)
+    return [JDBC_READ_OPTIONS_FLAG + json.dumps(spark_options)]
+
+
+HASH_KEY_FLAG = "--hash-key="
+
+
+def hash_key_args(movement_parameters: RdbmsDataIngestionMovementParameters):
+    """Optional argument of jdbc_to_gcs_hash_key.py with the hash key configuration"""
+    if movement_parameters.hash_key is None:
+        return []
+    return [HASH_KEY_FLAG + json.dumps(movement_parameters.hash_key.to_dict())]
+
+
+OUTPUT_FILES_FLAG = "--output-files="
+
+
+def output_files_args(movement_parameters: RdbmsDataIngestionMovementParameters):
+    """Optional argument of the jdbc-to-gcs scripts with the parquet files options"""
+    if movement_parameters.output_files is None:
+        return []
+    return [
+        OUTPUT_FILES_FLAG
+        + json.dumps(movement_parameters.output_files.script_options())
+    ]
+
+
+def dataproc_deferrable_args(dataproc_config: dict) -> dict:
+    """
+    With dataproc_config.deferrable the submit operators wait for the job or batch
+    on the triggerer, polling every dataproc_config.polling_interval_seconds
+    """
+    if not dataproc_config.get("deferrable", False):
+        return {}
+    kwargs = {"deferrable": True}
+    if "polling_interval_seconds" in dataproc_config:
+        kwargs["polling_interval_seconds"] = dataproc_config["polling_interval_seconds"]
+    return kwargs
+
 
 class ExportBigQueryQueryToGcsMotif(BigQueryQueryJobMotif):
     extraction_query_template = """
@@ -34,9 +101,19 @@ class ExportBigQueryQueryToGcsMotif(BigQueryQueryJobMotif):
         gcs_partition: str,
         name=None,
         gcp_conn_id="google_cloud_default",
+        query_budget: Optional[QueryBudget] = None,
+        skip_if_unchanged: Optional[SkipIfUnchanged] = None,
+        fingerprint_key: Optional[str] = None,
         **op_kw_args,
     ):
-        super().__init__(name, gcp_conn_id=gcp_conn_id, **op_kw_args)
+        super().__init__(
+            name,
+            gcp_conn_id=gcp_conn_id,
+            query_budget=query_budget,
+            skip_if_unchanged=skip_if_unchanged,
+            fingerprint_key=fingerprint_key,
+            **op_kw_args,
+        )
         self.extraction_query = extraction_query
         self.gcs_partition = gcs_partition
 
@@ -50,45 +127,17 @@ class ExportBigQueryQueryToGcsMotif(BigQueryQueryJobMotif):
         return self
 
 
-class DataprocServerlessSubmitJobOperator(DataprocCreateBatchOperator):
-    template_fields: Sequence[str] = (
-        "project_id",
-        "batch",
-        "batch_id",
-        "region",
-        "impersonation_chain",
-    )
-
-    def __init__(
-        self,        
-        region: Optional[str] = None,
-        project_id: Optional[str] = None,
-        batch: Dict[str, Any] = None,
-        batch_id: Optional[str] = None,
-        timeout: Optional[float] = None,
-        gcp_conn_id: str = "google_cloud_default",
-        **kwargs
-    ):
-        super().__init__(            
-            region=region,
-            project_id=project_id,
-            batch=batch,
-            batch_id=batch_id,
-            timeout=timeout,
-            gcp_conn_id=gcp_conn_id,
-            **kwargs
-        )
-
-    def execute(self, context):
-        DataprocCreateBatchOperator.execute(self, context)
-
-
-class DataprocExportRdbmsTableToGcsMotif(
+class DataprocRdbmsClusterMotif(
     MotifBase,
     DataprocClusterHandlerMixin,
     PClusterMotifMixin,
-    PExportDataToStorageMotif,
 ):
+    """
+    Managed Dataproc cluster for the jdbc exports. With dataproc_config.scope set to
+    composition a single one is created per dag run and every movement submits its
+    job to it, the cluster is deleted after the last job is done.
+    """
+
     config: ConfigRdbmsDataIngestion
     cluster_tags = ["dataproc"]
     gcs_connector_version = "2.2.0"
@@ -106,22 +155,10 @@ class DataprocExportRdbmsTableToGcsMotif(
     internal_ip_only = False
     idle_seconds_delete_ttl = 8 * 60  # 8 minutes
     _cluster_name_task_id = None
+    _workflow_dag = None
 
-    def __init__(
-        self,
-        movement_parameters: RdbmsDataIngestionMovementParameters,
-        gcs_partition: str,
-        jdbc_driver,
-        jdbc_url,
-        main_python_file_uri,
-        name=None,
-    ) -> None:
+    def __init__(self, name=None) -> None:
         super().__init__(name=name)
-        self.gcs_partition = gcs_partition
-        self.jdbc_driver = jdbc_driver
-        self.jdbc_url = jdbc_url
-        self.main_python_file_uri = main_python_file_uri
-        self.movement_parameters = movement_parameters
         self.pip_packages = self.config.dataproc_config.get("pip_packages", [])
         self.spark_jars_packages = self.config.dataproc_config.get(
             "spark_jars_packages", ""
@@ -168,6 +205,8 @@ class DataprocExportRdbmsTableToGcsMotif(
 
     @property
     def cluster_config(self):
+        from google.protobuf.duration_pb2 import Duration
+
         environment = self.config.environment
         project = environment.project
         region = environment.region
@@ -239,36 +278,36 @@ class DataprocExportRdbmsTableToGcsMotif(
         }
         return cluster_config
 
-    def setup(self, destination_storage_uri: str):
-        self.destination_storage_uri = destination_storage_uri
-        return self
-
     def build(self, dag, parent_task_group: TaskGroup):
         task_group = TaskGroup(
             group_id=self.name, dag=dag, parent_group=parent_task_group
         )
-
-        start = StartOperator(
-            phase=self.movement_parameters.name, dag=dag, task_group=task_group
-        )
-
         cluster_name_id = self.cluster_name_id(dag, task_group)
         self._cluster_name_task_id = self.build_cluster_name(dag, cluster_name_id)
-
-        create_dataproc_cluster = self.create_dataproc_cluster(dag, task_group)
-        jdbc_to_raw_vault = self.jdbc_to_raw_vault(
-            dag, task_group, self.movement_parameters.extraction_query
+        self.create_dataproc_cluster_task = self.create_dataproc_cluster(
+            dag, task_group
+        )
+        self.delete_dataproc_cluster_task = self.delete_dataproc_cluster(
+            dag, task_group
         )
-        delete_dataproc_cluster = self.delete_dataproc_cluster(dag, task_group)
         self.workflow_service.chain_tasks(
-            start,
             cluster_name_id,
-            create_dataproc_cluster,
-            jdbc_to_raw_vault,
-            delete_dataproc_cluster,
+            self.create_dataproc_cluster_task,
+            self.delete_dataproc_cluster_task,
         )
+        self._workflow_dag = dag
         return task_group
 
+    def build_once(self, dag):
+        """Builds the cluster tasks the first time a movement of dag needs them"""
+        if self._workflow_dag is not dag:
+            self.build(dag, parent_task_group=None)
+
+    def add_job(self, job):
+        self.workflow_service.chain_tasks(
+            self.create_dataproc_cluster_task, job, self.delete_dataproc_cluster_task
+        )
+
     def build_cluster_name(self, dag: DAG, cluster_name_task):
         # max number of characters for dataproc cluster names is 34
         # for usage in cluster_name property
@@ -287,7 +326,79 @@ class DataprocExportRdbmsTableToGcsMotif(
         )
         return cluster_name_id
 
+
+class DataprocExportRdbmsTableToGcsMotif(
+    DataprocRdbmsClusterMotif, PExportDataToStorageMotif
+):
+    def __init__(
+        self,
+        movement_parameters: RdbmsDataIngestionMovementParameters,
+        gcs_partition: str,
+        jdbc_driver,
+        jdbc_url,
+        main_python_file_uri,
+        python_file_uris=None,
+        name=None,
+        shared_cluster: Optional[DataprocRdbmsClusterMotif] = None,
+    ) -> None:
+        super().__init__(name=name)
+        self.gcs_partition = gcs_partition
+        self.jdbc_driver = jdbc_driver
+        self.jdbc_url = jdbc_url
+        self.main_python_file_uri = main_python_file_uri
+        self.python_file_uris = python_file_uris or []
+        self.movement_parameters = movement_parameters
+        # the job is submitted to this cluster instead of one created for the movement
+        self.shared_cluster = shared_cluster
+
+    @property
+    def cluster_name(self):
+        if self.shared_cluster is not None:
+            return self.shared_cluster.cluster_name
+        return super().cluster_name
+
+    def setup(self, destination_storage_uri: str):
+        self.destination_storage_uri = destination_storage_uri
+        return self
+
+    def build(self, dag, parent_task_group: TaskGroup):
+        task_group = TaskGroup(
+            group_id=self.name, dag=dag, parent_group=parent_task_group
+        )
+
+        start = StartOperator(
+            phase=self.movement_parameters.name, dag=dag, task_group=task_group
+        )
+        if self.shared_cluster is not None:
+            self.shared_cluster.build_once(dag)
+            jdbc_to_raw_vault = self.jdbc_to_raw_vault(
+                dag, task_group, self.movement_parameters.extraction_query
+            )
+            self.shared_cluster.add_job(jdbc_to_raw_vault)
+            self.workflow_service.chain_tasks(start, jdbc_to_raw_vault)
+            return task_group
+
+        cluster_name_id = self.cluster_name_id(dag, task_group)
+        self._cluster_name_task_id = self.build_cluster_name(dag, cluster_name_id)
+
+        create_dataproc_cluster = self.create_dataproc_cluster(dag, task_group)
+        jdbc_to_raw_vault = self.jdbc_to_raw_vault(
+            dag, task_group, self.movement_parameters.extraction_query
+        )
+        delete_dataproc_cluster = self.delete_dataproc_cluster(dag, task_group)
+        self.workflow_service.chain_tasks(
+            start,
+            cluster_name_id,
+            create_dataproc_cluster,
+            jdbc_to_raw_vault,
+            delete_dataproc_cluster,
+        )
+        return task_group
+
     def jdbc_to_raw_vault(self, dag, task_group, extraction_query):
+        from airflow.providers.google.cloud.operators.dataproc import (
+            DataprocSubmitJobOperator,
+        )
 
         secret_uri = f"{self.config.secret_manager_uri}/versions/latest"
         run_ts = "{{ ts_nodash }}"
@@ -299,6 +410,7 @@ class DataprocExportRdbmsTableToGcsMotif(
                 "placement": {"cluster_name": self.cluster_name},
                 "pyspark_job": {
                     "main_python_file_uri": self.main_python_file_uri,
+                    "python_file_uris": self.python_file_uris,
                     "args": [
                         self.jdbc_driver,
                         self.jdbc_url,
@@ -307,6 +419,11 @@ class DataprocExportRdbmsTableToGcsMotif(
                         extraction_query,
                         run_ts,
                         f"{self.destination_storage_uri}/{self.gcs_partition}",
+                        *jdbc_read_options_args(
+                            self.movement_parameters, self.config.dataproc_config
+                        ),
+                        *hash_key_args(self.movement_parameters),
+                        *output_files_args(self.movement_parameters),
                     ],
                 },
             },
@@ -314,11 +431,160 @@ class DataprocExportRdbmsTableToGcsMotif(
             project_id=self.config.environment.project,
             dag=dag,
             task_group=task_group,
+            **dataproc_deferrable_args(self.config.dataproc_config),
         )
 
         return jdbc_to_raw_vault
 
 
+def upload_manifest(manifest, manifest_uri, gcp_conn_id):
+    from airflow.providers.google.cloud.hooks.gcs import GCSHook
+
+    bucket, object_name = split_gcs_uri(manifest_uri)
+    GCSHook(gcp_conn_id=gcp_conn_id).upload(
+        bucket, object_name, data=json.dumps(manifest, indent=2)
+    )
+
+
+def check_extraction_status(status_uri, table_name, gcp_conn_id):
+    from airflow.exceptions import AirflowException
+    from airflow.providers.google.cloud.hooks.gcs import GCSHook
+
+    bucket, object_name = split_gcs_uri(status_uri)
+    hook = GCSHook(gcp_conn_id=gcp_conn_id)
+    if not hook.exists(bucket, object_name):
+        raise AirflowException(f"No extraction status found at {status_uri}")
+    status = json.loads(hook.download(bucket, object_name))
+    table_status = status.get(table_name, {"status": "missing"})
+    if table_status["status"] != "succeeded":
+        raise AirflowException(
+            f"Extraction of {table_name} {table_status['status']}:"
+            f" {table_status.get('error', '')}"
+        )
+
+
+class DataprocServerlessRdbmsBatchMotif(MotifBase):
+    """
+    Single Dataproc Serverless batch extracting the tables of every movement of a
+    dag run, used when dataproc_config.scope is composition. The movements are
+    listed in a json manifest uploaded to the artifact bucket and the batch script
+    reports the status of every table, checked by each movement.
+    """
+
+    config: ConfigRdbmsDataIngestion
+    max_concurrency = 8
+    _batch_id_task_id = None
+    _workflow_dag = None
+
+    def __init__(self, main_python_file_uri, python_file_uris, name=None) -> None:
+        super().__init__(name=name)
+        self.main_python_file_uri = main_python_file_uri
+        self.python_file_uris = python_file_uris
+        self.spark_jars_packages = self.config.dataproc_config.get(
+            "spark_jars_packages", ""
+        )
+        self.max_concurrency = self.config.dataproc_config.get(
+            "max_concurrency", self.max_concurrency
+        )
+        self.gcp_conn_id = self.config.environment.data_lakehouse_connection_id
+
+    @property
+    def config(self) -> ConfigRdbmsDataIngestion:
+        return super().config
+
+    @property
+    def manifest_uri(self):
+        return (
+            f"gs://{self.config.environment.artifact_bucket}/manifests/"
+            f"{self.config.name}/{{{{ ts_nodash }}}}.json"
+        )
+
+    @property
+    def status_uri(self):
+        return self.manifest_uri.replace(".json", ".status.json")
+
+    @property
+    def batch_config(self):
+        return {
+            "pyspark_batch": {
+                "main_python_file_uri": self.main_python_file_uri,
+                "python_file_uris": self.python_file_uris,
+                "args": [self.manifest_uri],
+                "jar_file_uris": self.spark_jars_packages,
+            },
+            "runtime_config": {"properties": {"spark.scheduler.mode": "FAIR"}},
+            "environment_config": {
+                "execution_config": {
+                    "subnetwork_uri": self.config.dataproc_config["subnet"]
+                },
+            },
+        }
+
+    def build(self, dag, parent_task_group: TaskGroup):
+        from debussy_concert.core.operators.dataproc import (
+            DataprocServerlessSubmitJobOperator,
+        )
+
+        task_group = TaskGroup(
+            group_id=self.name, dag=dag, parent_group=parent_task_group
+        )
+        batch_id = PythonOperator(
+            task_id="batch_job_id",
+            python_callable=lambda x: x,
+            op_args=["{{ ti.job_id }}"],
+            dag=dag,
+            task_group=task_group,
+        )
+        self._batch_id_task_id = (
+            f"dby{{{{ ti.xcom_pull(dag_id='{dag.dag_id}', task_ids='{batch_id.task_id}') }}}}"
+            f"-{self.config.source_name.replace('_', '').lower()[:22]}-manifest"
+        )
+        self.manifest = {
+            "secret_uri": f"{self.config.secret_manager_uri}/versions/latest",
+            "load_timestamp": "{{ ts_nodash }}",
+            "status_uri": self.status_uri,
+            "max_concurrency": self.max_concurrency,
+            "tables": [],
+        }
+        # op_kwargs is templated, so the queries are rendered when the manifest is
+        self.upload_manifest_task = PythonOperator(
+            task_id="upload_manifest",
+            python_callable=upload_manifest,
+            op_kwargs={
+                "manifest": self.manifest,
+                "manifest_uri": self.manifest_uri,
+                "gcp_conn_id": self.gcp_conn_id,
+            },
+            dag=dag,
+            task_group=task_group,
+        )
+        self.submit_batch_task = DataprocServerlessSubmitJobOperator(
+            task_id="create_dataproc_serverless",
+            project_id=self.config.environment.project,
+            batch=self.batch_config,
+            region=self.config.environment.region,
+            batch_id=self._batch_id_task_id,
+            dag=dag,
+            task_group=task_group,
+            **dataproc_deferrable_args(self.config.dataproc_config),
+        )
+        self.workflow_service.chain_tasks(
+            batch_id, self.upload_manifest_task, self.submit_batch_task
+        )
+        self._workflow_dag = dag
+        return task_group
+
+    def build_once(self, dag):
+        """Builds the batch tasks the first time a movement of dag needs them"""
+        if self._workflow_dag is not dag:
+            self.build(dag, parent_task_group=None)
+
+    def add_table(self, table: dict, start, check_status):
+        self.manifest["tables"].append(table)
+        self.workflow_service.chain_tasks(start, self.upload_manifest_task)
+        self.workflow_service.chain_tasks(self.submit_batch_task, check_status)
+
+
 class DataprocServerlessExportRdbmsTableToGcsMotif(
     MotifBase, PExportDataToStorageMotif
 ):
@@ -333,14 +599,19 @@ class DataprocServerlessExportRdbmsTableToGcsMotif(
         jdbc_driver,
         jdbc_url,
         main_python_file_uri,
+        python_file_uris=None,
         name=None,
+        shared_batch: Optional[DataprocServerlessRdbmsBatchMotif] = None,
     ) -> None:
         super().__init__(name=name)
         self.gcs_partition = gcs_partition
         self.jdbc_driver = jdbc_driver
         self.jdbc_url = jdbc_url
         self.main_python_file_uri = main_python_file_uri
+        self.python_file_uris = python_file_uris or []
         self.movement_parameters = movement_parameters
+        # the table is added to this batch manifest instead of having its own batch
+        self.shared_batch = shared_batch
         self.pip_packages = self.config.dataproc_config.get("pip_packages", [])
         self.spark_jars_packages = self.config.dataproc_config.get(
             "spark_jars_packages", ""
@@ -366,6 +637,7 @@ class DataprocServerlessExportRdbmsTableToGcsMotif(
         batch = {
             "pyspark_batch": {
                 "main_python_file_uri": self.main_python_file_uri,
+                "python_file_uris": self.python_file_uris,
                 "args": [
                     self.jdbc_driver,
                     self.jdbc_url,
@@ -374,6 +646,11 @@ class DataprocServerlessExportRdbmsTableToGcsMotif(
                     self.movement_parameters.extraction_query,
                     run_ts,
                     f"{self.destination_storage_uri}/{self.gcs_partition}",
+                    *jdbc_read_options_args(
+                        self.movement_parameters, self.config.dataproc_config
+                    ),
+                    *hash_key_args(self.movement_parameters),
+                    *output_files_args(self.movement_parameters),
                 ],
                 "jar_file_uris": self.spark_jars_packages,
             },
@@ -398,6 +675,9 @@ class DataprocServerlessExportRdbmsTableToGcsMotif(
         start = StartOperator(
             phase=self.movement_parameters.name, dag=dag, task_group=task_group
         )
+        if self.shared_batch is not None:
+            self.build_shared_batch_table(dag, task_group, start)
+            return task_group
 
         batch_id = self.batch_job_id(dag, task_group)
         self._batch_id_task_id = self.build_batch_id_task_id(dag, batch_id)
@@ -406,6 +686,44 @@ class DataprocServerlessExportRdbmsTableToGcsMotif(
         self.workflow_service.chain_tasks(start, batch_id, create_dataproc_serverless)
         return task_group
 
+    def build_shared_batch_table(self, dag, task_group, start):
+        self.shared_batch.build_once(dag)
+        table = {
+            "name": self.movement_parameters.name,
+            "jdbc_driver": self.jdbc_driver,
+            "jdbc_url": self.jdbc_url,
+            "query": self.movement_parameters.extraction_query,
+            "output_uri": f"{self.destination_storage_uri}/{self.gcs_partition}",
+            "read_options": jdbc_spark_options(
+                self.movement_parameters, self.config.dataproc_config
+            ),
+            "hash_key": (
+                self.movement_parameters.hash_key.to_dict()
+                if self.movement_parameters.hash_key is not None
+                else None
+            ),
+            "output_files": (
+                self.movement_parameters.output_files.script_options()
+                if self.movement_parameters.output_files is not None
+                else None
+            ),
+        }
+        check_status = PythonOperator(
+            task_id="check_extraction_status",
+            python_callable=check_extraction_status,
+            op_kwargs={
+                "status_uri": self.shared_batch.status_uri,
+                "table_name": self.movement_parameters.name,
+                "gcp_conn_id": self.shared_batch.gcp_conn_id,
+            },
+            # the other tables are still loaded when the batch fails for some
+            trigger_rule=TriggerRule.ALL_DONE,
+            dag=dag,
+            task_group=task_group,
+        )
+        self.shared_batch.add_table(table, start, check_status)
+        self.workflow_service.chain_tasks(start, check_status)
+
     def build_batch_id_task_id(self, dag: DAG, batch_id):
         # max number of characters for dataproc serverless names is 34
         # for usage in serverless_name property
@@ -425,7 +743,11 @@ class DataprocServerlessExportRdbmsTableToGcsMotif(
         )
         return batch_id
 
-    def submit_job(self, dag, task_group) -> DataprocServerlessSubmitJobOperator:
+    def submit_job(self, dag, task_group) -> "DataprocServerlessSubmitJobOperator":
+        from debussy_concert.core.operators.dataproc import (
+            DataprocServerlessSubmitJobOperator,
+        )
+
         create_dataproc_serverless = DataprocServerlessSubmitJobOperator(
             task_id="create_dataproc_serverless",
             project_id=self.config.environment.project,
@@ -434,5 +756,15 @@ class DataprocServerlessExportRdbmsTableToGcsMotif(
             batch_id=self.batch_id,
             dag=dag,
             task_group=task_group,
+            **dataproc_deferrable_args(self.config.dataproc_config),
         )
         return create_dataproc_serverless
+
+
+def __getattr__(name):
+    # operators moved to debussy_concert.core.operators.dataproc, imported on access
+    if name == "DataprocServerlessSubmitJobOperator":
+        from debussy_concert.core.operators import dataproc
+
+        return getattr(dataproc, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,102 @@
+from airflow.operators.python import PythonOperator
+
+from debussy_concert.core.entities.table import BigQueryTable
+from debussy_concert.core.motif.motif_base import MotifBase
+from debussy_concert.core.service.key_value.store import key_value_store_from_dict
+from debussy_concert.pipeline.data_ingestion.config.movement_parameters.time_partitioned import (
+    Watermark,
+)
+
+# the value is sent back to the source database, so it is formatted as a literal
+WATERMARK_FORMATS = {
+    "TIMESTAMP": "FORMAT_TIMESTAMP('%Y-%m-%d %H:%M:%E6S', MAX({column}))",
+    "DATETIME": "FORMAT_DATETIME('%Y-%m-%d %H:%M:%E6S', MAX({column}))",
+    "DATE": "FORMAT_DATE('%Y-%m-%d', MAX({column}))",
+}
+
+
+def read_watermark(store, gcp_conn_id, key, initial_value, xcom_key, ti):
+    value = key_value_store_from_dict(store, gcp_conn_id).get(key)
+    if value is None:
+        value = initial_value
+    ti.xcom_push(key=xcom_key, value=value)
+    return value
+
+
+def advance_watermark(store, gcp_conn_id, key, max_value_query):
+    from airflow.providers.google.cloud.hooks.bigquery import BigQueryHook
+
+    client = BigQueryHook(gcp_conn_id=gcp_conn_id, use_legacy_sql=False).get_client()
+    rows = list(client.query(max_value_query).result())
+    value = rows[0]["watermark"] if rows else None
+    if value is not None:
+        key_value_store_from_dict(store, gcp_conn_id).set(key, value)
+    return value
+
+
+class ReadWatermarkMotif(MotifBase):
+    def __init__(self, watermark: Watermark, gcp_conn_id, name=None):
+        super().__init__(name=name)
+        self.watermark = watermark
+        self.gcp_conn_id = gcp_conn_id
+
+    def setup(self, movement_name, watermark_key):
+        self.movement_name = movement_name
+        self.watermark_key = watermark_key
+        return self
+
+    def build(self, workflow_dag, phrase_group):
+        return PythonOperator(
+            task_id="read_watermark",
+            python_callable=read_watermark,
+            op_kwargs={
+                "store": self.watermark.store,
+                "gcp_conn_id": self.gcp_conn_id,
+                "key": self.watermark_key,
+                "initial_value": self.watermark.initial_value,
+                "xcom_key": self.watermark.xcom_key(self.movement_name),
+            },
+            dag=workflow_dag,
+            task_group=phrase_group,
+        )
+
+
+class AdvanceWatermarkMotif(MotifBase):
+    def __init__(self, watermark: Watermark, gcp_conn_id, name=None):
+        super().__init__(name=name)
+        self.watermark = watermark
+        self.gcp_conn_id = gcp_conn_id
+
+    def setup(self, watermark_key, table_uri, table: BigQueryTable):
+        self.watermark_key = watermark_key
+        self.table_uri = table_uri
+        self.table = table
+        return self
+
+    @property
+    def max_value_query(self):
+        column = self.watermark.column
+        field_types = {field.name: field.type for field in self.table.schema.fields}
+        if column not in field_types:
+            raise ValueError(f"Watermark column {column} not in {self.table_uri}")
+        value_format = WATERMARK_FORMATS.get(
+            field_types[column], "CAST(MAX({column}) AS STRING)"
+        )
+        return (
+            f"SELECT {value_format.format(column=column)} AS watermark"
+            f" FROM `{self.table_uri}`"
+        )
+
+    def build(self, workflow_dag, phrase_group):
+        return PythonOperator(
+            task_id="advance_watermark",
+            python_callable=advance_watermark,
+            op_kwargs={
+                "store": self.watermark.store,
+                "gcp_conn_id": self.gcp_conn_id,
+                "key": self.watermark_key,
+                "max_value_query": self.max_value_query,
+            },
+            dag=workflow_dag,
+            task_group=phrase_group,
+        )
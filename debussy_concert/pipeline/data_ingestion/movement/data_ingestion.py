@@ -22,6 +22,8 @@ class DataIngestionMovement(MovementBase):
         ingestion_source_to_raw_vault_storage_phrase: PIngestionSourceToRawVaultStoragePhrase,
         raw_vault_storage_to_data_warehouse_raw_phrase: PRawVaultStorageToDataWarehouseRawPhrase,
         end_phrase: PEndPhrase,
+        read_watermark_phrase=None,
+        advance_watermark_phrase=None,
     ) -> None:
 
         self.start_phrase = start_phrase
@@ -33,6 +35,8 @@ class DataIngestionMovement(MovementBase):
             raw_vault_storage_to_data_warehouse_raw_phrase
         )
         self.end_phrase = end_phrase
+        self.read_watermark_phrase = read_watermark_phrase
+        self.advance_watermark_phrase = advance_watermark_phrase
         phrases = [
             self.start_phrase,
             self.create_or_update_table_phrase,
@@ -40,7 +44,29 @@ class DataIngestionMovement(MovementBase):
             self.raw_vault_storage_to_data_warehouse_raw_phrase,
             self.end_phrase,
         ]
-        super().__init__(name=name, phrases=phrases)
+        # the raw table is created or updated while the data is being extracted
+        dependencies = {
+            self.create_or_update_table_phrase: [self.start_phrase],
+            self.ingestion_source_to_raw_vault_storage_phrase: [self.start_phrase],
+            self.raw_vault_storage_to_data_warehouse_raw_phrase: [
+                self.create_or_update_table_phrase,
+                self.ingestion_source_to_raw_vault_storage_phrase,
+            ],
+            self.end_phrase: [self.raw_vault_storage_to_data_warehouse_raw_phrase],
+        }
+        if self.read_watermark_phrase is not None:
+            # the extraction reads the watermark, which only advances after the load
+            phrases.insert(1, self.read_watermark_phrase)
+            phrases.insert(-1, self.advance_watermark_phrase)
+            dependencies[self.read_watermark_phrase] = [self.start_phrase]
+            dependencies[self.ingestion_source_to_raw_vault_storage_phrase] = [
+                self.read_watermark_phrase
+            ]
+            dependencies[self.advance_watermark_phrase] = [
+                self.raw_vault_storage_to_data_warehouse_raw_phrase
+            ]
+            dependencies[self.end_phrase] = [self.advance_watermark_phrase]
+        super().__init__(name=name, phrases=phrases, dependencies=dependencies)
 
     @property
     def raw_vault_bucket_uri_prefix(self):
@@ -57,8 +83,22 @@ class DataIngestionMovement(MovementBase):
             f"{self.config.source_type}_{self.config.source_name}_{self.movement_parameters.name}"
         )
 
+    @property
+    def watermark_key(self):
+        return f"{self.config.name}/{self.movement_parameters.name}"
+
     def setup(self, movement_parameters: MovementParametersType):
         self.movement_parameters = movement_parameters
+        if self.read_watermark_phrase is not None:
+            self.read_watermark_phrase.setup(
+                movement_name=movement_parameters.name,
+                watermark_key=self.watermark_key,
+            )
+            self.advance_watermark_phrase.setup(
+                watermark_key=self.watermark_key,
+                datawarehouse_raw_uri=self.raw_table_uri,
+                raw_table_definition=movement_parameters.raw_table_definition,
+            )
         self.ingestion_source_to_raw_vault_storage_phrase.setup(
             destination_storage_uri=self.raw_vault_bucket_uri_prefix
         )
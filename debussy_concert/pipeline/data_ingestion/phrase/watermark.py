@@ -0,0 +1,27 @@
+from debussy_concert.core.phrase.phrase_base import PhraseBase
+
+
+class ReadWatermarkPhrase(PhraseBase):
+    def __init__(self, read_watermark_motif, name=None) -> None:
+        self.read_watermark_motif = read_watermark_motif
+        super().__init__(name=name, motifs=[self.read_watermark_motif])
+
+    def setup(self, movement_name, watermark_key):
+        self.read_watermark_motif.setup(
+            movement_name=movement_name, watermark_key=watermark_key
+        )
+        return self
+
+
+class AdvanceWatermarkPhrase(PhraseBase):
+    def __init__(self, advance_watermark_motif, name=None) -> None:
+        self.advance_watermark_motif = advance_watermark_motif
+        super().__init__(name=name, motifs=[self.advance_watermark_motif])
+
+    def setup(self, watermark_key, datawarehouse_raw_uri, raw_table_definition):
+        self.advance_watermark_motif.setup(
+            watermark_key=watermark_key,
+            table_uri=datawarehouse_raw_uri,
+            table=raw_table_definition,
+        )
+        return self
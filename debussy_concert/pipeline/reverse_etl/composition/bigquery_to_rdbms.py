@@ -0,0 +1,252 @@
+from debussy_concert.core.composition.composition_base import CompositionBase
+from debussy_concert.core.config.movement_parameters.bulk_load import BulkLoad
+from debussy_concert.core.phrase.utils.start import StartPhrase
+from debussy_concert.core.phrase.utils.end import EndPhrase
+from debussy_concert.core.motif.mixins.bigquery_job import BigQueryTimePartitioning
+
+from debussy_concert.pipeline.reverse_etl.movement.reverse_etl import ReverseEtlMovement
+from debussy_concert.pipeline.reverse_etl.config.reverse_etl import ConfigReverseEtl
+from debussy_concert.pipeline.reverse_etl.config.movement_parameters.reverse_etl import (
+    CsvFile,
+    ReverseEtlMovementParameters,
+)
+from debussy_concert.pipeline.reverse_etl.phrase.dw_to_reverse_etl import (
+    DataWarehouseToReverseEtlPhrase,
+)
+from debussy_concert.pipeline.reverse_etl.phrase.reverse_etl_to_storage import (
+    DataWarehouseReverseEtlToTempToStoragePhrase,
+)
+from debussy_concert.pipeline.reverse_etl.phrase.storage_to_destination import (
+    StorageToDestinationPhrase,
+)
+from debussy_concert.pipeline.reverse_etl.motif.storage_to_rdbms_bulk_load_motif import (
+    StorageToRdbmsBulkDeleteMotif,
+    StorageToRdbmsBulkLoadMotif,
+)
+from debussy_concert.pipeline.reverse_etl.motif.bigquery_query_job import (
+    BigQueryQueryJobMotif,
+)
+from debussy_concert.pipeline.reverse_etl.motif.bigquery_extract_job import (
+    BigQueryExtractJobMotif,
+)
+from debussy_concert.pipeline.reverse_etl.composition.bigquery_to_storage import (
+    compose_shards_motif,
+    promote_snapshot_phrase,
+    single_pass_reverse_etl_movement,
+    snapshot_diff_motifs,
+)
+
+
+class BigQueryToRdbms(CompositionBase):
+    """
+    Reverse etl of bigquery into a table of dialect, bulk loaded from the csv
+    extract with default_bulk_load unless the movement sets bulk_load
+    """
+
+    config: ConfigReverseEtl
+    dialect: str
+    default_bulk_load = BulkLoad()
+
+    def bigquery_to_storage_reverse_etl_to_rdbms_movement_builder(
+        self, movement_parameters: ReverseEtlMovementParameters
+    ):
+        return self.reverse_etl_movement_builder(
+            movement_parameters=movement_parameters
+        )
+
+    def reverse_etl_movement_builder(
+        self, movement_parameters: ReverseEtlMovementParameters
+    ) -> ReverseEtlMovement:
+        if movement_parameters.single_pass:
+            return single_pass_reverse_etl_movement(
+                movement_parameters,
+                self.data_storage_to_rdbms_phrase(movement_parameters),
+                gcp_conn_id=self.config.environment.data_lakehouse_connection_id,
+                config_name=self.config.name,
+            )
+        start_phrase = StartPhrase()
+        end_phrase = EndPhrase()
+        csv_output_config: CsvFile = movement_parameters.output_config
+        if not isinstance(csv_output_config, CsvFile) or csv_output_config.compression:
+            raise ValueError(f"{self.dialect} reverse etl loads uncompressed csv files")
+        self.validate_output_config(movement_parameters)
+        if (
+            movement_parameters.snapshot_diff is not None
+            and movement_parameters.write_mode != "upsert"
+        ):
+            # updated rows are delivered again, they must replace the old ones
+            raise ValueError("snapshot_diff to rdbms requires the upsert write_mode")
+
+        data_warehouse_raw_to_reverse_etl_phrase = (
+            self.data_warehouse_raw_to_reverse_etl_phrase(
+                partition_type=movement_parameters.reverse_etl_dataset_partition_type,
+                partition_field=movement_parameters.reverse_etl_dataset_partition_field,
+                gcp_conn_id=self.config.environment.data_lakehouse_connection_id,
+                query_budget=movement_parameters.query_budget,
+                skip_if_unchanged=movement_parameters.skip_if_unchanged,
+                fingerprint_key=f"{self.config.name}/{movement_parameters.name}",
+            )
+        )
+
+        data_warehouse_reverse_etl_to_storage_phrase = (
+            self.data_warehouse_reverse_etl_to_storage_phrase(
+                destination_config=csv_output_config,
+                gcp_conn_id=self.config.environment.data_lakehouse_connection_id,
+                query_budget=movement_parameters.query_budget,
+                movement_parameters=movement_parameters,
+            )
+        )
+
+        data_storage_to_rdbms_phrase = self.data_storage_to_rdbms_phrase(
+            movement_parameters
+        )
+
+        name = f"ReverseEtlMovement_{movement_parameters.name}"
+
+        movement = ReverseEtlMovement(
+            name=name,
+            start_phrase=start_phrase,
+            data_warehouse_to_reverse_etl_phrase=data_warehouse_raw_to_reverse_etl_phrase,
+            data_warehouse_reverse_etl_to_storage_phrase=data_warehouse_reverse_etl_to_storage_phrase,
+            storage_to_destination_phrase=data_storage_to_rdbms_phrase,
+            end_phrase=end_phrase,
+            promote_snapshot_phrase=promote_snapshot_phrase(
+                movement_parameters,
+                self.config.environment.data_lakehouse_connection_id,
+            ),
+        )
+        movement.setup(movement_parameters)
+        return movement
+
+    def data_warehouse_raw_to_reverse_etl_phrase(
+        self,
+        partition_type,
+        partition_field,
+        gcp_conn_id,
+        query_budget=None,
+        skip_if_unchanged=None,
+        fingerprint_key=None,
+    ):
+        time_partitioning = BigQueryTimePartitioning(
+            type=partition_type, field=partition_field
+        )
+
+        bigquery_job = BigQueryQueryJobMotif(
+            name="bq_to_reverse_etl_motif",
+            write_disposition="WRITE_APPEND",
+            create_disposition="CREATE_IF_NEEDED",
+            time_partitioning=time_partitioning,
+            gcp_conn_id=gcp_conn_id,
+            query_budget=query_budget,
+            skip_if_unchanged=skip_if_unchanged,
+            fingerprint_key=fingerprint_key,
+        )
+
+        phrase = DataWarehouseToReverseEtlPhrase(dw_to_reverse_etl_motif=bigquery_job)
+        return phrase
+
+    def data_warehouse_reverse_etl_to_storage_phrase(
+        self,
+        destination_config: CsvFile,
+        gcp_conn_id,
+        query_budget=None,
+        movement_parameters: ReverseEtlMovementParameters = None,
+    ):
+        bigquery_job = BigQueryQueryJobMotif(
+            name="bq_reverse_etl_to_temp_table_motif",
+            write_disposition="WRITE_TRUNCATE",
+            create_disposition="CREATE_IF_NEEDED",
+            gcp_conn_id=gcp_conn_id,
+            query_budget=query_budget,
+        )
+
+        export_bigquery = BigQueryExtractJobMotif(
+            name="bq_export_table_to_gcs_motif",
+            gcp_conn_id=gcp_conn_id,
+            **destination_config.extract_options(),
+        )
+        snapshot_diff, export_tombstones = (None, None)
+        if movement_parameters is not None:
+            snapshot_diff, export_tombstones = snapshot_diff_motifs(
+                movement_parameters, gcp_conn_id
+            )
+
+        phrase = DataWarehouseReverseEtlToTempToStoragePhrase(
+            name="DataWarehouseReverseEtlToTempToStoragePhrase",
+            datawarehouse_reverse_etl_to_temp_table_motif=bigquery_job,
+            export_temp_table_to_storage_motif=export_bigquery,
+            compose_storage_shards_motif=compose_shards_motif(
+                destination_config, gcp_conn_id
+            ),
+            snapshot_diff_motif=snapshot_diff,
+            export_tombstones_motif=export_tombstones,
+        )
+        return phrase
+
+    def validate_output_config(self, movement_parameters: ReverseEtlMovementParameters):
+        """The bulk load reads every file of a sharded extract"""
+
+    def data_storage_to_rdbms_phrase(
+        self, movement_parameters: ReverseEtlMovementParameters
+    ):
+        csv_output_config: CsvFile = movement_parameters.output_config
+        if not csv_output_config.print_header:
+            raise ValueError("bulk load maps the csv columns by its header")
+        bulk_load_kwargs = dict(
+            rdbms_conn_id=movement_parameters.destination_connection_id,
+            dialect=self.dialect,
+            destination_table=movement_parameters.destination_uri,
+            bulk_load=movement_parameters.bulk_load or self.default_bulk_load,
+            field_delimiter=csv_output_config.field_delimiter,
+            storage_conn_id=self.config.environment.data_lakehouse_connection_id,
+        )
+        bulk_load_motif = StorageToRdbmsBulkLoadMotif(
+            name="file_storage_bulk_load_to_rdbms_motif",
+            write_mode=movement_parameters.write_mode,
+            merge_key=movement_parameters.merge_key,
+            **bulk_load_kwargs,
+        )
+        tombstones_motif = None
+        if movement_parameters.snapshot_diff is not None:
+            tombstones_motif = StorageToRdbmsBulkDeleteMotif(
+                name="file_storage_tombstones_delete_from_rdbms_motif",
+                key=movement_parameters.snapshot_diff.key,
+                **bulk_load_kwargs,
+            )
+        return StorageToDestinationPhrase(
+            name="StorageToRdbmsDestinationPhrase",
+            storage_to_destination_motif=bulk_load_motif,
+            tombstones_to_destination_motif=tombstones_motif,
+        )
+
+    @classmethod
+    def create_from_yaml(
+        cls, environment_config_yaml_filepath, composition_config_yaml_filepath
+    ):
+        config = ConfigReverseEtl.load_from_file(
+            composition_config_file_path=composition_config_yaml_filepath,
+            env_file_path=environment_config_yaml_filepath,
+        )
+        return cls(config)
+
+
+class BigQueryToPostgresql(BigQueryToRdbms):
+    """
+    COPY FROM STDIN. COPY streams the whole file at once, batch_size only bounds
+    the upsert transactions, larger as postgresql never escalates row locks
+    """
+
+    dialect = "postgresql"
+    default_bulk_load = BulkLoad(batch_size=50000)
+
+
+class BigQueryToMssql(BigQueryToRdbms):
+    """
+    Bulk copy with TABLOCK, committed every batch_size rows. The batches stay under
+    the 5000 row locks at which sql server escalates a merge to a table lock.
+    Needs the mssql extra, apache-airflow-providers-microsoft-mssql and a pymssql
+    with bulk_copy: pip install debussy_concert[mssql]
+    """
+
+    dialect = "mssql"
+    default_bulk_load = BulkLoad(batch_size=4000)
@@ -1,8 +1,15 @@
+import dataclasses
+import posixpath
+
 from debussy_concert.core.composition.composition_base import CompositionBase
+from debussy_concert.core.motif.chunked_transfer import ChunkedStorageTransferMotif
 from debussy_concert.core.phrase.utils.start import StartPhrase
 from debussy_concert.core.phrase.utils.end import EndPhrase
 from debussy_concert.core.motif.mixins.bigquery_job import BigQueryTimePartitioning
-from debussy_concert.pipeline.reverse_etl.movement.reverse_etl import ReverseEtlMovement
+from debussy_concert.pipeline.reverse_etl.movement.reverse_etl import (
+    ReverseEtlMovement,
+    SinglePassReverseEtlMovement,
+)
 from debussy_concert.pipeline.reverse_etl.config.reverse_etl import ConfigReverseEtl
 from debussy_concert.pipeline.reverse_etl.config.movement_parameters.reverse_etl import (
     OutputConfig,
@@ -12,23 +19,117 @@ from debussy_concert.pipeline.reverse_etl.config.movement_parameters.reverse_etl
 from debussy_concert.pipeline.reverse_etl.phrase.dw_to_reverse_etl import (
     DataWarehouseToReverseEtlPhrase,
 )
+from debussy_concert.pipeline.reverse_etl.phrase.dw_to_storage import (
+    DataWarehouseToReverseEtlToStoragePhrase,
+)
 from debussy_concert.pipeline.reverse_etl.phrase.reverse_etl_to_storage import (
     DataWarehouseReverseEtlToTempToStoragePhrase,
 )
 from debussy_concert.pipeline.reverse_etl.phrase.storage_to_destination import (
     StorageToDestinationPhrase,
 )
+from debussy_concert.pipeline.reverse_etl.phrase.snapshot import PromoteSnapshotPhrase
 from debussy_concert.pipeline.reverse_etl.motif.bigquery_query_job import (
     BigQueryQueryJobMotif,
 )
 from debussy_concert.pipeline.reverse_etl.motif.bigquery_extract_job import (
     BigQueryExtractJobMotif,
 )
+from debussy_concert.pipeline.reverse_etl.motif.bigquery_export_data import (
+    BigQueryExportDataMotif,
+)
+from debussy_concert.pipeline.reverse_etl.motif.bigquery_snapshot_diff import (
+    BigQuerySnapshotDiffMotif,
+)
+from debussy_concert.pipeline.reverse_etl.motif.gcs_compose import GcsComposeMotif
 from debussy_concert.pipeline.reverse_etl.motif.storage_to_storage_motif import (
     StorageToStorageMotif,
 )
 
-from debussy_airflow.hooks.storage_hook import GCSHook, SFTPHook
+
+def compose_shards_motif(destination_config: OutputConfig, gcp_conn_id):
+    """Compose of the extract shards into the file_name, if the output asks for it"""
+    if not destination_config.compose:
+        return None
+    return GcsComposeMotif(
+        name="gcs_compose_shards_motif",
+        print_header=getattr(destination_config, "print_header", False),
+        field_delimiter=getattr(destination_config, "field_delimiter", ","),
+        gcp_conn_id=gcp_conn_id,
+    )
+
+
+def snapshot_diff_motifs(
+    movement_parameters: ReverseEtlMovementParameters, gcp_conn_id
+):
+    """Diff and tombstone export motifs of a snapshot diff movement, else Nones"""
+    snapshot_diff = movement_parameters.snapshot_diff
+    if snapshot_diff is None:
+        return None, None
+    diff = BigQuerySnapshotDiffMotif(
+        name="bq_snapshot_diff_motif", key=snapshot_diff.key, gcp_conn_id=gcp_conn_id
+    )
+    # the tombstones are few, a single file in the output format
+    tombstones_config = dataclasses.replace(
+        movement_parameters.output_config, sharded=False, compose=False
+    )
+    export_tombstones = BigQueryExtractJobMotif(
+        name="bq_export_tombstones_to_gcs_motif",
+        gcp_conn_id=gcp_conn_id,
+        **tombstones_config.extract_options(),
+    )
+    return diff, export_tombstones
+
+
+def promote_snapshot_phrase(
+    movement_parameters: ReverseEtlMovementParameters, gcp_conn_id
+):
+    if movement_parameters.snapshot_diff is None:
+        return None
+    promote_snapshot = BigQueryQueryJobMotif(
+        name="bq_promote_snapshot_motif", gcp_conn_id=gcp_conn_id
+    )
+    return PromoteSnapshotPhrase(
+        name="PromoteSnapshotPhrase", promote_snapshot_motif=promote_snapshot
+    )
+
+
+def single_pass_reverse_etl_movement(
+    movement_parameters: ReverseEtlMovementParameters,
+    storage_to_destination_phrase,
+    gcp_conn_id,
+    config_name,
+) -> SinglePassReverseEtlMovement:
+    output_config: CsvFile = movement_parameters.output_config
+    if not isinstance(output_config, CsvFile) or output_config.compression:
+        # the shards are composed under a plain header line
+        raise ValueError("single_pass reverse etl exports uncompressed csv files")
+    if output_config.sharded:
+        raise ValueError("single_pass reverse etl always composes its shards")
+    export_data = BigQueryExportDataMotif(
+        name="bq_to_reverse_etl_and_storage_motif",
+        field_delimiter=output_config.field_delimiter,
+        print_header=output_config.print_header,
+        time_partitioning=BigQueryTimePartitioning(
+            type=movement_parameters.reverse_etl_dataset_partition_type,
+            field=movement_parameters.reverse_etl_dataset_partition_field,
+        ),
+        gcp_conn_id=gcp_conn_id,
+        query_budget=movement_parameters.query_budget,
+        skip_if_unchanged=movement_parameters.skip_if_unchanged,
+        fingerprint_key=f"{config_name}/{movement_parameters.name}",
+    )
+    movement = SinglePassReverseEtlMovement(
+        name=f"ReverseEtlMovement_{movement_parameters.name}",
+        start_phrase=StartPhrase(),
+        data_warehouse_to_storage_phrase=DataWarehouseToReverseEtlToStoragePhrase(
+            dw_to_storage_motif=export_data
+        ),
+        storage_to_destination_phrase=storage_to_destination_phrase,
+        end_phrase=EndPhrase(),
+    )
+    movement.setup(movement_parameters)
+    return movement
 
 
 class ReverseEtlBigQueryToStorageComposition(CompositionBase):
@@ -50,6 +151,13 @@ class ReverseEtlBigQueryToStorageComposition(CompositionBase):
         storage_to_destination_phrase,
         movement_parameters: ReverseEtlMovementParameters,
     ) -> ReverseEtlMovement:
+        if movement_parameters.single_pass:
+            return single_pass_reverse_etl_movement(
+                movement_parameters,
+                storage_to_destination_phrase,
+                gcp_conn_id=self.config.environment.data_lakehouse_connection_id,
+                config_name=self.config.name,
+            )
         start_phrase = StartPhrase()
         end_phrase = EndPhrase()
         output_config: OutputConfig = movement_parameters.output_config
@@ -58,12 +166,17 @@ class ReverseEtlBigQueryToStorageComposition(CompositionBase):
                 partition_type=movement_parameters.reverse_etl_dataset_partition_type,
                 partition_field=movement_parameters.reverse_etl_dataset_partition_field,
                 gcp_conn_id=self.config.environment.data_lakehouse_connection_id,
+                query_budget=movement_parameters.query_budget,
+                skip_if_unchanged=movement_parameters.skip_if_unchanged,
+                fingerprint_key=f"{self.config.name}/{movement_parameters.name}",
             )
         )
         data_warehouse_reverse_etl_to_storage_phrase = (
             self.data_warehouse_reverse_etl_to_storage_phrase(
                 destination_config=output_config,
                 gcp_conn_id=self.config.environment.data_lakehouse_connection_id,
+                query_budget=movement_parameters.query_budget,
+                movement_parameters=movement_parameters,
             )
         )
 
@@ -75,12 +188,22 @@ class ReverseEtlBigQueryToStorageComposition(CompositionBase):
             data_warehouse_reverse_etl_to_storage_phrase=data_warehouse_reverse_etl_to_storage_phrase,
             storage_to_destination_phrase=storage_to_destination_phrase,
             end_phrase=end_phrase,
+            promote_snapshot_phrase=promote_snapshot_phrase(
+                movement_parameters,
+                self.config.environment.data_lakehouse_connection_id,
+            ),
         )
         movement.setup(movement_parameters)
         return movement
 
     def data_warehouse_raw_to_reverse_etl_phrase(
-        self, partition_type, partition_field, gcp_conn_id
+        self,
+        partition_type,
+        partition_field,
+        gcp_conn_id,
+        query_budget=None,
+        skip_if_unchanged=None,
+        fingerprint_key=None,
     ):
         time_partitioning = BigQueryTimePartitioning(
             type=partition_type, field=partition_field
@@ -91,40 +214,52 @@ class ReverseEtlBigQueryToStorageComposition(CompositionBase):
             create_disposition="CREATE_IF_NEEDED",
             time_partitioning=time_partitioning,
             gcp_conn_id=gcp_conn_id,
+            query_budget=query_budget,
+            skip_if_unchanged=skip_if_unchanged,
+            fingerprint_key=fingerprint_key,
         )
         phrase = DataWarehouseToReverseEtlPhrase(dw_to_reverse_etl_motif=bigquery_job)
         return phrase
 
     def data_warehouse_reverse_etl_to_storage_phrase(
-        self, destination_config: OutputConfig, gcp_conn_id
+        self,
+        destination_config: OutputConfig,
+        gcp_conn_id,
+        query_budget=None,
+        movement_parameters: ReverseEtlMovementParameters = None,
     ):
-        # mapping the format config to the respective motif function
-        export_format = destination_config.format.lower()
-        export_format_fn_map = {"csv": self.extract_csv_motif}
-        export_format_fn = export_format_fn_map[export_format]
-
         bigquery_job = BigQueryQueryJobMotif(
             name="bq_reverse_etl_to_temp_table_motif",
             write_disposition="WRITE_TRUNCATE",
             create_disposition="CREATE_IF_NEEDED",
             gcp_conn_id=gcp_conn_id,
+            query_budget=query_budget,
         )
 
-        export_bigquery = export_format_fn(destination_config, gcp_conn_id)
+        export_bigquery = self.extract_file_motif(destination_config, gcp_conn_id)
+        snapshot_diff, export_tombstones = (None, None)
+        if movement_parameters is not None:
+            snapshot_diff, export_tombstones = snapshot_diff_motifs(
+                movement_parameters, gcp_conn_id
+            )
         phrase = DataWarehouseReverseEtlToTempToStoragePhrase(
             name="DataWarehouseReverseEtlToStoragePhrase",
             datawarehouse_reverse_etl_to_temp_table_motif=bigquery_job,
             export_temp_table_to_storage_motif=export_bigquery,
+            compose_storage_shards_motif=compose_shards_motif(
+                destination_config, gcp_conn_id
+            ),
+            snapshot_diff_motif=snapshot_diff,
+            export_tombstones_motif=export_tombstones,
         )
         return phrase
 
-    def extract_csv_motif(self, destination_config: CsvFile, gcp_conn_id):
+    def extract_file_motif(self, destination_config: OutputConfig, gcp_conn_id):
+        # csv, avro, parquet or json file with the compression of the output config
         export_bigquery = BigQueryExtractJobMotif(
             name="bq_export_temp_table_to_gcs_motif",
-            destination_format=destination_config.format,
-            field_delimiter=destination_config.field_delimiter,
-            print_header=destination_config.print_header,
             gcp_conn_id=gcp_conn_id,
+            **destination_config.extract_options(),
         )
 
         return export_bigquery
@@ -132,6 +267,9 @@ class ReverseEtlBigQueryToStorageComposition(CompositionBase):
     def storage_to_destination_phrase(
         self, movement_parameters: ReverseEtlMovementParameters
     ):
+        if movement_parameters.chunked_transfer is not None:
+            return self.chunked_storage_to_destination_phrase(movement_parameters)
+        from debussy_airflow.hooks.storage_hook import GCSHook, SFTPHook
 
         destination_file_uri = movement_parameters.destination_uri
         destination_type = movement_parameters.destination_type.lower()
@@ -144,13 +282,81 @@ class ReverseEtlBigQueryToStorageComposition(CompositionBase):
             gcp_conn_id=self.config.environment.data_lakehouse_connection_id
         )
         destination_hook = HookCls(movement_parameters.destination_connection_id)
+        output_config: OutputConfig = movement_parameters.output_config
+        max_parallel_transfers = None
+        if output_config.sharded and not output_config.compose:
+            # destination_uri is the folder receiving the shards
+            max_parallel_transfers = output_config.max_parallel_transfers
         storage_to_storage_motif = StorageToStorageMotif(
             name=f"gcs_to_{destination_type}_motif",
             origin_storage_hook=origin_gcs_hook,
             destiny_storage_hook=destination_hook,
             destiny_file_uri=destination_file_uri,
+            max_parallel_transfers=max_parallel_transfers,
         )
+        tombstones_motif = None
+        if movement_parameters.snapshot_diff is not None:
+            tombstones_motif = StorageToStorageMotif(
+                name=f"gcs_tombstones_to_{destination_type}_motif",
+                origin_storage_hook=origin_gcs_hook,
+                destiny_storage_hook=destination_hook,
+                destiny_file_uri=self.tombstones_destination_uri(
+                    movement_parameters, destination_file_uri
+                ),
+            )
         phrase = StorageToDestinationPhrase(
-            storage_to_destination_motif=storage_to_storage_motif
+            storage_to_destination_motif=storage_to_storage_motif,
+            tombstones_to_destination_motif=tombstones_motif,
         )
         return phrase
+
+    @staticmethod
+    def tombstones_destination_uri(
+        movement_parameters: ReverseEtlMovementParameters, destination_uri
+    ):
+        """The tombstone file next to the delivered file, or in its folder"""
+        snapshot_diff = movement_parameters.snapshot_diff
+        file_name = movement_parameters.output_config.file_name
+        if destination_uri.endswith("/"):
+            return destination_uri + snapshot_diff.tombstone_uri(file_name)
+        return snapshot_diff.tombstone_uri(destination_uri)
+
+    def chunked_storage_to_destination_phrase(
+        self, movement_parameters: ReverseEtlMovementParameters
+    ):
+        output_config: OutputConfig = movement_parameters.output_config
+        if output_config.sharded and not output_config.compose:
+            raise ValueError("chunked_transfer moves a single file, set compose")
+        destination_type = movement_parameters.destination_type.lower()
+        destination_uri = movement_parameters.destination_uri
+        if destination_type == "sftp":
+            # the sftp destination_uri is the folder receiving the file
+            destination_uri = "sftp://" + posixpath.join(
+                destination_uri, output_config.file_name
+            )
+        elif destination_type not in ("gcs", "s3"):
+            raise NotImplementedError(f"Invalid destination_type: {destination_type}")
+        transfer_kwargs = dict(
+            transfer=movement_parameters.chunked_transfer,
+            origin_conn_id=self.config.environment.data_lakehouse_connection_id,
+            destination_conn_id=movement_parameters.destination_connection_id,
+            gcp_conn_id=self.config.environment.data_lakehouse_connection_id,
+        )
+        transfer_motif = ChunkedStorageTransferMotif(
+            name=f"gcs_to_{destination_type}_motif",
+            destination_uri=destination_uri,
+            **transfer_kwargs,
+        )
+        tombstones_motif = None
+        if movement_parameters.snapshot_diff is not None:
+            tombstones_motif = ChunkedStorageTransferMotif(
+                name=f"gcs_tombstones_to_{destination_type}_motif",
+                destination_uri=self.tombstones_destination_uri(
+                    movement_parameters, destination_uri
+                ),
+                **transfer_kwargs,
+            )
+        return StorageToDestinationPhrase(
+            storage_to_destination_motif=transfer_motif,
+            tombstones_to_destination_motif=tombstones_motif,
+        )
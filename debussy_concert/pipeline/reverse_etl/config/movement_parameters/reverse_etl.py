@@ -1,33 +1,108 @@
 from dataclasses import dataclass
+from typing import List, Optional
 
 from debussy_concert.core.config.movement_parameters.base import MovementParametersBase
+from debussy_concert.core.config.movement_parameters.bulk_load import BulkLoad
+from debussy_concert.core.config.movement_parameters.chunked_transfer import (
+    ChunkedTransfer,
+)
+from debussy_concert.core.config.movement_parameters.query_budget import QueryBudget
+from debussy_concert.core.config.movement_parameters.skip_unchanged import (
+    SkipIfUnchanged,
+)
+from debussy_concert.core.config.movement_parameters.snapshot_diff import (
+    SnapshotDiff,
+)
 
 
 @dataclass(frozen=True)
 class OutputConfig:
     format: str
     file_name: str
+    # extract job compression, one of the compressions of the format
+    compression: Optional[str] = None
+    # extract to wildcard shards (required over 1 GB) delivered in parallel, or
+    # composed on gcs into the single file_name when compose is set
+    sharded: bool = False
+    compose: bool = False
+    max_parallel_transfers: int = 8
+
+    destination_format = "CSV"
+    compressions = ("GZIP",)
+    # shards of these formats can be concatenated into a valid file
+    composable = False
+
+    def __post_init__(self):
+        if self.compression is not None and self.compression not in self.compressions:
+            raise ValueError(
+                f"Invalid compression for {self.format}: {self.compression}"
+            )
+        if self.compose and not (self.sharded and self.composable):
+            raise ValueError(f"compose requires sharded {self.format} files")
+        if self.max_parallel_transfers < 1:
+            raise ValueError("max_parallel_transfers must be at least 1")
+
+    @property
+    def shard_pattern(self):
+        """Wildcard shard name keeping the file_name extensions"""
+        _, dot, extensions = self.file_name.partition(".")
+        return f"part-*{dot}{extensions}"
+
+    def extract_options(self) -> dict:
+        """BigQueryExtractJobMotif arguments for the file format"""
+        return {
+            "destination_format": self.destination_format,
+            "compression": self.compression,
+        }
 
 
 @dataclass(frozen=True)
 class CsvFile(OutputConfig):
-    field_delimiter: str
+    field_delimiter: str = ","
     print_header: bool = True
 
+    composable = True
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.compose and self.print_header and self.compression:
+            # the header is composed as a plain text object before the shards
+            raise ValueError("compose of compressed csv files requires no header")
+
+    def extract_options(self):
+        return {
+            **super().extract_options(),
+            "field_delimiter": self.field_delimiter,
+            # composed files get a single header from the table schema instead
+            "print_header": self.print_header and not self.compose,
+        }
+
 
+@dataclass(frozen=True)
 class AvroFile(OutputConfig):
-    def __init__(self, *args, **kwargs):
-        raise NotImplementedError("AvroFile is not implemented yet")
+    # DATE, TIMESTAMP etc exported as avro logical types instead of strings/longs
+    use_avro_logical_types: bool = True
+
+    destination_format = "AVRO"
+    compressions = ("DEFLATE", "SNAPPY")
+
+    def extract_options(self):
+        return {
+            **super().extract_options(),
+            "use_avro_logical_types": self.use_avro_logical_types,
+        }
 
 
+@dataclass(frozen=True)
 class ParquetFile(OutputConfig):
-    def __init__(self, *args, **kwargs):
-        raise NotImplementedError("ParquetFile is not implemented yet")
+    destination_format = "PARQUET"
+    compressions = ("SNAPPY", "GZIP", "ZSTD")
 
 
+@dataclass(frozen=True)
 class JsonFile(OutputConfig):
-    def __init__(self, *args, **kwargs):
-        raise NotImplementedError("JsonFile is not implemented yet")
+    destination_format = "NEWLINE_DELIMITED_JSON"
+    composable = True
 
 
 def output_factory(output_config):
@@ -55,12 +130,51 @@ class ReverseEtlMovementParameters(MovementParametersBase):
     destination_connection_id: str
     extraction_query_from_temp: str
     destination_uri: str
+    # dry run budget of reverse_etl_query and extraction_query_from_temp
+    query_budget: Optional[QueryBudget] = None
+    # skips the movement when reverse_etl_query and its sources did not change
+    skip_if_unchanged: Optional[SkipIfUnchanged] = None
+    # history write and export in one BigQuery script, without the temp table
+    single_pass: bool = False
+    # streams the file to the destination in chunks instead of as one unit
+    chunked_transfer: Optional[ChunkedTransfer] = None
+    # rdbms destinations load the file in bulk instead of building insert queries
+    bulk_load: Optional[BulkLoad] = None
+    # rdbms rows are appended, replace the table rows or are upserted on merge_key
+    write_mode: str = "append"
+    merge_key: Optional[List[str]] = None
+    # delivers the rows changed since the previous delivery and a tombstone file
+    snapshot_diff: Optional[SnapshotDiff] = None
+
+    write_modes = ("append", "replace", "upsert")
 
     def __post_init__(self):
         output_config = output_factory(self.output_config)
         # hack for frozen dataclass https://stackoverflow.com/a/54119384
         # overwriting output_config with output_factory instance
         object.__setattr__(self, "output_config", output_config)
+        if isinstance(self.query_budget, dict):
+            object.__setattr__(self, "query_budget", QueryBudget(**self.query_budget))
+        if isinstance(self.skip_if_unchanged, dict):
+            skip_if_unchanged = SkipIfUnchanged(**self.skip_if_unchanged)
+            object.__setattr__(self, "skip_if_unchanged", skip_if_unchanged)
+        if isinstance(self.chunked_transfer, dict):
+            chunked_transfer = ChunkedTransfer(**self.chunked_transfer)
+            object.__setattr__(self, "chunked_transfer", chunked_transfer)
+        if isinstance(self.bulk_load, dict):
+            object.__setattr__(self, "bulk_load", BulkLoad(**self.bulk_load))
+        if self.write_mode not in self.write_modes:
+            raise ValueError(f"Invalid write_mode: {self.write_mode}")
+        if self.write_mode == "upsert" and not self.merge_key:
+            raise ValueError("upsert write_mode requires a merge_key")
+        if isinstance(self.snapshot_diff, dict):
+            snapshot_diff = SnapshotDiff(**self.snapshot_diff)
+            object.__setattr__(self, "snapshot_diff", snapshot_diff)
+        if self.snapshot_diff is not None:
+            if self.single_pass:
+                raise ValueError("single_pass reverse etl exports every row")
+            if self.write_mode == "replace":
+                raise ValueError("snapshot_diff delivers changed rows, not all rows")
 
     @classmethod
     def load_from_dict(cls, movement_parameters):
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from yaml_env_var_parser import load as yaml_load
 
 from debussy_concert.core.config.config_environment import ConfigEnvironment
@@ -17,6 +17,7 @@ class ConfigReverseEtl(ConfigComposition):
         dag_parameters,
         extraction_movements: List[ReverseEtlMovementParameters],
         environment: ConfigEnvironment,
+        bigquery_config: Optional[dict] = None,
     ):
         super().__init__(
             name=name,
@@ -25,6 +26,7 @@ class ConfigReverseEtl(ConfigComposition):
             environment=environment,
             dag_parameters=dag_parameters,
         )
+        object.__setattr__(self, "bigquery_config", bigquery_config)
 
     @classmethod
     def load_from_file(cls, composition_config_file_path, env_file_path):
@@ -0,0 +1,209 @@
+from typing import Optional
+
+from debussy_concert.core.config.movement_parameters.query_budget import QueryBudget
+from debussy_concert.core.config.movement_parameters.skip_unchanged import (
+    SkipIfUnchanged,
+)
+from debussy_concert.core.motif.motif_base import MotifBase
+from debussy_concert.core.motif.mixins.bigquery_job import (
+    BigQueryJobMixin,
+    BigQueryTimePartitioning,
+)
+from debussy_concert.core.service.lakehouse.google_cloud import (
+    delete_gcs_prefix,
+    split_gcs_uri,
+)
+
+# gcs compose accepts up to 32 source objects per request
+COMPOSE_MAX_SOURCES = 32
+
+
+def compose_export_shards(
+    shards_uri_prefix, destination_uri, header_query, field_delimiter, gcp_conn_id
+):
+    """
+    Concatenates the EXPORT DATA shards, after a header line with the columns of
+    header_query when given, into the single destination file on the server side.
+    The shards are composed into a temporary object rewritten into place and are
+    kept, so a retry composes the same file. They are cleared before the next export
+    """
+    from airflow.providers.google.cloud.hooks.gcs import GCSHook
+
+    hook = GCSHook(gcp_conn_id=gcp_conn_id)
+    bucket, shards_prefix = split_gcs_uri(shards_uri_prefix)
+    _, destination = split_gcs_uri(destination_uri)
+    header_object = f"{shards_prefix}header"
+    shards = hook.list(bucket, prefix=shards_prefix)
+    source_objects = sorted(name for name in shards if name != header_object)
+    if header_query:
+        from airflow.providers.google.cloud.hooks.bigquery import BigQueryHook
+        from google.cloud.bigquery import QueryJobConfig
+
+        client = BigQueryHook(gcp_conn_id=gcp_conn_id).get_client()
+        dry_run = client.query(
+            header_query, job_config=QueryJobConfig(dry_run=True, use_legacy_sql=False)
+        )
+        header = field_delimiter.join(field.name for field in dry_run.schema)
+        hook.upload(bucket, header_object, data=f"{header}\n")
+        source_objects.insert(0, header_object)
+    if not source_objects:
+        hook.upload(bucket, destination, data="")
+        return destination_uri
+
+    # readers never see a partly composed destination
+    composing = f"{destination}.composing"
+    hook.compose(bucket, source_objects[:COMPOSE_MAX_SOURCES], composing)
+    step = COMPOSE_MAX_SOURCES - 1
+    for i in range(COMPOSE_MAX_SOURCES, len(source_objects), step):
+        hook.compose(bucket, [composing, *source_objects[i:i + step]], composing)
+    hook.rewrite(bucket, composing, bucket, destination)
+    hook.delete(bucket, composing)
+    return destination_uri
+
+
+class BigQueryExportDataMotif(MotifBase, BigQueryJobMixin):
+    """
+    Appends the reverse etl query to its history table and exports the extraction
+    query over that table in a single BigQuery script, with no temp table and no
+    extract job. EXPORT DATA writes csv shards that are then composed into the
+    destination file. The history table is created partitioned by the TIMESTAMP
+    partition field if it does not exist. A retried script first deletes the
+    history rows with the partition field values of this run, in the same
+    transaction as the insert, so they are never appended twice
+    """
+
+    def __init__(
+        self,
+        field_delimiter: Optional[str] = ",",
+        print_header: Optional[bool] = True,
+        time_partitioning: Optional[BigQueryTimePartitioning] = None,
+        gcp_conn_id="google_cloud_default",
+        query_budget: Optional[QueryBudget] = None,
+        skip_if_unchanged: Optional[SkipIfUnchanged] = None,
+        fingerprint_key: Optional[str] = None,
+        name=None,
+        **op_kw_args,
+    ):
+        super().__init__(name=name)
+        self.field_delimiter = field_delimiter
+        self.print_header = print_header
+        self.time_partitioning = time_partitioning
+        self.gcp_conn_id = gcp_conn_id
+        self.query_budget = query_budget
+        self.skip_if_unchanged = skip_if_unchanged
+        self.fingerprint_key = fingerprint_key
+        self.op_kw_args = op_kw_args
+
+    def setup(
+        self, reverse_etl_query, reverse_etl_table_uri, extraction_query, destination_uri
+    ):
+        self.reverse_etl_query = reverse_etl_query.strip().rstrip(";")
+        self.reverse_etl_table_uri = reverse_etl_table_uri
+        self.extraction_query = extraction_query.strip().rstrip(";")
+        self.destination_uri = destination_uri
+        return self
+
+    @property
+    def shards_uri_prefix(self):
+        return f"{self.destination_uri}.shards/"
+
+    @property
+    def partition_by(self):
+        if self.time_partitioning is None:
+            return ""
+        return (
+            f"PARTITION BY TIMESTAMP_TRUNC({self.time_partitioning.field}, "
+            f"{self.time_partitioning.type})"
+        )
+
+    @property
+    def delete_run_rows(self):
+        """Deletes the rows of an earlier try of this run, by partition field value"""
+        if self.time_partitioning is None:
+            return ""
+        field = self.time_partitioning.field
+        return (
+            f"DELETE FROM `{self.reverse_etl_table_uri}` WHERE {field} IN "
+            f"(SELECT DISTINCT {field} FROM ({self.reverse_etl_query}));\n"
+        )
+
+    @property
+    def script(self):
+        delimiter = self.field_delimiter.replace("'", "\\'")
+        return (
+            f"CREATE TABLE IF NOT EXISTS `{self.reverse_etl_table_uri}` "
+            f"{self.partition_by} AS SELECT * FROM ({self.reverse_etl_query}) LIMIT 0;\n"
+            "BEGIN TRANSACTION;\n"
+            f"{self.delete_run_rows}"
+            f"INSERT INTO `{self.reverse_etl_table_uri}` {self.reverse_etl_query};\n"
+            "COMMIT TRANSACTION;\n"
+            "EXPORT DATA OPTIONS(\n"
+            f"  uri='{self.shards_uri_prefix}*.csv', format='CSV', overwrite=true,\n"
+            f"  header=false, field_delimiter='{delimiter}'\n"
+            f") AS {self.extraction_query};"
+        )
+
+    def build(self, dag, phrase_group):
+        from airflow.operators.python import PythonOperator
+
+        # the first of its tasks is downstream of the motifs before it
+        task_group = self.workflow_service.motif_group(
+            group_id=self.name, workflow_dag=dag, phrase_group=phrase_group
+        )
+        # shards of a previous, larger export would be composed with these
+        clear_shards = PythonOperator(
+            task_id=f"{self.name}_clear_shards",
+            python_callable=delete_gcs_prefix,
+            op_kwargs={
+                "uri_prefix": self.shards_uri_prefix,
+                "gcp_conn_id": self.gcp_conn_id,
+            },
+            dag=dag,
+            task_group=task_group,
+        )
+        export_data = self.insert_job_operator(
+            dag,
+            task_group,
+            {"query": {"query": self.script, "useLegacySql": False}},
+            self.gcp_conn_id,
+            **self.op_kw_args,
+        )
+        compose = PythonOperator(
+            task_id=f"{self.name}_compose",
+            python_callable=compose_export_shards,
+            op_kwargs={
+                "shards_uri_prefix": self.shards_uri_prefix,
+                "destination_uri": self.destination_uri,
+                "header_query": self.extraction_query if self.print_header else None,
+                "field_delimiter": self.field_delimiter,
+                "gcp_conn_id": self.gcp_conn_id,
+            },
+            dag=dag,
+            task_group=task_group,
+        )
+        tasks = [clear_shards, export_data, compose]
+        # budget and fingerprint are about the reverse etl query, the bulk of the script
+        reverse_etl_configuration = {
+            "query": {"query": self.reverse_etl_query, "useLegacySql": False}
+        }
+        if self.query_budget is not None:
+            dry_run = self.dry_run_operator(
+                dag,
+                task_group,
+                reverse_etl_configuration,
+                self.query_budget,
+                self.gcp_conn_id,
+            )
+            tasks.insert(0, dry_run)
+        if self.skip_if_unchanged is not None:
+            check_changed, save = self.skip_if_unchanged_operators(
+                dag,
+                task_group,
+                reverse_etl_configuration,
+                self.skip_if_unchanged,
+                f"{self.fingerprint_key or self.config.name}/{self.name}",
+                self.gcp_conn_id,
+            )
+            tasks = [check_changed, *tasks, save]
+        self.workflow_service.chain_tasks(*tasks)
+        return task_group
@@ -1,6 +1,7 @@
 from typing import Optional, Union, List
 from debussy_concert.core.motif.motif_base import MotifBase
 from debussy_concert.core.motif.mixins.bigquery_job import BigQueryJobMixin
+from debussy_concert.core.service.lakehouse.google_cloud import delete_gcs_prefix
 
 
 class BigQueryExtractJobMotif(MotifBase, BigQueryJobMixin):
@@ -9,6 +10,8 @@ class BigQueryExtractJobMotif(MotifBase, BigQueryJobMixin):
         field_delimiter: Optional[str] = ",",
         destination_format: Optional[str] = "CSV",
         print_header: Optional[bool] = True,
+        compression: Optional[str] = None,
+        use_avro_logical_types: Optional[bool] = None,
         gcp_conn_id="google_cloud_default",
         name=None,
     ):
@@ -16,6 +19,8 @@ class BigQueryExtractJobMotif(MotifBase, BigQueryJobMixin):
         self.field_delimiter = field_delimiter
         self.destination_format = destination_format
         self.print_header = print_header
+        self.compression = compression
+        self.use_avro_logical_types = use_avro_logical_types
         self.gcp_conn_id = gcp_conn_id
 
     def setup(self, source_table_uri: str, destination_uris: Union[List[str], str]):
@@ -28,16 +33,45 @@ class BigQueryExtractJobMotif(MotifBase, BigQueryJobMixin):
             raise ValueError("source_table_uri cant be none. initialize on setup")
         if self.destination_uris is None:
             raise ValueError("destination_uris cant be none. initialize on setup")
+        destination_uris = self.destination_uris
+        if isinstance(destination_uris, str):
+            destination_uris = [destination_uris]
+        shard_folders = {
+            uri.rpartition("/")[0] + "/" for uri in destination_uris if "*" in uri
+        }
+        task_group = phrase_group
+        if shard_folders:
+            # the clear shards tasks are the entry of the motif, downstream of the
+            # motifs before it
+            task_group = self.workflow_service.motif_group(
+                group_id=self.name, workflow_dag=dag, phrase_group=phrase_group
+            )
         bigquery_job_operator = self.insert_job_operator(
             dag,
-            phrase_group,
+            task_group,
             self.extract_configuration(
                 self.source_table_uri,
                 self.destination_uris,
                 self.field_delimiter,
                 self.destination_format,
                 self.print_header,
+                self.compression,
+                self.use_avro_logical_types,
             ),
             self.gcp_conn_id,
         )
+        for index, shard_folder in enumerate(sorted(shard_folders)):
+            # shards of a previous, larger extract would be delivered with these
+            from airflow.operators.python import PythonOperator
+
+            clear_shards = PythonOperator(
+                task_id=f"{self.name}_clear_shards_{index}",
+                python_callable=delete_gcs_prefix,
+                op_kwargs={"uri_prefix": shard_folder, "gcp_conn_id": self.gcp_conn_id},
+                dag=dag,
+                task_group=task_group,
+            )
+            clear_shards >> bigquery_job_operator
+        if shard_folders:
+            return task_group
         return bigquery_job_operator
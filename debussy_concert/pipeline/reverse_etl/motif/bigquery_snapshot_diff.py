@@ -0,0 +1,66 @@
+from typing import List
+
+from debussy_concert.core.motif.motif_base import MotifBase
+from debussy_concert.core.motif.mixins.bigquery_job import BigQueryJobMixin
+
+
+class BigQuerySnapshotDiffMotif(MotifBase, BigQueryJobMixin):
+    """
+    Set difference of the current rows and the snapshot of the delivered ones, in
+    a single BigQuery script. Rows are compared by the hashes of their key and of
+    the whole row: the delta table gets the rows whose pair is not in the snapshot,
+    the tombstone table the keys of the snapshot no longer in the current rows and
+    the pending snapshot the pairs of the current rows
+    """
+
+    def __init__(self, key: List[str], gcp_conn_id="google_cloud_default", name=None):
+        super().__init__(name=name)
+        self.key = key
+        self.gcp_conn_id = gcp_conn_id
+
+    def setup(
+        self,
+        current_table_uri,
+        delta_table_uri,
+        tombstone_table_uri,
+        snapshot_table_uri,
+        pending_snapshot_table_uri,
+    ):
+        self.current_table_uri = current_table_uri
+        self.delta_table_uri = delta_table_uri
+        self.tombstone_table_uri = tombstone_table_uri
+        self.snapshot_table_uri = snapshot_table_uri
+        self.pending_snapshot_table_uri = pending_snapshot_table_uri
+        return self
+
+    @property
+    def script(self):
+        key_list = ", ".join(f"`{column}`" for column in self.key)
+        hashes = "_key_hash, _row_hash"
+        return (
+            "CREATE TEMP TABLE current_rows AS SELECT current_row.*, "
+            f"FARM_FINGERPRINT(TO_JSON_STRING(STRUCT({key_list}))) AS _key_hash, "
+            "FARM_FINGERPRINT(TO_JSON_STRING(current_row)) AS _row_hash "
+            f"FROM `{self.current_table_uri}` AS current_row;\n"
+            f"CREATE TABLE IF NOT EXISTS `{self.snapshot_table_uri}` AS "
+            f"SELECT {key_list}, {hashes} FROM current_rows LIMIT 0;\n"
+            f"CREATE OR REPLACE TABLE `{self.delta_table_uri}` AS "
+            f"SELECT current_rows.* EXCEPT ({hashes}) FROM current_rows "
+            f"JOIN (SELECT {hashes} FROM current_rows EXCEPT DISTINCT "
+            f"SELECT {hashes} FROM `{self.snapshot_table_uri}`) USING ({hashes});\n"
+            f"CREATE OR REPLACE TABLE `{self.tombstone_table_uri}` AS "
+            f"SELECT {key_list} FROM `{self.snapshot_table_uri}` "
+            "JOIN (SELECT _key_hash FROM "
+            f"`{self.snapshot_table_uri}` EXCEPT DISTINCT "
+            "SELECT _key_hash FROM current_rows) USING (_key_hash);\n"
+            f"CREATE OR REPLACE TABLE `{self.pending_snapshot_table_uri}` AS "
+            f"SELECT {key_list}, {hashes} FROM current_rows;"
+        )
+
+    def build(self, dag, phrase_group):
+        return self.insert_job_operator(
+            dag,
+            phrase_group,
+            {"query": {"query": self.script, "useLegacySql": False}},
+            self.gcp_conn_id,
+        )
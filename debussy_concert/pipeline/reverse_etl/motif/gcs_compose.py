@@ -0,0 +1,49 @@
+from typing import Optional
+
+from debussy_concert.core.motif.motif_base import MotifBase
+from debussy_concert.pipeline.reverse_etl.motif.bigquery_export_data import (
+    compose_export_shards,
+)
+
+
+class GcsComposeMotif(MotifBase):
+    """
+    Composes the shards of a wildcard extract into a single gcs file, on the
+    server side. With print_header the single header line comes from the schema
+    of header_query
+    """
+
+    def __init__(
+        self,
+        print_header: Optional[bool] = False,
+        field_delimiter: Optional[str] = ",",
+        gcp_conn_id="google_cloud_default",
+        name=None,
+    ):
+        super().__init__(name=name)
+        self.print_header = print_header
+        self.field_delimiter = field_delimiter
+        self.gcp_conn_id = gcp_conn_id
+
+    def setup(self, shards_uri_prefix, destination_uri, header_query=None):
+        self.shards_uri_prefix = shards_uri_prefix
+        self.destination_uri = destination_uri
+        self.header_query = header_query
+        return self
+
+    def build(self, dag, phrase_group):
+        from airflow.operators.python import PythonOperator
+
+        return PythonOperator(
+            task_id=self.name,
+            python_callable=compose_export_shards,
+            op_kwargs={
+                "shards_uri_prefix": self.shards_uri_prefix,
+                "destination_uri": self.destination_uri,
+                "header_query": self.header_query if self.print_header else None,
+                "field_delimiter": self.field_delimiter,
+                "gcp_conn_id": self.gcp_conn_id,
+            },
+            dag=dag,
+            task_group=phrase_group,
+        )
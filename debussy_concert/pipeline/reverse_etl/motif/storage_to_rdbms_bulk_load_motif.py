@@ -0,0 +1,124 @@
+from typing import List, Optional
+
+from debussy_concert.core.config.movement_parameters.bulk_load import BulkLoad
+from debussy_concert.core.motif.motif_base import MotifBase
+from debussy_concert.core.service.rdbms.bulk_load import bulk_delete_csv, bulk_load_csv
+from debussy_concert.core.service.rdbms.parallel_load import parallel_bulk_load_csv
+
+
+class StorageToRdbmsBulkLoadMotif(MotifBase):
+    """
+    Bulk load alternative to StorageToRdbmsQueryMotif, see BulkLoad. replace and
+    upsert write modes go through a staging table. The files of a storage folder,
+    a uri ending with /, are always loaded in parallel
+    """
+
+    def __init__(
+        self,
+        rdbms_conn_id: str,
+        dialect: str,
+        destination_table: str,
+        bulk_load: Optional[BulkLoad] = None,
+        field_delimiter=",",
+        storage_conn_id="google_cloud_default",
+        write_mode="append",
+        merge_key: Optional[List[str]] = None,
+        name=None,
+    ):
+        super().__init__(name=name)
+        self.rdbms_conn_id = rdbms_conn_id
+        self.dialect = dialect
+        self.destination_table = destination_table
+        self.bulk_load = bulk_load or BulkLoad()
+        self.field_delimiter = field_delimiter
+        self.storage_conn_id = storage_conn_id
+        self.write_mode = write_mode
+        self.merge_key = merge_key
+
+    def setup(self, storage_uri_prefix=None):
+        self.storage_file_uri = storage_uri_prefix
+        return self
+
+    def build(self, dag, task_group):
+        from airflow.operators.python import PythonOperator
+
+        op_kwargs = {
+            "table": self.destination_table,
+            "dialect": self.dialect,
+            "rdbms_conn_id": self.rdbms_conn_id,
+            "method": self.bulk_load.method,
+            "field_delimiter": self.field_delimiter,
+            "batch_size": self.bulk_load.batch_size,
+            "commit_interval": self.bulk_load.commit_interval,
+            "storage_conn_id": self.storage_conn_id,
+            "write_mode": self.write_mode,
+            "merge_key": self.merge_key,
+        }
+        if self.bulk_load.parallel or self.storage_file_uri.endswith("/"):
+            python_callable = parallel_bulk_load_csv
+            op_kwargs.update(
+                storage_uri=self.storage_file_uri,
+                parallel_connections=self.bulk_load.parallel_connections,
+                shard_rows=self.bulk_load.shard_rows,
+                shard_retries=self.bulk_load.shard_retries,
+            )
+        else:
+            python_callable = bulk_load_csv
+            op_kwargs.update(storage_file_uri=self.storage_file_uri)
+        return PythonOperator(
+            task_id=self.name,
+            python_callable=python_callable,
+            op_kwargs=op_kwargs,
+            dag=dag,
+            task_group=task_group,
+        )
+
+
+class StorageToRdbmsBulkDeleteMotif(MotifBase):
+    """Deletes the destination rows with the keys of a csv file, see bulk_delete_csv"""
+
+    def __init__(
+        self,
+        rdbms_conn_id: str,
+        dialect: str,
+        destination_table: str,
+        key: List[str],
+        bulk_load: Optional[BulkLoad] = None,
+        field_delimiter=",",
+        storage_conn_id="google_cloud_default",
+        name=None,
+    ):
+        super().__init__(name=name)
+        self.rdbms_conn_id = rdbms_conn_id
+        self.dialect = dialect
+        self.destination_table = destination_table
+        self.key = key
+        self.bulk_load = bulk_load or BulkLoad()
+        self.field_delimiter = field_delimiter
+        self.storage_conn_id = storage_conn_id
+
+    def setup(self, storage_uri_prefix=None):
+        self.storage_file_uri = storage_uri_prefix
+        return self
+
+    def build(self, dag, task_group):
+        from airflow.operators.python import PythonOperator
+
+        return PythonOperator(
+            task_id=self.name,
+            python_callable=bulk_delete_csv,
+            op_kwargs={
+                "storage_file_uri": self.storage_file_uri,
+                "table": self.destination_table,
+                "dialect": self.dialect,
+                "rdbms_conn_id": self.rdbms_conn_id,
+                "key": self.key,
+                "method": self.bulk_load.method,
+                "field_delimiter": self.field_delimiter,
+                "batch_size": self.bulk_load.batch_size,
+                "commit_interval": self.bulk_load.commit_interval,
+                "storage_conn_id": self.storage_conn_id,
+            },
+            dag=dag,
+            task_group=task_group,
+        )
@@ -1,17 +1,19 @@
-from debussy_airflow.hooks.db_api_hook import DbApiHookInterface
-from debussy_airflow.hooks.storage_hook import StorageHookInterface
-from debussy_airflow.operators.storage_to_rdbms_operator import StorageToRdbmsOperator
+from typing import TYPE_CHECKING
 
 from debussy_concert.core.motif.motif_base import MotifBase
 
+if TYPE_CHECKING:
+    from debussy_airflow.hooks.db_api_hook import DbApiHookInterface
+    from debussy_airflow.hooks.storage_hook import StorageHookInterface
+
 
 class StorageToRdbmsQueryMotif(MotifBase):
     destination_table = None
 
     def __init__(
         self,
-        dbapi_hook: DbApiHookInterface,
-        storage_hook: StorageHookInterface,
+        dbapi_hook: "DbApiHookInterface",
+        storage_hook: "StorageHookInterface",
         destination_table: str,
         name=None,
         **op_kw_args
@@ -28,6 +30,10 @@ class StorageToRdbmsQueryMotif(MotifBase):
         return self
 
     def build(self, dag, task_group):
+        from debussy_airflow.operators.storage_to_rdbms_operator import (
+            StorageToRdbmsOperator,
+        )
+
         storage_to_rdbms_operator = StorageToRdbmsOperator(
             task_id=self.name,
             dbapi_hook=self.dbapi_hook,
@@ -1,31 +1,38 @@
-from airflow.utils.task_group import TaskGroup
+from typing import TYPE_CHECKING, Optional
 
-from debussy_airflow.operators.storage_to_storage_operator import (
-    StorageToStorageOperator,
-    StorageHookInterface,
-)
+from airflow.utils.task_group import TaskGroup
 
 from debussy_concert.core.motif.motif_base import MotifBase
 
+if TYPE_CHECKING:
+    from debussy_airflow.hooks.storage_hook import StorageHookInterface
+
 
 class StorageToStorageMotif(MotifBase):
     def __init__(
         self,
         *,
-        origin_storage_hook: StorageHookInterface,
-        destiny_storage_hook: StorageHookInterface,
+        origin_storage_hook: "StorageHookInterface",
+        destiny_storage_hook: "StorageHookInterface",
         destiny_file_uri,
+        max_parallel_transfers: Optional[int] = None,
         name=None
     ) -> None:
         super().__init__(name=name)
         self.origin_storage_hook = origin_storage_hook
         self.destiny_storage_hook = destiny_storage_hook
         self.destiny_file_uri = destiny_file_uri
+        # origin is a folder of shards transferred in parallel when set
+        self.max_parallel_transfers = max_parallel_transfers
 
     def setup(self, storage_uri_prefix):
         self.origin_file_uri = storage_uri_prefix
 
     def storage_to_storage_operator(self, dag, parent_task_group):
+        from debussy_airflow.operators.storage_to_storage_operator import (
+            StorageToStorageOperator,
+        )
+
         operator = StorageToStorageOperator(
             task_id=self.name,
             origin_storage_hook=self.origin_storage_hook,
@@ -37,5 +44,24 @@ class StorageToStorageMotif(MotifBase):
         )
         return operator
 
+    def parallel_storage_to_storage_operator(self, dag, parent_task_group):
+        from debussy_concert.core.operators.storage import (
+            ParallelStorageToStorageOperator,
+        )
+
+        operator = ParallelStorageToStorageOperator(
+            task_id=self.name,
+            max_parallel_transfers=self.max_parallel_transfers,
+            origin_storage_hook=self.origin_storage_hook,
+            origin_file_uri=self.origin_file_uri,
+            destination_storage_hook=self.destiny_storage_hook,
+            destination_file_uri=self.destiny_file_uri,
+            dag=dag,
+            task_group=parent_task_group,
+        )
+        return operator
+
     def build(self, dag, parent_task_group: TaskGroup):
+        if self.max_parallel_transfers is not None:
+            return self.parallel_storage_to_storage_operator(dag, parent_task_group)
         return self.storage_to_storage_operator(dag, parent_task_group)
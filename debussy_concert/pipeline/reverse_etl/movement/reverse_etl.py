@@ -16,6 +16,7 @@ class ReverseEtlMovement(MovementBase):
         data_warehouse_reverse_etl_to_storage_phrase,
         storage_to_destination_phrase,
         end_phrase: PEndPhrase,
+        promote_snapshot_phrase=None,
         name=None,
     ) -> None:
 
@@ -25,12 +26,16 @@ class ReverseEtlMovement(MovementBase):
             data_warehouse_reverse_etl_to_storage_phrase
         )
         self.storage_to_destination_phrase = storage_to_destination_phrase
+        # snapshot diff movements record the delivered rows once delivered
+        self.promote_snapshot_phrase = promote_snapshot_phrase
         self.end_phrase = end_phrase
+        # each phrase reads what the previous one wrote, a chain
         phrases = [
             self.start_phrase,
             self.data_warehouse_to_reverse_etl_phrase,
             self.data_warehouse_reverse_etl_to_storage_phrase,
             self.storage_to_destination_phrase,
+            *([promote_snapshot_phrase] if promote_snapshot_phrase else []),
             self.end_phrase,
         ]
         super().__init__(name=name, phrases=phrases)
@@ -51,6 +56,35 @@ class ReverseEtlMovement(MovementBase):
             f"{self.movement_parameters.output_config.file_name}"
         )
 
+    @property
+    def reverse_etl_shards_uri_prefix(self):
+        return f"{self.reverse_etl_bucket_uri_prefix}.shards/"
+
+    @property
+    def extract_destination_uri(self):
+        output_config = self.movement_parameters.output_config
+        if not output_config.sharded:
+            return self.reverse_etl_bucket_uri_prefix
+        return f"{self.reverse_etl_shards_uri_prefix}{output_config.shard_pattern}"
+
+    @property
+    def storage_to_destination_uri(self):
+        """The reverse etl file, or the folder of its shards when not composed"""
+        output_config = self.movement_parameters.output_config
+        if output_config.sharded and not output_config.compose:
+            return self.reverse_etl_shards_uri_prefix
+        return self.reverse_etl_bucket_uri_prefix
+
+    @property
+    def snapshot_table_uri(self):
+        """Key and row hashes of the rows delivered by a snapshot diff"""
+        return f"{self.reverse_etl_table_uri}_snapshot"
+
+    @property
+    def reverse_etl_tombstones_uri(self):
+        snapshot_diff = self.movement_parameters.snapshot_diff
+        return snapshot_diff.tombstone_uri(self.reverse_etl_bucket_uri_prefix)
+
     @property
     def datawarehouse_to_reverse_etl_query(self):
         return self.movement_parameters.reverse_etl_query
@@ -67,9 +101,66 @@ class ReverseEtlMovement(MovementBase):
             reverse_etl_query=self.datawarehouse_to_reverse_etl_query,
             reverse_etl_table_uri=self.reverse_etl_table_uri,
         )
-        self.data_warehouse_reverse_etl_to_storage_phrase.setup(
+        if movement_parameters.snapshot_diff is None:
+            self.data_warehouse_reverse_etl_to_storage_phrase.setup(
+                movement_parameters=self.movement_parameters,
+                extraction_query=self.datawarehouse_reverse_etl_extraction_query,
+                storage_uri_prefix=self.extract_destination_uri,
+                composed_uri=self.reverse_etl_bucket_uri_prefix,
+            )
+            self.storage_to_destination_phrase.setup(
+                storage_uri_prefix=self.storage_to_destination_uri
+            )
+            return self
+        storage_phrase = self.data_warehouse_reverse_etl_to_storage_phrase
+        storage_phrase.setup(
             movement_parameters=self.movement_parameters,
             extraction_query=self.datawarehouse_reverse_etl_extraction_query,
+            storage_uri_prefix=self.extract_destination_uri,
+            composed_uri=self.reverse_etl_bucket_uri_prefix,
+            snapshot_table_uri=self.snapshot_table_uri,
+            tombstones_uri=self.reverse_etl_tombstones_uri,
+        )
+        self.storage_to_destination_phrase.setup(
+            storage_uri_prefix=self.storage_to_destination_uri,
+            tombstones_uri=self.reverse_etl_tombstones_uri,
+        )
+        self.promote_snapshot_phrase.setup(
+            snapshot_table_uri=self.snapshot_table_uri,
+            pending_snapshot_table_uri=storage_phrase.pending_snapshot_table_uri,
+        )
+        return self
+
+
+class SinglePassReverseEtlMovement(ReverseEtlMovement):
+    """Reverse etl writing the history table and the storage file in one phrase"""
+
+    def __init__(
+        self,
+        start_phrase: PStartPhrase,
+        data_warehouse_to_storage_phrase,
+        storage_to_destination_phrase,
+        end_phrase: PEndPhrase,
+        name=None,
+    ) -> None:
+        self.start_phrase = start_phrase
+        self.data_warehouse_to_storage_phrase = data_warehouse_to_storage_phrase
+        self.storage_to_destination_phrase = storage_to_destination_phrase
+        self.end_phrase = end_phrase
+        phrases = [
+            self.start_phrase,
+            self.data_warehouse_to_storage_phrase,
+            self.storage_to_destination_phrase,
+            self.end_phrase,
+        ]
+        MovementBase.__init__(self, name=name, phrases=phrases)
+
+    def setup(self, movement_parameters: ReverseEtlMovementParameters):
+        self.movement_parameters = movement_parameters
+        self.data_warehouse_to_storage_phrase.setup(
+            reverse_etl_query=self.datawarehouse_to_reverse_etl_query,
+            reverse_etl_table_uri=self.reverse_etl_table_uri,
+            extraction_query=self.datawarehouse_reverse_etl_extraction_query,
             storage_uri_prefix=self.reverse_etl_bucket_uri_prefix,
         )
         self.storage_to_destination_phrase.setup(
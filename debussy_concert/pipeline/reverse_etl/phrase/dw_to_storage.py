@@ -0,0 +1,28 @@
+from debussy_concert.core.phrase.phrase_base import PhraseBase
+
+
+class DataWarehouseToReverseEtlToStoragePhrase(PhraseBase):
+    """
+    Single pass alternative to DataWarehouseToReverseEtlPhrase followed by
+    DataWarehouseReverseEtlToTempToStoragePhrase
+    """
+
+    def __init__(self, dw_to_storage_motif, name=None) -> None:
+        self.dw_to_storage_motif = dw_to_storage_motif
+        motifs = [self.dw_to_storage_motif]
+        super().__init__(name=name, motifs=motifs)
+
+    def setup(
+        self,
+        reverse_etl_query,
+        reverse_etl_table_uri,
+        extraction_query,
+        storage_uri_prefix,
+    ):
+        self.dw_to_storage_motif.setup(
+            reverse_etl_query=reverse_etl_query,
+            reverse_etl_table_uri=reverse_etl_table_uri,
+            extraction_query=extraction_query,
+            destination_uri=storage_uri_prefix,
+        )
+        return self
@@ -10,16 +10,28 @@ class DataWarehouseReverseEtlToTempToStoragePhrase(PhraseBase):
         self,
         datawarehouse_reverse_etl_to_temp_table_motif,
         export_temp_table_to_storage_motif,
+        compose_storage_shards_motif=None,
+        snapshot_diff_motif=None,
+        export_tombstones_motif=None,
         name=None,
     ) -> None:
         self.datawarehouse_reverse_etl_to_temp_table_motif = (
             datawarehouse_reverse_etl_to_temp_table_motif
         )
         self.export_temp_table_to_storage_motif = export_temp_table_to_storage_motif
-        motifs = [
-            self.datawarehouse_reverse_etl_to_temp_table_motif,
-            self.export_temp_table_to_storage_motif,
-        ]
+        # joins the sharded extract into a single file
+        self.compose_storage_shards_motif = compose_storage_shards_motif
+        # exports the rows changed since the snapshot and the deleted keys instead
+        self.snapshot_diff_motif = snapshot_diff_motif
+        self.export_tombstones_motif = export_tombstones_motif
+        motifs = [self.datawarehouse_reverse_etl_to_temp_table_motif]
+        if self.snapshot_diff_motif is not None:
+            motifs.append(self.snapshot_diff_motif)
+        motifs.append(self.export_temp_table_to_storage_motif)
+        if self.compose_storage_shards_motif is not None:
+            motifs.append(self.compose_storage_shards_motif)
+        if self.export_tombstones_motif is not None:
+            motifs.append(self.export_tombstones_motif)
         super().__init__(name=name, motifs=motifs)
 
     @property
@@ -30,19 +42,54 @@ class DataWarehouseReverseEtlToTempToStoragePhrase(PhraseBase):
             f"{self.config.name}_{self.movement_parameters.name}"
         )
 
+    @property
+    def delta_table_uri(self):
+        return f"{self.temp_table_uri}_delta"
+
+    @property
+    def tombstone_table_uri(self):
+        return f"{self.temp_table_uri}_tombstones"
+
+    @property
+    def pending_snapshot_table_uri(self):
+        return f"{self.temp_table_uri}_snapshot"
+
     def setup(
         self,
         movement_parameters: MovementParametersType,
         extraction_query,
         storage_uri_prefix,
+        composed_uri=None,
+        snapshot_table_uri=None,
+        tombstones_uri=None,
     ):
         self.movement_parameters = movement_parameters
         self.datawarehouse_reverse_etl_to_temp_table_motif.setup(
             sql_query=extraction_query, destination_table=self.temp_table_uri
         )
+        exported_table_uri = self.temp_table_uri
+        if self.snapshot_diff_motif is not None:
+            self.snapshot_diff_motif.setup(
+                current_table_uri=self.temp_table_uri,
+                delta_table_uri=self.delta_table_uri,
+                tombstone_table_uri=self.tombstone_table_uri,
+                snapshot_table_uri=snapshot_table_uri,
+                pending_snapshot_table_uri=self.pending_snapshot_table_uri,
+            )
+            exported_table_uri = self.delta_table_uri
+            self.export_tombstones_motif.setup(
+                source_table_uri=self.tombstone_table_uri,
+                destination_uris=[tombstones_uri],
+            )
         self.export_temp_table_to_storage_motif.setup(
-            source_table_uri=self.temp_table_uri, destination_uris=[storage_uri_prefix]
+            source_table_uri=exported_table_uri, destination_uris=[storage_uri_prefix]
         )
+        if self.compose_storage_shards_motif is not None:
+            self.compose_storage_shards_motif.setup(
+                shards_uri_prefix=storage_uri_prefix.rpartition("/")[0] + "/",
+                destination_uri=composed_uri,
+                header_query=f"SELECT * FROM `{exported_table_uri}`",
+            )
         return self
 
 
@@ -0,0 +1,19 @@
+from debussy_concert.core.phrase.phrase_base import PhraseBase
+
+
+class PromoteSnapshotPhrase(PhraseBase):
+    """Replaces the snapshot of a snapshot diff once its delta was delivered"""
+
+    def __init__(self, promote_snapshot_motif, name=None) -> None:
+        self.promote_snapshot_motif = promote_snapshot_motif
+        motifs = [self.promote_snapshot_motif]
+        super().__init__(name=name, motifs=motifs)
+
+    def setup(self, snapshot_table_uri, pending_snapshot_table_uri):
+        self.promote_snapshot_motif.setup(
+            sql_query=(
+                f"CREATE OR REPLACE TABLE `{snapshot_table_uri}` "
+                f"COPY `{pending_snapshot_table_uri}`"
+            )
+        )
+        return self
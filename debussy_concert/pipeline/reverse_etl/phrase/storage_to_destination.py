@@ -2,11 +2,24 @@ from debussy_concert.core.phrase.phrase_base import PhraseBase
 
 
 class StorageToDestinationPhrase(PhraseBase):
-    def __init__(self, storage_to_destination_motif, name=None):
+    def __init__(
+        self,
+        storage_to_destination_motif,
+        tombstones_to_destination_motif=None,
+        name=None,
+    ):
         self.storage_to_destination_motif = storage_to_destination_motif
+        # delivers the tombstone file of a snapshot diff after the changed rows
+        self.tombstones_to_destination_motif = tombstones_to_destination_motif
         motifs = [self.storage_to_destination_motif]
+        if self.tombstones_to_destination_motif is not None:
+            motifs.append(self.tombstones_to_destination_motif)
         super().__init__(motifs=motifs, name=name)
 
-    def setup(self, storage_uri_prefix):
+    def setup(self, storage_uri_prefix, tombstones_uri=None):
         self.storage_to_destination_motif.setup(storage_uri_prefix=storage_uri_prefix)
+        if self.tombstones_to_destination_motif is not None:
+            self.tombstones_to_destination_motif.setup(
+                storage_uri_prefix=tombstones_uri
+            )
         return self
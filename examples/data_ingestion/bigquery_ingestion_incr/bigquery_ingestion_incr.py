@@ -22,7 +22,7 @@ composition_file = (
 )
 
 workflow_service = AirflowService()
-config_composition = ConfigBigQueryDataIngestion.load_from_file(
+config_composition = ConfigBigQueryDataIngestion.load_from_file_cached(
     composition_config_file_path=composition_file, env_file_path=env_file
 )
 
@@ -20,7 +20,7 @@ env_file = f"{dags_folder}/examples/environment.yaml"
 composition_file = f"{dags_folder}/examples/data_ingestion/bigquery_ingestion_policy_tags/composition.yaml"
 
 workflow_service = AirflowService()
-config_composition = ConfigBigQueryDataIngestion.load_from_file(
+config_composition = ConfigBigQueryDataIngestion.load_from_file_cached(
     composition_config_file_path=composition_file, env_file_path=env_file
 )
 
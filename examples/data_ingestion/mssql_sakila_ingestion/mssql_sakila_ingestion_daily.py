@@ -24,7 +24,7 @@ composition_file = (
 )
 
 workflow_service = AirflowService()
-config_composition = ConfigRdbmsDataIngestion.load_from_file(
+config_composition = ConfigRdbmsDataIngestion.load_from_file_cached(
     composition_config_file_path=composition_file, env_file_path=env_file
 )
 
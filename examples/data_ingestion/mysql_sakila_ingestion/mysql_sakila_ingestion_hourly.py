@@ -24,7 +24,7 @@ env_file = f"{dags_folder}/examples/environment.yaml"
 composition_file = f"{dags_folder}/examples/data_ingestion/mysql_sakila_ingestion/composition_hourly.yaml"
 
 workflow_service = AirflowService()
-config_composition = ConfigRdbmsDataIngestion.load_from_file(
+config_composition = ConfigRdbmsDataIngestion.load_from_file_cached(
     composition_config_file_path=composition_file, env_file_path=env_file
 )
 
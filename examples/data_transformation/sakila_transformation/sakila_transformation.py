@@ -21,7 +21,7 @@ composition_file = (
     f"{dags_folder}/examples/data_transformation/sakila_transformation/composition.yaml"
 )
 
-config_composition = ConfigTransformComposition.load_from_file(
+config_composition = ConfigTransformComposition.load_from_file_cached(
     composition_config_file_path=composition_file, env_file_path=env_file
 )
 
@@ -12,7 +12,7 @@ composition_file = (
     f"{dags_folder}/examples/reverse_etl/reverse_etl_unbounce/composition.yaml"
 )
 
-reverse_etl_config = ConfigReverseEtl.load_from_file(
+reverse_etl_config = ConfigReverseEtl.load_from_file_cached(
     composition_config_file_path=composition_file, env_file_path=env_file
 )
 
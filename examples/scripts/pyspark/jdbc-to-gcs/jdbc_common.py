@@ -0,0 +1,239 @@
+import json
+import logging
+from datetime import datetime
+
+# Helpers shared by the jdbc-to-gcs scripts, shipped with their jobs in
+# python_file_uris. The planning arithmetic takes no spark objects so it is
+# tested without a spark session.
+
+JDBC_READ_OPTIONS_FLAG = "--jdbc-read-options="
+OUTPUT_FILES_FLAG = "--output-files="
+# parquet files are usually a few times smaller than the cached rows
+IN_MEMORY_TO_PARQUET_RATIO = 3
+# stands for the nulls in the safe hash key encoding
+NULL_MARKER = "\u0000"
+
+logger = logging.getLogger("jdbc_to_gcs")
+
+
+def setup_logging():
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s"
+    )
+
+
+def pop_flag(argv, flag):
+    """Removes the optional json argument starting with flag from argv"""
+    value = {}
+    for arg in list(argv):
+        if arg.startswith(flag):
+            value = json.loads(arg[len(flag):])
+            argv.remove(arg)
+    return value
+
+
+def pop_read_options(argv):
+    return pop_flag(argv, JDBC_READ_OPTIONS_FLAG)
+
+
+def connection_from_secret(jdbc_url, secret_uri):
+    """Returns the (jdbc_url, user, password) of the connection kept in the secret"""
+    from google.cloud.secretmanager import SecretManagerServiceClient
+
+    secret_manager_client = SecretManagerServiceClient()
+    secret_service_response = secret_manager_client.access_secret_version(
+        name=secret_uri
+    )
+    secret = secret_service_response.payload.data.decode("UTF-8")
+    db_conn_data = json.loads(secret)
+    jdbc_url = jdbc_url.format(**db_conn_data)
+    return jdbc_url, db_conn_data["user"], db_conn_data["password"]
+
+
+def probe_query(query, partition_column):
+    return (
+        f"SELECT MIN({partition_column}) AS lower_bound,"
+        f" MAX({partition_column}) AS upper_bound, COUNT(*) AS row_count"
+        f" FROM ({query}) debussy_query"
+    )
+
+
+def num_partitions(row_count, rows_per_partition, max_partitions):
+    """Partitions of about rows_per_partition rows, between 1 and max_partitions"""
+    wanted_partitions = -(-row_count // int(rows_per_partition or 1))
+    return max(1, min(int(max_partitions or 1), wanted_partitions))
+
+
+def planned_read_options(read_options, probe, rows_per_partition):
+    """
+    Returns read_options with the bounds and numPartitions of the probe, or without
+    the partition column when the probe found no rows
+    """
+    if probe["lower_bound"] is None:
+        return {
+            key: value
+            for key, value in read_options.items()
+            if key not in ("partitionColumn", "numPartitions")
+        }
+    return {
+        **read_options,
+        "lowerBound": probe["lower_bound"],
+        "upperBound": probe["upper_bound"],
+        "numPartitions": num_partitions(
+            probe["row_count"], rows_per_partition, read_options.get("numPartitions")
+        ),
+    }
+
+
+def rows_per_target_file(row_count, size_in_bytes, target_file_size_mb):
+    """Rows of a parquet file of about target_file_size_mb, from the in-memory size"""
+    bytes_per_row = size_in_bytes / max(row_count, 1)
+    parquet_bytes_per_row = max(bytes_per_row / IN_MEMORY_TO_PARQUET_RATIO, 1)
+    return max(int(target_file_size_mb * 1024**2 / parquet_bytes_per_row), 1)
+
+
+def num_files(row_count, rows_per_file):
+    return max(-(-row_count // rows_per_file), 1)
+
+
+def resize_method(num_files, num_partitions):
+    """coalesce, without a shuffle, down to fewer files, otherwise repartition"""
+    if num_files < num_partitions:
+        return "coalesce"
+    return "repartition"
+
+
+def safe_encoding(values):
+    """
+    Python reference of the safe hash key encoding of jdbc_to_gcs_hash_key.py for
+    string values: each value prefixed by its length and a colon, NULL_MARKER for
+    the nulls
+    """
+    return "".join(
+        NULL_MARKER if value is None else f"{len(value)}:{value}" for value in values
+    )
+
+
+def partition_plan(spark, driver, jdbc_url, user, password, query, read_options):
+    """
+    Probes MIN/MAX/COUNT of the partition column when no bounds were given and
+    chooses bounds and numPartitions (up to the given one) from rowsPerPartition
+    """
+    rows_per_partition = read_options.pop("rowsPerPartition", None)
+    partition_column = read_options.get("partitionColumn")
+    if partition_column is None or "lowerBound" in read_options:
+        return read_options
+    probe = (
+        spark.read.format("jdbc")
+        .option("url", jdbc_url)
+        .option("driver", driver)
+        .option("user", user)
+        .option("password", password)
+        .option("query", probe_query(query, partition_column))
+        .load()
+        .first()
+    )
+    read_options = planned_read_options(read_options, probe, rows_per_partition)
+    if "partitionColumn" not in read_options:
+        logger.info(
+            "Partition plan: %s has no rows, single partition read", partition_column
+        )
+        return read_options
+    logger.info(
+        "Partition plan: %s rows, %s between %s and %s, %s partitions",
+        probe["row_count"],
+        partition_column,
+        probe["lower_bound"],
+        probe["upper_bound"],
+        read_options["numPartitions"],
+    )
+    return read_options
+
+
+def add_metadata(df, load_timestamp):
+    """Adds the METADATA struct of the ingestion date and a random row id"""
+    from pyspark.sql import functions as F
+
+    # 30 random hex characters, computed in the jvm instead of a python udf
+    random_hex = F.substring(F.regexp_replace(F.expr("uuid()"), "-", ""), 1, 30)
+    ingestion_ts = datetime.strptime(load_timestamp, "%Y%m%dT%H%M%S")
+    return df.withColumn(
+        "METADATA",
+        F.struct(
+            F.lit(ingestion_ts).alias("IngestionDate"),
+            F.lit(ingestion_ts).alias("UpdateDate"),
+            random_hex.alias("Id"),
+        ),
+    )
+
+
+def read_jdbc(spark, driver, jdbc_url, user, password, query, read_options):
+    """
+    Reads the query result, in parallel when read_options has a partitionColumn
+    (with its bounds and numPartitions) or a list of predicates
+    """
+    read_options = partition_plan(
+        spark, driver, jdbc_url, user, password, query, dict(read_options or {})
+    )
+    predicates = read_options.pop("predicates", None)
+    # spark only splits a table or subquery, not the query option
+    subquery = f"({query}) debussy_query"
+    if predicates:
+        properties = {"driver": driver, "user": user, "password": password}
+        properties.update({key: str(value) for key, value in read_options.items()})
+        return spark.read.jdbc(
+            url=jdbc_url, table=subquery, predicates=predicates, properties=properties
+        )
+    reader = (
+        spark.read.format("jdbc")
+        .option("url", jdbc_url)
+        .option("driver", driver)
+        .option("user", user)
+        .option("password", password)
+    )
+    if "partitionColumn" in read_options:
+        reader = reader.option("dbtable", subquery)
+    else:
+        reader = reader.option("query", query)
+    for key, value in read_options.items():
+        reader = reader.option(key, str(value))
+    return reader.load()
+
+
+def write_parquet(df, output_uri, output_files=None):
+    """
+    Writes df with the output_files compression, in files of about rowsPerFile rows
+    or targetFileSizeMb megabytes (estimated from the cached in-memory size)
+    """
+    from pyspark import StorageLevel
+
+    output_files = output_files or {}
+    writer_df = df
+    rows_per_file = output_files.get("rowsPerFile")
+    target_file_size_mb = output_files.get("targetFileSizeMb")
+    sized = bool(rows_per_file or target_file_size_mb)
+    if sized:
+        # cached, otherwise counting would read the source database twice
+        df = df.persist(StorageLevel.MEMORY_AND_DISK)
+        row_count = df.count()
+        if not rows_per_file:
+            plan_stats = df._jdf.queryExecution().optimizedPlan().stats()
+            size_in_bytes = int(str(plan_stats.sizeInBytes()))
+            rows_per_file = rows_per_target_file(
+                row_count, size_in_bytes, target_file_size_mb
+            )
+        rows_per_file = max(int(rows_per_file), 1)
+        files = num_files(row_count, rows_per_file)
+        if resize_method(files, df.rdd.getNumPartitions()) == "coalesce":
+            writer_df = df.coalesce(files)
+        else:
+            writer_df = df.repartition(files)
+        logger.info("Output plan: %s rows in %s files", row_count, files)
+    writer = writer_df.write.format("parquet").mode("overwrite")
+    if rows_per_file:
+        writer = writer.option("maxRecordsPerFile", rows_per_file)
+    if "compression" in output_files:
+        writer = writer.option("compression", output_files["compression"])
+    writer.save(output_uri)
+    if sized:
+        df.unpersist()
@@ -1,41 +1,51 @@
 import sys
-import random
-import json
-from datetime import datetime
 
 from pyspark.sql import SparkSession
-from pyspark.sql import types as T
-from pyspark.sql import functions as F
+
+# shipped with the job in python_file_uris
+from jdbc_common import (
+    OUTPUT_FILES_FLAG,
+    add_metadata,
+    connection_from_secret,
+    pop_flag,
+    pop_read_options,
+    read_jdbc,
+    setup_logging,
+    write_parquet,
+)
 
 # WARNING
 # Deprecated, please use jdbc_to_gcs_hash_key.py
 
 
 def main(argv):
+    setup_logging()
+    read_options = pop_read_options(argv)
+    output_files = pop_flag(argv, OUTPUT_FILES_FLAG)
     # workaround to keep both versions of debussy_framework working
     # using the same script
     # v3 of framework dont have connection data at dag construction time
     # and delegates this job to the script
     if len(argv) == 7:
-        extract_data_using_secret(*argv)
+        extract_data_using_secret(
+            *argv, read_options=read_options, output_files=output_files
+        )
     if len(argv) == 8:
-        extract_data(*argv)
+        extract_data(*argv, read_options=read_options, output_files=output_files)
 
 
 def extract_data_using_secret(
-    driver, jdbc_url, secret_uri, database_table, query, load_timestamp, output_uri
+    driver,
+    jdbc_url,
+    secret_uri,
+    database_table,
+    query,
+    load_timestamp,
+    output_uri,
+    read_options=None,
+    output_files=None,
 ):
-    from google.cloud.secretmanager import SecretManagerServiceClient
-
-    secret_manager_client = SecretManagerServiceClient()
-    secret_service_response = secret_manager_client.access_secret_version(
-        name=secret_uri
-    )
-    secret = secret_service_response.payload.data.decode("UTF-8")
-    db_conn_data = json.loads(secret)
-    jdbc_url = jdbc_url.format(**db_conn_data)
-    user = db_conn_data["user"]
-    password = db_conn_data["password"]
+    jdbc_url, user, password = connection_from_secret(jdbc_url, secret_uri)
     extract_data(
         driver=driver,
         jdbc_url=jdbc_url,
@@ -45,11 +55,22 @@ def extract_data_using_secret(
         query=query,
         load_timestamp=load_timestamp,
         output_uri=output_uri,
+        read_options=read_options,
+        output_files=output_files,
     )
 
 
 def extract_data(
-    driver, jdbc_url, user, password, database_table, query, load_timestamp, output_uri
+    driver,
+    jdbc_url,
+    user,
+    password,
+    database_table,
+    query,
+    load_timestamp,
+    output_uri,
+    read_options=None,
+    output_files=None,
 ):
     spark = (
         SparkSession.builder.master("yarn")
@@ -63,32 +84,10 @@ def extract_data(
     )
     sc.setLogLevel("WARN")
 
-    def random_hex():
-        return "%030x" % random.randrange(16**30)
-
-    random_hex = F.udf(random_hex, T.StringType())
-    ingestion_ts = datetime.strptime(load_timestamp, "%Y%m%dT%H%M%S")
-
-    df = (
-        spark.read.format("jdbc")
-        .option("url", jdbc_url)
-        .option("query", query)
-        .option("driver", driver)
-        .option("user", user)
-        .option("password", password)
-        .load()
-    )
-
-    df = df.withColumn(
-        "METADATA",
-        F.struct(
-            F.lit(ingestion_ts).alias("IngestionDate"),
-            F.lit(ingestion_ts).alias("UpdateDate"),
-            random_hex().alias("Id"),
-        ),
-    )
+    df = read_jdbc(spark, driver, jdbc_url, user, password, query, read_options)
+    df = add_metadata(df, load_timestamp)
 
-    df.write.format("parquet").mode("overwrite").save(output_uri)
+    write_parquet(df, output_uri, output_files)
 
 
 if __name__ == "__main__":
@@ -1,28 +1,99 @@
 import sys
-import json
 
 from pyspark.sql import SparkSession
 from pyspark.sql import functions as F
 
+# shipped with the job in python_file_uris
+from jdbc_common import (
+    NULL_MARKER,
+    OUTPUT_FILES_FLAG,
+    add_metadata,
+    connection_from_secret,
+    pop_flag,
+    pop_read_options,
+    read_jdbc,
+    setup_logging,
+    write_parquet,
+)
+
+HASH_KEY_FLAG = "--hash-key="
+
 
 def main(argv):
-    extract_data_using_secret(*argv)
+    setup_logging()
+    read_options = pop_read_options(argv)
+    hash_key = pop_flag(argv, HASH_KEY_FLAG)
+    output_files = pop_flag(argv, OUTPUT_FILES_FLAG)
+    extract_data_using_secret(
+        *argv, read_options=read_options, hash_key=hash_key, output_files=output_files
+    )
+
+
+def safe_encoded(columns):
+    """
+    Length prefixed values and a marker for nulls, so values shifting between
+    columns or nulls and empty strings never encode the same. Spark version of
+    jdbc_common.safe_encoding
+    """
+    return F.concat(
+        *[
+            F.coalesce(
+                F.concat(
+                    F.length(F.col(column).cast("string")).cast("string"),
+                    F.lit(":"),
+                    F.col(column).cast("string"),
+                ),
+                F.lit(NULL_MARKER),
+            )
+            for column in columns
+        ]
+    )
+
+
+def add_hash_key(df, hash_key=None):
+    """
+    Adds the _hash_key column. Without hash_key it is the md5 of the concatenated
+    columns, otherwise hash_key has algorithm (md5, sha2-256, xxhash64 or none),
+    columns (default all of them) and encoding (safe or concat)
+    """
+    if not hash_key:
+        return df.withColumn("_hash_key", F.md5(F.concat_ws("", *df.columns)))
+    algorithm = hash_key.get("algorithm", "md5")
+    if algorithm == "none":
+        return df
+    columns = hash_key.get("columns") or df.columns
+    if algorithm == "xxhash64":
+        # native hash of every column, the null flags tell apart the shifted nulls
+        null_flags = F.concat_ws(
+            "", *[F.col(column).isNull().cast("int") for column in columns]
+        )
+        return df.withColumn(
+            "_hash_key", F.xxhash64(*columns, null_flags).cast("string")
+        )
+    if hash_key.get("encoding", "safe") == "safe":
+        encoded = safe_encoded(columns)
+    else:
+        encoded = F.concat_ws("", *columns)
+    if algorithm == "md5":
+        return df.withColumn("_hash_key", F.md5(encoded))
+    if algorithm == "sha2-256":
+        return df.withColumn("_hash_key", F.sha2(encoded, 256))
+    raise ValueError(f"Invalid hash key algorithm: {algorithm}")
 
 
 def extract_data_using_secret(
-    driver, jdbc_url, secret_uri, database_table, query, load_timestamp, output_uri
+    driver,
+    jdbc_url,
+    secret_uri,
+    database_table,
+    query,
+    load_timestamp,
+    output_uri,
+    read_options=None,
+    hash_key=None,
+    output_files=None,
 ):
-    from google.cloud.secretmanager import SecretManagerServiceClient
-
-    secret_manager_client = SecretManagerServiceClient()
-    secret_service_response = secret_manager_client.access_secret_version(
-        name=secret_uri
-    )
-    secret = secret_service_response.payload.data.decode("UTF-8")
-    db_conn_data = json.loads(secret)
-    jdbc_url = jdbc_url.format(**db_conn_data)
-    user = db_conn_data["user"]
-    password = db_conn_data["password"]
+    jdbc_url, user, password = connection_from_secret(jdbc_url, secret_uri)
     extract_data(
         driver=driver,
         jdbc_url=jdbc_url,
@@ -30,11 +101,27 @@ def extract_data_using_secret(
         password=password,
         database_table=database_table,
         query=query,
+        load_timestamp=load_timestamp,
         output_uri=output_uri,
+        read_options=read_options,
+        hash_key=hash_key,
+        output_files=output_files,
     )
 
 
-def extract_data(driver, jdbc_url, user, password, database_table, query, output_uri):
+def extract_data(
+    driver,
+    jdbc_url,
+    user,
+    password,
+    database_table,
+    query,
+    load_timestamp,
+    output_uri,
+    read_options=None,
+    hash_key=None,
+    output_files=None,
+):
     spark = (
         SparkSession.builder.master("yarn")
         .appName(f"extract-{database_table}")
@@ -47,19 +134,13 @@ def extract_data(driver, jdbc_url, user, password, database_table, query, output
     )
     sc.setLogLevel("WARN")
 
-    df = (
-        spark.read.format("jdbc")
-        .option("url", jdbc_url)
-        .option("query", query)
-        .option("driver", driver)
-        .option("user", user)
-        .option("password", password)
-        .load()
-    )
+    df = read_jdbc(spark, driver, jdbc_url, user, password, query, read_options)
 
-    df = df.withColumn("_hash_key", F.md5(F.concat_ws("", *df.columns)))
+    df = add_hash_key(df, hash_key)
+    # after the hash key, which covers the extracted columns only
+    df = add_metadata(df, load_timestamp)
 
-    df.write.format("parquet").mode("overwrite").save(output_uri)
+    write_parquet(df, output_uri, output_files)
 
 
 if __name__ == "__main__":
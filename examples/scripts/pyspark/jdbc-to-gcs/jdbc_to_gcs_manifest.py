@@ -0,0 +1,115 @@
+import sys
+import json
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from pyspark.sql import SparkSession
+
+# shipped with the batch in python_file_uris
+from jdbc_common import (
+    add_metadata,
+    connection_from_secret,
+    logger,
+    read_jdbc,
+    setup_logging,
+    write_parquet,
+)
+from jdbc_to_gcs_hash_key import add_hash_key
+
+# Extracts every table of a manifest inside one spark session, each table in its
+# own FAIR scheduler pool. The manifest is a json object like
+# {
+#   "secret_uri": ..., "load_timestamp": ..., "status_uri": ...,
+#   "max_concurrency": 8,
+#   "tables": [
+#     {"name": ..., "jdbc_driver": ..., "jdbc_url": ..., "query": ...,
+#      "output_uri": ..., "read_options": {...}, "hash_key": {...},
+#      "output_files": {...}}
+#   ]
+# }
+# and the status of every table is written as json to status_uri. Tables with
+# a hash_key get the _hash_key column of jdbc_to_gcs_hash_key.py instead of the
+# METADATA column of jdbc_to_gcs.py.
+
+
+def read_text(spark, uri):
+    rows = spark.read.text(uri, wholetext=True).collect()
+    return "\n".join(row.value for row in rows)
+
+
+def write_text(spark, uri, text):
+    sc = spark.sparkContext
+    path = sc._jvm.org.apache.hadoop.fs.Path(uri)
+    fs = path.getFileSystem(sc._jsc.hadoopConfiguration())
+    stream = fs.create(path, True)
+    try:
+        stream.write(bytearray(text, "utf-8"))
+    finally:
+        stream.close()
+
+
+def extract_table(spark, table, connections, load_timestamp):
+    spark.sparkContext.setLocalProperty("spark.scheduler.pool", table["name"])
+    try:
+        jdbc_url, user, password = connections[table["jdbc_url"]]
+        df = read_jdbc(
+            spark,
+            table["jdbc_driver"],
+            jdbc_url,
+            user,
+            password,
+            table["query"],
+            table.get("read_options"),
+        )
+        if table.get("hash_key"):
+            df = add_hash_key(df, table["hash_key"])
+        # after the hash key, which covers the extracted columns only
+        df = add_metadata(df, load_timestamp)
+        write_parquet(df, table["output_uri"], table.get("output_files"))
+        return {"status": "succeeded"}
+    except Exception:
+        return {"status": "failed", "error": traceback.format_exc()}
+
+
+def main(argv):
+    setup_logging()
+    manifest_uri = argv[0]
+    spark = (
+        SparkSession.builder.appName("extract-manifest")
+        .config("spark.scheduler.mode", "FAIR")
+        .getOrCreate()
+    )
+    sc = spark.sparkContext
+    sc._jsc.hadoopConfiguration().set(
+        "mapreduce.fileoutputcommitter.marksuccessfuljobs", "false"
+    )
+    sc.setLogLevel("WARN")
+
+    manifest = json.loads(read_text(spark, manifest_uri))
+    tables = manifest["tables"]
+    # one secret read per distinct connection
+    connections = {
+        jdbc_url: connection_from_secret(jdbc_url, manifest["secret_uri"])
+        for jdbc_url in {table["jdbc_url"] for table in tables}
+    }
+    with ThreadPoolExecutor(max_workers=manifest.get("max_concurrency", 8)) as pool:
+        results = pool.map(
+            lambda table: extract_table(
+                spark, table, connections, manifest["load_timestamp"]
+            ),
+            tables,
+        )
+        status = {table["name"]: result for table, result in zip(tables, results)}
+
+    for name, result in status.items():
+        if result["status"] == "succeeded":
+            logger.info("%s: %s", name, result["status"])
+        else:
+            logger.error("%s: %s\n%s", name, result["status"], result["error"])
+    write_text(spark, manifest["status_uri"], json.dumps(status))
+    if any(result["status"] != "succeeded" for result in status.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
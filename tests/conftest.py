@@ -1,11 +1,15 @@
 from pytest import fixture
 import inject
+import pytest
+import yaml
 
 from debussy_concert.pipeline.reverse_etl.config.reverse_etl import ConfigReverseEtl
 from debussy_concert.core.service.workflow.protocol import PWorkflowService
 from debussy_concert.core.config.config_composition import ConfigComposition
 from tests.resource.workflow_for_testing import WorkflowServiceForTesting
 
+from benchmarks.synthetic import load_config, write_composition
+
 
 @fixture(scope="session")
 def workflow_service():
@@ -27,3 +31,38 @@ def inject_testing(workflow_service, config_composition_for_testing):
         binder.bind(ConfigComposition, config_composition_for_testing)
 
     inject.clear_and_configure(inject_fn, bind_in_runtime=False)
+
+
+@fixture
+def synthetic_composition(tmp_path, workflow_service, config_composition_for_testing):
+    """
+    Writes a synthetic composition, lets update_fn change its yaml and binds the
+    loaded config to be built with airflow
+    """
+    pytest.importorskip("airflow")
+    from debussy_concert.core.service.workflow.airflow import AirflowService
+
+    def create(pipeline, size, update_fn):
+        composition_file, env_file = write_composition(
+            pipeline, str(tmp_path), size=size
+        )
+        with open(composition_file) as file:
+            composition = yaml.safe_load(file)
+        update_fn(composition)
+        with open(composition_file, "w") as file:
+            yaml.safe_dump(composition, file)
+        config = load_config(pipeline, composition_file, env_file)
+
+        def inject_fn(binder: inject.Binder):
+            binder.bind(PWorkflowService, AirflowService())
+            binder.bind(ConfigComposition, config)
+
+        inject.clear_and_configure(inject_fn, bind_in_runtime=False)
+
+    yield create
+
+    def restore_fn(binder: inject.Binder):
+        binder.bind(PWorkflowService, workflow_service)
+        binder.bind(ConfigComposition, config_composition_for_testing)
+
+    inject.clear_and_configure(restore_fn, bind_in_runtime=False)
@@ -14,6 +14,7 @@ class TaskMixin:
         if not isinstance(other, self.__class__):
             raise TypeError()
         self.next = other
+        self.downstream = getattr(self, "downstream", []) + [other]
 
     def __lshift__(self, other):
         if not isinstance(other, self.super().__class__):
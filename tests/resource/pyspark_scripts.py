@@ -0,0 +1,17 @@
+import importlib
+import sys
+from pathlib import Path
+
+JDBC_TO_GCS_DIR = (
+    Path(__file__).parents[2] / "examples" / "scripts" / "pyspark" / "jdbc-to-gcs"
+)
+
+
+def load_jdbc_to_gcs_script(name):
+    """
+    Imports a jdbc-to-gcs script, the scripts import each other as top level
+    modules like they do when shipped in python_file_uris
+    """
+    if str(JDBC_TO_GCS_DIR) not in sys.path:
+        sys.path.insert(0, str(JDBC_TO_GCS_DIR))
+    return importlib.import_module(name)
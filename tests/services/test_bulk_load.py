@@ -0,0 +1,336 @@
+import os
+import re
+
+import pytest
+
+from debussy_concert.core.service.rdbms.bulk_load import bulk_delete_csv, bulk_load_csv
+
+ROWS = [(index, f"name {index}" if index % 3 else "") for index in range(25)]
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "rows.csv"
+    lines = ["id,name"] + [
+        f'{index},"{name}"' if name else f"{index}," for index, name in ROWS
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+class FakeCursor:
+    rowcount = -1
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def executemany(self, sql, rows):
+        self.connection.statements.append(sql)
+        self.connection.batches.append(rows)
+
+    def execute(self, sql, params=None):
+        self.connection.statements.append(sql if params is None else (sql, params))
+        if "LOCAL INFILE" in sql:
+            # the mysql client reads the file while the statement runs
+            (path,) = re.search(r"LOCAL INFILE '([^']+)'", sql).groups()
+            with open(path) as file:
+                self.connection.loaded = file.read()
+
+    def fetchone(self):
+        return (len(ROWS),)
+
+    def fetchall(self):
+        # SHOW INDEX rows of the unique keys
+        return [
+            ("table", 0, name, index + 1, column)
+            for name, key in self.connection.unique_keys.items()
+            for index, column in enumerate(key)
+        ]
+
+    def copy_expert(self, sql, stream):
+        self.connection.statements.append(sql)
+        self.connection.loaded = stream.read().decode()
+
+
+class FakeConnection:
+    def __init__(self, unique_keys=None):
+        self.statements, self.batches, self.commits = [], [], 0
+        self.unique_keys = {"PRIMARY": ["id"]} if unique_keys is None else unique_keys
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+def load(csv_file, dialect, method, connection, **kwargs):
+    return bulk_load_csv(
+        csv_file, "db.table", dialect, None, method, connection=connection, **kwargs
+    )
+
+
+def test_executemany_batches(csv_file):
+    connection = FakeConnection()
+    loaded = load(
+        csv_file, "mysql", "executemany", connection, batch_size=10, commit_interval=20
+    )
+    assert loaded == 25
+    assert [len(batch) for batch in connection.batches] == [10, 10, 5]
+    assert connection.commits == 2
+    assert connection.statements[0] == (
+        "INSERT INTO `db`.`table` (`id`, `name`) VALUES (%s, %s)"
+    )
+    rows = [row for batch in connection.batches for row in batch]
+    assert rows == [[str(index), name or None] for index, name in ROWS]
+
+
+def test_mysql_load_data_streams_a_named_pipe(csv_file):
+    connection = FakeConnection()
+    load(csv_file, "mysql", "native", connection)
+    (sql,) = connection.statements
+    assert "INTO TABLE `db`.`table`" in sql
+    assert "SET `id` = NULLIF(@column_0, ''), `name` = NULLIF(@column_1, '')" in sql
+    assert connection.loaded == open(csv_file).read().split("\n", 1)[1]
+    assert connection.commits == 1
+
+
+def test_mysql_load_data_failure_does_not_hang(csv_file):
+    class FailingConnection(FakeConnection):
+        def cursor(self):
+            raise RuntimeError("local_infile disabled")
+
+    with pytest.raises(RuntimeError):
+        load(csv_file, "mysql", "native", FailingConnection())
+
+
+def test_postgresql_copy(csv_file):
+    connection = FakeConnection()
+    load(csv_file, "postgresql", "native", connection)
+    (sql,) = connection.statements
+    assert sql == (
+        'COPY "db"."table" ("id", "name") FROM STDIN '
+        "WITH (FORMAT csv, DELIMITER ',')"
+    )
+    assert connection.loaded == open(csv_file).read().split("\n", 1)[1]
+
+
+def test_mysql_upsert_through_staging_table(csv_file):
+    connection = FakeConnection()
+    load(
+        csv_file,
+        "mysql",
+        "native",
+        connection,
+        batch_size=10,
+        write_mode="upsert",
+        merge_key=["id"],
+    )
+    statements = connection.statements
+    assert statements[0] == "SHOW INDEX FROM `db`.`table` WHERE Non_unique = 0"
+    assert statements[2] == (
+        "CREATE TEMPORARY TABLE `db`.`debussy_staging_table` "
+        "SELECT * FROM `db`.`table` LIMIT 0"
+    )
+    assert "INTO TABLE `db`.`debussy_staging_table`" in statements[4]
+    merges = statements[6:]
+    assert [params for _, params in merges] == [(0, 10), (10, 20), (20, 30)]
+    # inserted in staging order, the last staged row of a duplicate key wins
+    assert merges[0][0] == (
+        "INSERT INTO `db`.`table` (`id`, `name`) SELECT `id`, `name` "
+        "FROM `db`.`debussy_staging_table` "
+        "WHERE _staging_row > %s AND _staging_row <= %s ORDER BY _staging_row "
+        "ON DUPLICATE KEY UPDATE `name` = VALUES(`name`)"
+    )
+    # staging table, load and one commit per merged batch
+    assert connection.commits == 5
+
+
+def test_mysql_upsert_requires_a_unique_merge_key(csv_file):
+    for unique_keys in ({}, {"PRIMARY": ["id", "name"]}, {"name": ["name"]}):
+        connection = FakeConnection(unique_keys)
+        with pytest.raises(ValueError, match="not the primary or a unique key"):
+            load(
+                csv_file,
+                "mysql",
+                "native",
+                connection,
+                write_mode="upsert",
+                merge_key=["id"],
+            )
+        # nothing was loaded
+        assert len(connection.statements) == 1
+    connection = FakeConnection({"PRIMARY": ["seq"], "natural": ["name", "id"]})
+    load(
+        csv_file,
+        "mysql",
+        "native",
+        connection,
+        write_mode="upsert",
+        merge_key=["id", "name"],
+    )
+
+
+def test_postgresql_upsert_and_replace(csv_file):
+    connection = FakeConnection()
+    load(
+        csv_file,
+        "postgresql",
+        "executemany",
+        connection,
+        write_mode="upsert",
+        merge_key=["id"],
+    )
+    (merge, params) = connection.statements[-1]
+    assert params == (0, 10000)
+    assert merge == (
+        'INSERT INTO "db"."table" ("id", "name") SELECT DISTINCT ON ("id") '
+        '"id", "name" FROM "debussy_staging_table" '
+        "WHERE _staging_row > %s AND _staging_row <= %s "
+        'ORDER BY "id", _staging_row DESC '
+        'ON CONFLICT ("id") DO UPDATE SET "name" = EXCLUDED."name"'
+    )
+
+    connection = FakeConnection()
+    load(csv_file, "postgresql", "native", connection, write_mode="replace")
+    assert connection.statements[-2:] == [
+        'DELETE FROM "db"."table"',
+        'INSERT INTO "db"."table" ("id", "name") '
+        'SELECT "id", "name" FROM "debussy_staging_table"',
+    ]
+    with pytest.raises(ValueError):
+        load(csv_file, "postgresql", "native", connection, write_mode="upsert")
+
+
+def test_delete_tombstone_keys(csv_file):
+    connection = FakeConnection()
+    bulk_delete_csv(
+        csv_file, "table", "postgresql", None, ["id"], connection=connection
+    )
+    statements = connection.statements
+    assert statements[1] == (
+        'CREATE TEMP TABLE "debussy_staging_table" AS SELECT "id" FROM "table" LIMIT 0'
+    )
+    assert statements[-1] == (
+        'DELETE FROM "table" AS target USING "debussy_staging_table" AS staging '
+        'WHERE target."id" = staging."id"'
+    )
+
+
+def test_mssql_bulk_copy_and_merge(csv_file):
+    class MssqlCursor(FakeCursor):
+        # the staging table puts its row number after the table columns
+        description = [("name",), ("id",), ("_staging_row",)]
+
+        def fetchall(self):
+            return []
+
+    class MssqlConnection(FakeConnection):
+        def cursor(self):
+            return MssqlCursor(self)
+
+        def bulk_copy(self, table, rows, column_ids, batch_size, tablock):
+            self.copied = (table, list(rows), column_ids, batch_size, tablock)
+
+    connection = MssqlConnection()
+    loaded = load(
+        csv_file,
+        "mssql",
+        "native",
+        connection,
+        batch_size=4000,
+        write_mode="upsert",
+        merge_key=["id"],
+    )
+    assert loaded == 25
+    table, rows, column_ids, batch_size, tablock = connection.copied
+    assert table == "[#debussy_staging_table]"
+    assert rows[:2] == [("0", None), ("1", "name 1")]
+    assert (column_ids, batch_size, tablock) == ([2, 1], 4000, True)
+    assert connection.statements[1] == (
+        "SELECT TOP 0 * INTO [#debussy_staging_table] FROM [db].[table] "
+        "UNION ALL SELECT TOP 0 * FROM [db].[table]"
+    )
+    (merge, params) = connection.statements[-1]
+    assert params == (0, 4000)
+    assert merge == (
+        "MERGE INTO [db].[table] WITH (HOLDLOCK) AS target USING (SELECT [id], "
+        "[name] FROM (SELECT [id], [name], ROW_NUMBER() OVER (PARTITION BY [id] "
+        "ORDER BY _staging_row DESC) AS _rank FROM [#debussy_staging_table] "
+        "WHERE _staging_row > %s AND _staging_row <= %s) AS ranked "
+        "WHERE _rank = 1) AS source ON target.[id] = source.[id] "
+        "WHEN MATCHED THEN UPDATE SET [name] = source.[name] "
+        "WHEN NOT MATCHED THEN INSERT ([id], [name]) "
+        "VALUES (source.[id], source.[name]);"
+    )
+
+
+@pytest.mark.skipif(
+    "DEBUSSY_TEST_POSTGRES_URI" not in os.environ,
+    reason="set DEBUSSY_TEST_POSTGRES_URI to a local postgresql connection uri",
+)
+@pytest.mark.parametrize("method", ["native", "executemany"])
+def test_postgresql_instance(csv_file, method):
+    pg8000 = pytest.importorskip("pg8000.dbapi")
+    from airflow.models import Connection
+
+    conn = Connection(uri=os.environ["DEBUSSY_TEST_POSTGRES_URI"])
+    connection = pg8000.connect(
+        user=conn.login,
+        password=conn.password,
+        host=conn.host,
+        port=conn.port or 5432,
+        database=conn.schema,
+    )
+    cursor = connection.cursor()
+    cursor.execute("CREATE TEMP TABLE bulk_load (id INT PRIMARY KEY, name TEXT)")
+    cursor.execute("INSERT INTO bulk_load VALUES (0, 'stale'), (100, 'old')")
+    bulk_load_csv(
+        csv_file,
+        "bulk_load",
+        "postgresql",
+        None,
+        method,
+        batch_size=10,
+        write_mode="upsert",
+        merge_key=["id"],
+        connection=connection,
+    )
+    cursor.execute("SELECT COUNT(*), COUNT(name) FROM bulk_load")
+    assert cursor.fetchone() == [26, 17]
+
+
+@pytest.mark.skipif(
+    "DEBUSSY_TEST_MYSQL_URI" not in os.environ,
+    reason="set DEBUSSY_TEST_MYSQL_URI to a local mysql connection uri",
+)
+@pytest.mark.parametrize("method", ["native", "executemany"])
+def test_mysql_instance(csv_file, method):
+    MySQLdb = pytest.importorskip("MySQLdb")
+    from airflow.models import Connection
+
+    conn = Connection(uri=os.environ["DEBUSSY_TEST_MYSQL_URI"])
+    connection = MySQLdb.connect(
+        user=conn.login,
+        passwd=conn.password or "",
+        host=conn.host,
+        port=conn.port or 3306,
+        db=conn.schema,
+        local_infile=1,
+    )
+    cursor = connection.cursor()
+    cursor.execute("CREATE TEMPORARY TABLE bulk_load (id INT PRIMARY KEY, name TEXT)")
+    cursor.execute("INSERT INTO bulk_load VALUES (0, 'stale'), (100, 'old')")
+    bulk_load_csv(
+        csv_file,
+        "bulk_load",
+        "mysql",
+        None,
+        method,
+        batch_size=10,
+        write_mode="upsert",
+        merge_key=["id"],
+        connection=connection,
+    )
+    cursor.execute("SELECT COUNT(*), COUNT(name) FROM bulk_load")
+    assert cursor.fetchone() == (26, 17)
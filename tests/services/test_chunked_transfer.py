@@ -0,0 +1,254 @@
+import json
+import os
+
+import pytest
+
+from debussy_concert.core.service.key_value.store import LocalFileKeyValueStore
+from debussy_concert.core.service.storage import chunked
+from debussy_concert.core.service.storage.transfer import chunked_transfer
+
+DATA = bytes(range(256)) * 41
+
+
+@pytest.fixture
+def origin(tmp_path):
+    path = tmp_path / "origin.bin"
+    path.write_bytes(DATA)
+    return str(path)
+
+
+class FakeSftpClient:
+    """paramiko SFTPClient subset over the local filesystem"""
+
+    closed = False
+
+    def stat(self, path):
+        assert not self.closed
+        return os.stat(path)
+
+    def open(self, path, mode):
+        assert not self.closed
+        return open(path, mode)
+
+    def truncate(self, path, size):
+        os.truncate(path, size)
+
+    def posix_rename(self, old_path, new_path):
+        os.replace(old_path, new_path)
+
+
+def test_local_transfer_in_chunks(origin, tmp_path, monkeypatch):
+    read_lengths = []
+    read_chunk = chunked.LocalChunkedStorage.read_chunk
+
+    def recording_read_chunk(self, uri, offset, length):
+        read_lengths.append(length)
+        return read_chunk(self, uri, offset, length)
+
+    monkeypatch.setattr(chunked.LocalChunkedStorage, "read_chunk", recording_read_chunk)
+    destination = tmp_path / "out" / "destination.bin"
+    result = chunked_transfer(
+        origin, f"file://{destination}", chunk_size=1000, parallelism=3
+    )
+    assert result == {"size": len(DATA), "chunks": 11}
+    assert destination.read_bytes() == DATA
+    assert not os.path.exists(f"{destination}.part")
+    assert max(read_lengths) <= 1000
+
+
+def test_transfer_resumes_from_checkpoint(origin, tmp_path, monkeypatch):
+    uploaded, failed = [], []
+    upload_chunk = chunked.LocalChunkedStorage.upload_chunk
+
+    def flaky_upload_chunk(self, uri, upload, index, offset, data):
+        if index == 3 and not failed:
+            failed.append(index)
+            raise IOError("worker lost")
+        uploaded.append(index)
+        return upload_chunk(self, uri, upload, index, offset, data)
+
+    monkeypatch.setattr(chunked.LocalChunkedStorage, "upload_chunk", flaky_upload_chunk)
+    destination = str(tmp_path / "destination.bin")
+    checkpoint = {"type": "local", "path": str(tmp_path / "checkpoint.json")}
+    kwargs = dict(chunk_size=1000, parallelism=2, checkpoint=checkpoint)
+    with pytest.raises(IOError):
+        chunked_transfer(origin, destination, **kwargs)
+    (state,) = json.load(open(checkpoint["path"])).values()
+    assert sorted(json.loads(state)["parts"], key=int) == [
+        str(index) for index in range(11) if index != 3
+    ]
+
+    uploaded.clear()
+    chunked_transfer(origin, destination, **kwargs)
+    assert uploaded == [3]
+    assert open(destination, "rb").read() == DATA
+    assert set(json.load(open(checkpoint["path"])).values()) == {""}
+
+
+def test_checkpoint_saves_are_throttled(origin, tmp_path, monkeypatch):
+    saved = []
+    store_set = LocalFileKeyValueStore.set
+
+    def recording_set(self, key, value):
+        saved.append(value and len(json.loads(value)["parts"]))
+        return store_set(self, key, value)
+
+    monkeypatch.setattr(LocalFileKeyValueStore, "set", recording_set)
+    checkpoint = {"type": "local", "path": str(tmp_path / "checkpoint.json")}
+    chunked_transfer(
+        origin,
+        str(tmp_path / "destination.bin"),
+        chunk_size=1000,
+        parallelism=1,
+        checkpoint=checkpoint,
+        checkpoint_every=4,
+    )
+    # started, every 4 of the 11 chunks, all of them, completed and cleared
+    assert saved == [0, 4, 8, 11, 11, ""]
+
+
+def test_checkpoint_of_a_rewritten_origin_is_discarded(origin, tmp_path, monkeypatch):
+    upload_chunk = chunked.LocalChunkedStorage.upload_chunk
+
+    def failing_upload_chunk(self, uri, upload, index, offset, data):
+        if index == 5:
+            raise IOError("worker lost")
+        return upload_chunk(self, uri, upload, index, offset, data)
+
+    monkeypatch.setattr(
+        chunked.LocalChunkedStorage, "upload_chunk", failing_upload_chunk
+    )
+    destination = str(tmp_path / "destination.bin")
+    checkpoint = {"type": "local", "path": str(tmp_path / "checkpoint.json")}
+    kwargs = dict(chunk_size=1000, parallelism=1, checkpoint=checkpoint)
+    with pytest.raises(IOError):
+        chunked_transfer(origin, destination, **kwargs)
+
+    # the origin is written again with the same size before the rerun
+    rewritten = DATA[::-1]
+    with open(origin, "wb") as file:
+        file.write(rewritten)
+    stat = os.stat(origin)
+    os.utime(origin, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    monkeypatch.setattr(chunked.LocalChunkedStorage, "upload_chunk", upload_chunk)
+    chunked_transfer(origin, destination, **kwargs)
+    assert open(destination, "rb").read() == rewritten
+
+
+def test_transfer_verifies_checksums(origin, tmp_path, monkeypatch):
+    upload_chunk = chunked.LocalChunkedStorage.upload_chunk
+
+    def corrupt_upload_chunk(self, uri, upload, index, offset, data):
+        return upload_chunk(self, uri, upload, index, offset, data[::-1])
+
+    monkeypatch.setattr(
+        chunked.LocalChunkedStorage, "upload_chunk", corrupt_upload_chunk
+    )
+    with pytest.raises(ValueError):
+        chunked_transfer(origin, str(tmp_path / "destination.bin"), chunk_size=1000)
+
+
+class FakeSftpConnection:
+    """pysftp Connection, closing its sftp client once collected"""
+
+    def __init__(self, connections):
+        self.sftp_client = FakeSftpClient()
+        connections.append(self)
+
+    def close(self):
+        self.sftp_client.closed = True
+
+    def __del__(self):
+        self.close()
+
+
+def test_sftp_transfer(origin, tmp_path, monkeypatch):
+    from debussy_airflow.hooks.storage_hook import SFTPHook
+
+    connections = []
+    monkeypatch.setattr(
+        SFTPHook, "get_conn", lambda self: FakeSftpConnection(connections)
+    )
+    remote = tmp_path / "remote.bin"
+    chunked_transfer(origin, f"sftp://{remote}", chunk_size=1000, parallelism=4)
+    assert remote.read_bytes() == DATA
+    copy = tmp_path / "copy.bin"
+    chunked_transfer(f"sftp://{remote}", str(copy), chunk_size=4096)
+    assert copy.read_bytes() == DATA
+    # one connection per thread, closed once the transfer ends
+    assert connections
+    assert all(connection.sftp_client.closed for connection in connections)
+
+
+def test_s3_minimum_part_size(origin):
+    with pytest.raises(ValueError):
+        chunked_transfer(origin, "s3://bucket/key", chunk_size=1000)
+
+
+class FakeGcsBlob:
+    def __init__(self, objects, name):
+        self.objects, self.name = objects, name
+
+    def upload_from_string(self, data):
+        self.objects[self.name] = data
+
+    def reload(self):
+        pass
+
+    @property
+    def size(self):
+        return len(self.objects[self.name])
+
+
+class FakeGcsHook:
+    """GCSHook subset over a dict of object names, with the gcs 404s"""
+
+    def __init__(self, objects, fail_deletes=0):
+        self.objects = objects
+        self.fail_deletes = fail_deletes
+
+    def get_conn(self):
+        return self
+
+    def bucket(self, bucket):
+        return self
+
+    def blob(self, name):
+        return FakeGcsBlob(self.objects, name)
+
+    def compose(self, bucket, sources, destination):
+        from google.api_core.exceptions import NotFound
+
+        if any(source not in self.objects for source in sources):
+            raise NotFound("part not found")
+        self.objects[destination] = b"".join(self.objects[name] for name in sources)
+
+    def delete(self, bucket, name):
+        from google.api_core.exceptions import NotFound
+
+        if self.fail_deletes and len(self.objects) <= self.fail_deletes:
+            raise IOError("worker lost")
+        if name not in self.objects:
+            raise NotFound(name)
+        del self.objects[name]
+
+
+def test_gcs_transfer_interrupted_while_completing(origin, tmp_path, monkeypatch):
+    pytest.importorskip("google.api_core")
+    objects = {}
+    # the worker is lost after the compose, once some parts are deleted
+    hook = FakeGcsHook(objects, fail_deletes=6)
+    monkeypatch.setattr(chunked.GcsChunkedStorage, "hook", property(lambda self: hook))
+    checkpoint = {"type": "local", "path": str(tmp_path / "checkpoint.json")}
+    kwargs = dict(chunk_size=1000, parallelism=2, checkpoint=checkpoint)
+    with pytest.raises(IOError):
+        chunked_transfer(origin, "gs://bucket/destination.bin", **kwargs)
+    assert objects["destination.bin"] == DATA
+    (state,) = json.load(open(checkpoint["path"])).values()
+    assert json.loads(state)["completed"]
+
+    hook.fail_deletes = 0
+    result = chunked_transfer(origin, "gs://bucket/destination.bin", **kwargs)
+    assert result == {"size": len(DATA), "chunks": 11}
+    assert objects == {"destination.bin": DATA}
+    assert set(json.load(open(checkpoint["path"])).values()) == {""}
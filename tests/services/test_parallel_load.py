@@ -0,0 +1,224 @@
+import os
+import threading
+import time
+
+import pytest
+
+from debussy_concert.core.service.rdbms.parallel_load import parallel_bulk_load_csv
+
+STAGING = "`db`.`debussy_staging_table`"
+LEDGER = "`db`.`debussy_staging_table_shards`"
+SHARD_STAGING = "`db`.`debussy_shard_table`"
+SHARD = "COALESCE(`_staging_shard`, -1)"
+
+
+class FakeDatabase:
+    """Staged rows and ledger shared by the connections, applied on commit"""
+
+    def __init__(self, fail_shards=(), late_shard=None):
+        self.lock = threading.Lock()
+        self.ledger = None
+        self.staged = []
+        # shard index of each staged row, numbered from 1 in commit order
+        self.staged_shards = []
+        self.table = {}
+        self.statements = []
+        self.connections = 0
+        self.fail_shards = set(fail_shards)
+        # (uri, shards): the late shard is staged once the others are in the ledger
+        self.late_shard = late_shard
+
+
+class FakeCursor:
+    rowcount = -1
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.database = connection.database
+
+    def execute(self, sql, params=None):
+        database = self.database
+        database.statements.append(sql)
+        if sql == f"SELECT shard FROM {LEDGER}":
+            if database.ledger is None:
+                raise RuntimeError("no such table")
+            self.rows = [(shard,) for shard in database.ledger]
+        elif sql.startswith("SHOW INDEX FROM `db`.`table`"):
+            self.rows = [("table", 0, "PRIMARY", 1, "id")]
+        elif sql == f"CREATE TABLE {LEDGER} (shard VARCHAR(700) NOT NULL PRIMARY KEY)":
+            database.ledger = set()
+            database.staged, database.staged_shards = [], []
+        elif sql.startswith(f"INSERT INTO {LEDGER}"):
+            (shard,) = params
+            # the failing shards are given by uri, without the version
+            uri = shard.partition("@")[0]
+            if uri in database.fail_shards:
+                database.fail_shards.remove(uri)
+                raise RuntimeError("connection lost")
+            if database.late_shard and uri == database.late_shard[0]:
+                deadline = time.monotonic() + 5
+                while len(database.ledger) < database.late_shard[1]:
+                    assert time.monotonic() < deadline
+                    time.sleep(0.01)
+            self.connection.pending_shards.append(shard)
+        elif sql.startswith(f"DROP TABLE IF EXISTS {LEDGER}"):
+            database.ledger = None
+        elif sql.startswith(f"CREATE TEMPORARY TABLE {SHARD_STAGING}"):
+            self.connection.shard_rows = []
+        elif sql.startswith(f"INSERT INTO {STAGING}") and SHARD_STAGING in sql:
+            (index,) = params
+            self.connection.pending_rows.extend(self.connection.shard_rows)
+            self.connection.pending_indexes.extend(
+                [index] * len(self.connection.shard_rows)
+            )
+        elif sql.startswith(f"SELECT {SHARD}"):
+            ranges = {}
+            for row, index in enumerate(database.staged_shards, 1):
+                index = -1 if index is None else index
+                first, last, count = ranges.get(index, (row, row, 0))
+                ranges[index] = (first, row, count + 1)
+            self.rows = [(index, *ranges[index]) for index in sorted(ranges)]
+        elif sql.startswith("INSERT INTO `db`.`table`") and SHARD in sql:
+            first_row, last_row, index = params
+            for row, values in enumerate(database.staged, 1):
+                shard = database.staged_shards[row - 1]
+                shard = -1 if shard is None else shard
+                if first_row < row <= last_row and shard == index:
+                    database.table[values[0]] = values[1]
+
+    def executemany(self, sql, rows):
+        if f"INSERT INTO {SHARD_STAGING}" in sql:
+            self.connection.shard_rows.extend(rows)
+            return
+        assert f"INSERT INTO {STAGING}" in sql
+        self.connection.pending_rows.extend(rows)
+        self.connection.pending_indexes.extend([None] * len(rows))
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return (len(self.database.staged),)
+
+
+class FakeConnection:
+    def __init__(self, database):
+        self.database = database
+        self.pending_rows, self.pending_indexes, self.pending_shards = [], [], []
+        with database.lock:
+            database.connections += 1
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        with self.database.lock:
+            self.database.staged.extend(self.pending_rows)
+            self.database.staged_shards.extend(self.pending_indexes)
+            if self.database.ledger is not None:
+                self.database.ledger.update(self.pending_shards)
+        self.rollback()
+
+    def rollback(self):
+        self.pending_rows, self.pending_indexes, self.pending_shards = [], [], []
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def shards_folder(tmp_path):
+    folder = tmp_path / "x.csv.shards"
+    folder.mkdir()
+    for shard in range(5):
+        rows = [f"{shard * 10 + index},name" for index in range(10)]
+        (folder / f"part-{shard:03}.csv").write_text("\n".join(["id,name"] + rows))
+    return f"{folder}/"
+
+
+def load(storage_uri, database, **kwargs):
+    return parallel_bulk_load_csv(
+        storage_uri,
+        "db.table",
+        "mysql",
+        None,
+        "executemany",
+        parallel_connections=3,
+        connect=lambda: FakeConnection(database),
+        **kwargs,
+    )
+
+
+def test_shards_are_staged_before_the_table_is_written(shards_folder):
+    database = FakeDatabase(fail_shards=[f"{shards_folder}part-002.csv"])
+    load(shards_folder, database)
+    assert sorted(int(row[0]) for row in database.staged) == list(range(50))
+    # the failed shard rows were rolled back and loaded again on a new connection
+    assert database.connections <= 5
+    append = (
+        f"INSERT INTO `db`.`table` (`id`, `name`) SELECT `id`, `name` FROM {STAGING}"
+    )
+    barrier = database.statements.index(append)
+    assert sum(
+        statement.startswith(f"INSERT INTO {LEDGER}")
+        for statement in database.statements[:barrier]
+    ) == 6
+    assert database.statements[-1] == f"DROP TABLE IF EXISTS {LEDGER}"
+
+
+def test_rerun_skips_loaded_shards(shards_folder):
+    database = FakeDatabase(fail_shards=[f"{shards_folder}part-004.csv"])
+    with pytest.raises(RuntimeError):
+        load(shards_folder, database, shard_retries=0)
+    assert len(database.ledger) == 4
+    database.statements.clear()
+    load(shards_folder, database, write_mode="upsert", merge_key=["id"])
+    ledger_inserts = [
+        statement
+        for statement in database.statements
+        if statement.startswith(f"INSERT INTO {LEDGER}")
+    ]
+    assert len(ledger_inserts) == 1
+    assert len(database.staged) == 50
+
+
+def test_upserted_shards_are_merged_in_export_order(tmp_path):
+    folder = tmp_path / "x.csv.shards"
+    folder.mkdir()
+    for shard in range(3):
+        (folder / f"part-{shard:03}.csv").write_text(f"id,name\n{shard},a\n7,{shard}")
+    # the first shard is staged last
+    database = FakeDatabase(late_shard=(f"{folder}/part-000.csv", 2))
+    load(f"{folder}/", database, write_mode="upsert", merge_key=["id"])
+    assert database.staged_shards[-2:] == [0, 0]
+    assert database.table == {"0": "a", "1": "a", "2": "a", "7": "2"}
+
+
+def test_rerun_of_another_export_starts_over(shards_folder):
+    database = FakeDatabase(fail_shards=[f"{shards_folder}part-004.csv"])
+    with pytest.raises(RuntimeError):
+        load(shards_folder, database, shard_retries=0)
+    # the export is written again before the rerun
+    shard = f"{shards_folder}part-000.csv"
+    with open(shard, "w") as file:
+        file.write("id,name\n100,name")
+    stat = os.stat(shard)
+    os.utime(shard, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    database.statements.clear()
+    load(shards_folder, database)
+    assert sorted(int(row[0]) for row in database.staged) == list(range(10, 50)) + [100]
+
+
+def test_row_range_shards(tmp_path):
+    path = tmp_path / "rows.csv"
+    path.write_text("\n".join(["id,name"] + [f"{index},name" for index in range(25)]))
+    database = FakeDatabase()
+    load(str(path), database, shard_rows=10, write_mode="replace")
+    assert sorted(int(row[0]) for row in database.staged) == list(range(25))
+    assert "DELETE FROM `db`.`table`" in database.statements
+    ledger_inserts = [
+        statement
+        for statement in database.statements
+        if statement.startswith(f"INSERT INTO {LEDGER}")
+    ]
+    assert len(ledger_inserts) == 3
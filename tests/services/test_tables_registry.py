@@ -0,0 +1,62 @@
+import os
+
+from debussy_concert.core.entities.table import BigQueryTable
+from debussy_concert.core.service.tables.registry import BigQueryTableRegistry
+
+TABLE_YAML = """
+fields:
+  - name: {field_name}
+    description: id of the user
+    data_type: STRING
+    constraint: REQUIRED
+partitioning:
+  type: time
+  granularity: DAY
+  field: _logical_ts
+"""
+
+
+def write_table_definition(file_path, field_name):
+    with open(file_path, "w") as file:
+        file.write(TABLE_YAML.format(field_name=field_name))
+
+
+def test_registry_shares_loaded_table(tmp_path):
+    file_path = tmp_path / "table.yaml"
+    write_table_definition(file_path, "user_id")
+    registry = BigQueryTableRegistry()
+
+    table = registry.load_from_file(str(file_path))
+    assert isinstance(table, BigQueryTable)
+    assert table.schema.fields[0].name == "user_id"
+    assert table.partitioning.type == "DAY"
+    assert registry.load_from_file(str(file_path)) is table
+
+
+def test_registry_reloads_changed_file(tmp_path):
+    file_path = tmp_path / "table.yaml"
+    write_table_definition(file_path, "user_id")
+    registry = BigQueryTableRegistry()
+    table = registry.load_from_file(str(file_path))
+
+    write_table_definition(file_path, "customer_id")
+    stat = os.stat(file_path)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    reloaded_table = registry.load_from_file(str(file_path))
+    assert reloaded_table is not table
+    assert reloaded_table.schema.fields[0].name == "customer_id"
+
+
+def test_registry_reloads_when_a_referenced_env_var_changes(tmp_path, monkeypatch):
+    file_path = tmp_path / "table.yaml"
+    write_table_definition(file_path, "${TABLE_REGISTRY_TEST_FIELD}")
+    registry = BigQueryTableRegistry()
+    monkeypatch.setenv("TABLE_REGISTRY_TEST_FIELD", "user_id")
+    table = registry.load_from_file(str(file_path))
+    assert table.schema.fields[0].name == "user_id"
+    assert registry.load_from_file(str(file_path)) is table
+
+    monkeypatch.setenv("TABLE_REGISTRY_TEST_FIELD", "customer_id")
+    reloaded_table = registry.load_from_file(str(file_path))
+    assert reloaded_table.schema.fields[0].name == "customer_id"
@@ -0,0 +1,37 @@
+import pytest
+
+from benchmarks.dag_build import compare, machine_scale, merge_results
+from benchmarks.synthetic import PIPELINES, load_config, write_composition
+
+
+@pytest.mark.parametrize("pipeline", sorted(PIPELINES))
+def test_synthetic_composition_loads(tmp_path, pipeline):
+    composition_file, env_file = write_composition(pipeline, str(tmp_path), size=3)
+    config = load_config(pipeline, composition_file, env_file)
+    names = [movement.name for movement in config.movements_parameters]
+    assert names == ["table_00000", "table_00001", "table_00002"]
+
+
+def test_compare_reports_regressions_over_tolerance():
+    baselines = merge_results(
+        {}, {"testing": {"reverse_etl": {"10": {"build": 1.0, "setup": 1.0}}}}
+    )
+    results = {"testing": {"reverse_etl": {"10": {"build": 1.4, "setup": 1.6}}}}
+    regressions = compare(results, baselines, tolerance=0.5)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("testing/reverse_etl/10/setup")
+
+
+def test_compare_scales_the_baselines_by_the_reference_workload():
+    baselines = merge_results(
+        {}, {"testing": {"reverse_etl": {"10": {"build": 1.0, "setup": 1.0}}}}
+    )
+    baselines["reference"] = 0.1
+    # this machine runs the reference twice as slow as the baselines one
+    scale = machine_scale(baselines, 0.2)
+    assert scale == 2.0
+    results = {"testing": {"reverse_etl": {"10": {"build": 2.8, "setup": 3.2}}}}
+    regressions = compare(results, baselines, tolerance=0.5, scale=scale)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("testing/reverse_etl/10/setup")
+    assert machine_scale({}, 0.2) == 1.0
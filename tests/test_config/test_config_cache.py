@@ -0,0 +1,86 @@
+import os
+import shutil
+
+from debussy_concert.core.config.config_cache import ConfigCache
+from debussy_concert.pipeline.reverse_etl.config.reverse_etl import ConfigReverseEtl
+
+RESOURCE_PATH = "tests/resource/yaml/reverse_etl"
+
+
+def copy_resources(tmp_path):
+    composition_file = tmp_path / "composition.yaml"
+    env_file = tmp_path / "environment.yaml"
+    shutil.copy(f"{RESOURCE_PATH}/composition.yaml", composition_file)
+    shutil.copy(f"{RESOURCE_PATH}/environment.yaml", env_file)
+    return str(composition_file), str(env_file)
+
+
+def test_config_cache_reuses_entry(tmp_path):
+    composition_file, env_file = copy_resources(tmp_path)
+    cache = ConfigCache(cache_dir=str(tmp_path / "cache"))
+
+    config = cache.load(ConfigReverseEtl, composition_file, env_file)
+    key = cache.cache_key(ConfigReverseEtl, composition_file, env_file)
+    assert cache.entry_path(key).exists()
+
+    cached_config = cache.load(ConfigReverseEtl, composition_file, env_file)
+    assert cached_config is not config
+    assert cached_config.name == config.name
+    assert cached_config.environment == config.environment
+    assert cached_config.movements_parameters == config.movements_parameters
+    assert cached_config.dag_parameters.start_date == config.dag_parameters.start_date
+
+
+def test_config_cache_invalidated_by_file_content(tmp_path):
+    composition_file, env_file = copy_resources(tmp_path)
+    cache = ConfigCache(cache_dir=str(tmp_path / "cache"))
+    key = cache.cache_key(ConfigReverseEtl, composition_file, env_file)
+    cache.load(ConfigReverseEtl, composition_file, env_file)
+
+    with open(composition_file) as file:
+        content = file.read()
+    with open(composition_file, "w") as file:
+        file.write(content.replace("composition_name_test", "composition_name_changed"))
+
+    assert cache.cache_key(ConfigReverseEtl, composition_file, env_file) != key
+    config = cache.load(ConfigReverseEtl, composition_file, env_file)
+    assert config.name == "composition_name_changed"
+
+
+def test_config_cache_invalidated_by_referenced_env_var(tmp_path, monkeypatch):
+    composition_file, env_file = copy_resources(tmp_path)
+    with open(composition_file) as file:
+        content = file.read()
+    with open(composition_file, "w") as file:
+        file.write(content.replace("description_test", "${DEBUSSY_TEST_DESCRIPTION}"))
+    cache = ConfigCache(cache_dir=str(tmp_path / "cache"))
+
+    monkeypatch.setenv("DEBUSSY_TEST_DESCRIPTION", "first")
+    assert cache.load(ConfigReverseEtl, composition_file, env_file).description == "first"
+    monkeypatch.setenv("DEBUSSY_TEST_DESCRIPTION", "second")
+    assert cache.load(ConfigReverseEtl, composition_file, env_file).description == "second"
+
+
+def test_config_cache_exports_environment_env_vars(tmp_path, monkeypatch):
+    composition_file, env_file = copy_resources(tmp_path)
+    cache = ConfigCache(cache_dir=str(tmp_path / "cache"))
+    cache.load(ConfigReverseEtl, composition_file, env_file)
+
+    monkeypatch.delenv("DEBUSSY_CONCERT__PROJECT")
+    cache.load(ConfigReverseEtl, composition_file, env_file)
+    assert os.environ["DEBUSSY_CONCERT__PROJECT"] == "project_test"
+
+
+def test_config_cache_ignores_entries_writable_by_others(tmp_path, monkeypatch):
+    composition_file, env_file = copy_resources(tmp_path)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "home_cache"))
+    monkeypatch.delenv("DEBUSSY_CONCERT__CONFIG_CACHE_DIR", raising=False)
+    cache = ConfigCache()
+    cache.load(ConfigReverseEtl, composition_file, env_file)
+    assert cache.cache_dir == tmp_path / "home_cache" / "debussy_concert" / "config"
+    assert cache.cache_dir.stat().st_mode & 0o777 == 0o700
+
+    key = cache.cache_key(ConfigReverseEtl, composition_file, env_file)
+    assert cache.read(key) is not None
+    cache.entry_path(key).chmod(0o666)
+    assert cache.read(key) is None
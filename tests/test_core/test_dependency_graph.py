@@ -0,0 +1,95 @@
+import pytest
+
+from debussy_concert.core.entities.dependency_graph import DependencyGraph
+from debussy_concert.core.phrase.phrase_base import PhraseBase
+from debussy_concert.pipeline.data_ingestion.movement.data_ingestion import (
+    DataIngestionMovement,
+)
+
+from tests.resource.core_for_testing import DummyDag, DummyMotif, create_empty_phrase
+
+
+def test_nodes_are_chained_without_dependencies():
+    graph = DependencyGraph(["a", "b", "c"])
+    assert list(graph) == ["a", "b", "c"]
+    assert graph.edges() == [("a", "b"), ("b", "c")]
+
+
+def test_fan_out_fan_in_stages():
+    graph = DependencyGraph(
+        ["start", "left", "right", "join"],
+        {"left": ["start"], "right": ["start"], "join": ["left", "right", "start"]},
+    )
+    assert graph.stages() == [["start"], ["left", "right"], ["join"]]
+    # start >> join is implied by start >> left >> join
+    assert graph.edges() == [
+        ("start", "left"),
+        ("start", "right"),
+        ("left", "join"),
+        ("right", "join"),
+    ]
+
+
+def test_graphs_of_the_same_shape_share_their_reduction():
+    from debussy_concert.core.entities.dependency_graph import reduced_edges
+
+    reduced_edges.cache_clear()
+    for prefix in ("first_", "second_"):
+        start, left, right, join = (
+            prefix + name for name in ("start", "left", "right", "join")
+        )
+        # declared out of order
+        graph = DependencyGraph(
+            [join, right, left, start],
+            {join: [left, right, start], left: [start], right: [start]},
+        )
+        assert list(graph) == [start, right, left, join]
+        assert graph.edges() == [
+            (start, right),
+            (start, left),
+            (left, join),
+            (right, join),
+        ]
+    assert reduced_edges.cache_info().misses == 1
+
+
+def test_cycle_and_unknown_node_raise():
+    with pytest.raises(ValueError, match="cycle"):
+        DependencyGraph(["a", "b"], {"a": ["b"], "b": ["a"]})
+    with pytest.raises(ValueError, match="unknown"):
+        DependencyGraph(["a"], {"a": ["b"]})
+
+
+def test_phrase_builds_motifs_from_dependencies(inject_testing):
+    first, second, third = (DummyMotif(name=name) for name in ("m1", "m2", "m3"))
+    phrase = PhraseBase(
+        name="phrase",
+        motifs=[first, second, third],
+        dependencies={second: [first], third: [first]},
+    )
+    phrase.build(DummyDag(dag_id="dag"), movement_group=None)
+    assert first.downstream == [second, third]
+    assert not hasattr(second, "downstream")
+
+
+def test_data_ingestion_movement_runs_table_creation_with_extraction(inject_testing):
+    start_phrase = create_empty_phrase("start_phrase")
+    create_or_update_table_phrase = create_empty_phrase("create_or_update_table")
+    extraction_phrase = create_empty_phrase("extraction")
+    load_phrase = create_empty_phrase("load")
+    end_phrase = create_empty_phrase("end_phrase")
+    movement = DataIngestionMovement(
+        name="movement",
+        start_phrase=start_phrase,
+        create_or_update_table_phrase=create_or_update_table_phrase,
+        ingestion_source_to_raw_vault_storage_phrase=extraction_phrase,
+        raw_vault_storage_to_data_warehouse_raw_phrase=load_phrase,
+        end_phrase=end_phrase,
+    )
+    assert movement.dependency_graph.stages() == [
+        [start_phrase],
+        [create_or_update_table_phrase, extraction_phrase],
+        [load_phrase],
+        [end_phrase],
+    ]
+    movement.build(DummyDag(dag_id="dag"))
@@ -0,0 +1,51 @@
+import pytest
+
+
+@pytest.fixture
+def rdbms_composition(synthetic_composition):
+    """Creates a synthetic rdbms ingestion composition built with airflow"""
+
+    def create(
+        scope="movement",
+        dataproc_type="managed",
+        size=3,
+        composition_parameters=None,
+        dataproc_config=None,
+        **movement_parameters,
+    ):
+        from debussy_concert.pipeline.data_ingestion.composition.rdbms_ingestion import (
+            RdbmsIngestionComposition,
+        )
+
+        def update_fn(composition):
+            composition["dataproc_config"]["scope"] = scope
+            composition["dataproc_config"]["type"] = dataproc_type
+            composition["dataproc_config"].update(dataproc_config or {})
+            composition.update(composition_parameters or {})
+            for parameters in composition["ingestion_parameters"]:
+                parameters.update(movement_parameters)
+
+        synthetic_composition("rdbms_ingestion", size, update_fn)
+        return RdbmsIngestionComposition()
+
+    return create
+
+
+@pytest.fixture
+def bigquery_composition(synthetic_composition):
+    """Creates a synthetic bigquery ingestion composition built with airflow"""
+
+    def create(size=3, composition_parameters=None, **movement_parameters):
+        from debussy_concert.pipeline.data_ingestion.composition.bigquery_ingestion import (
+            BigQueryIngestionComposition,
+        )
+
+        def update_fn(composition):
+            composition.update(composition_parameters or {})
+            for parameters in composition["ingestion_parameters"]:
+                parameters.update(movement_parameters)
+
+        synthetic_composition("bigquery_ingestion", size, update_fn)
+        return BigQueryIngestionComposition()
+
+    return create
@@ -0,0 +1,79 @@
+import pytest
+
+
+class FakeBigQueryJob:
+    def __init__(self, job_id, state="RUNNING"):
+        self.job_id = job_id
+        self.state = state
+        self.error_result = None
+
+    def running(self):
+        return self.state == "RUNNING"
+
+    def to_api_repr(self):
+        return {"configuration": {}}
+
+
+class FakeBigQueryJobApi:
+    """Local stand-in for the BigQueryHook job api used by BigQueryInsertJobOperator"""
+
+    project_id = None
+    jobs = {}
+
+    def __init__(self, **kwargs):
+        pass
+
+    def generate_job_id(self, task_id, **kwargs):
+        return f"job_{task_id}"
+
+    def insert_job(self, configuration, job_id, **kwargs):
+        self.jobs[job_id] = configuration
+        return FakeBigQueryJob(job_id)
+
+
+def bigquery_job_operators(dag):
+    from debussy_concert.core.operators.bigquery import BigQueryInsertJobOperator
+
+    return [
+        task for task in dag.tasks if isinstance(task, BigQueryInsertJobOperator)
+    ]
+
+
+def test_bigquery_jobs_are_not_deferrable_by_default(rdbms_composition):
+    dag = rdbms_composition().auto_play()
+    operators = bigquery_job_operators(dag)
+    assert operators
+    assert not any(operator.deferrable for operator in operators)
+
+
+def test_bigquery_config_defers_every_bigquery_job(rdbms_composition, monkeypatch):
+    from airflow.exceptions import TaskDeferred
+    from airflow.providers.google.cloud.operators import bigquery
+    from airflow.providers.google.cloud.triggers.bigquery import (
+        BigQueryInsertJobTrigger,
+    )
+
+    composition = rdbms_composition(
+        composition_parameters={
+            "bigquery_config": {"deferrable": True, "poll_interval": 30}
+        }
+    )
+    dag = composition.auto_play()
+    operators = bigquery_job_operators(dag)
+    assert operators
+    assert all(operator.deferrable for operator in operators)
+    assert all(operator.poll_interval == 30 for operator in operators)
+
+    monkeypatch.setattr(bigquery, "BigQueryHook", FakeBigQueryJobApi)
+    operator = operators[0]
+    context = {"logical_date": dag.start_date, "ti": None}
+    with pytest.raises(TaskDeferred) as deferred:
+        operator.execute(context)
+    trigger = deferred.value.trigger
+    assert isinstance(trigger, BigQueryInsertJobTrigger)
+    assert trigger.job_id == f"job_{operator.task_id}"
+    assert trigger.poll_interval == 30
+    assert FakeBigQueryJobApi.jobs[trigger.job_id] == operator.configuration
+    assert deferred.value.method_name == "execute_complete"
+    event = {"status": "success", "message": "Job completed"}
+    assert operator.execute_complete(context, event) == trigger.job_id
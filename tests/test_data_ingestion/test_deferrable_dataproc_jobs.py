@@ -0,0 +1,63 @@
+import pytest
+
+DEFERRABLE = {"deferrable": True, "polling_interval_seconds": 60}
+
+
+class FakeDataprocBatchApi:
+    """Local stand-in for the DataprocHook batch api"""
+
+    batches = {}
+
+    def __init__(self, **kwargs):
+        pass
+
+    def create_batch(self, batch, batch_id, **kwargs):
+        self.batches[batch_id] = batch
+        return object()
+
+
+def task_of_type(dag, operator_class):
+    return [task for task in dag.tasks if isinstance(task, operator_class)]
+
+
+def test_managed_dataproc_jobs_deferrable(rdbms_composition):
+    from airflow.providers.google.cloud.operators.dataproc import (
+        DataprocSubmitJobOperator,
+    )
+
+    dag = rdbms_composition(dataproc_config=DEFERRABLE).auto_play()
+    jobs = task_of_type(dag, DataprocSubmitJobOperator)
+    assert jobs
+    assert all(job.deferrable for job in jobs)
+    assert all(job.polling_interval_seconds == 60 for job in jobs)
+
+    dag = rdbms_composition().auto_play()
+    assert not any(job.deferrable for job in task_of_type(dag, DataprocSubmitJobOperator))
+
+
+@pytest.mark.parametrize("scope", ["movement", "composition"])
+def test_serverless_batches_deferrable(rdbms_composition, monkeypatch, scope):
+    from airflow.exceptions import TaskDeferred
+    from airflow.providers.google.cloud.operators import dataproc
+    from airflow.providers.google.cloud.triggers.dataproc import DataprocBatchTrigger
+    from debussy_concert.core.operators.dataproc import (
+        DataprocServerlessSubmitJobOperator,
+    )
+
+    composition = rdbms_composition(
+        scope=scope, dataproc_type="serverless", dataproc_config=DEFERRABLE
+    )
+    dag = composition.auto_play()
+    batches = task_of_type(dag, DataprocServerlessSubmitJobOperator)
+    assert batches
+    assert all(batch.deferrable for batch in batches)
+
+    monkeypatch.setattr(dataproc, "DataprocHook", FakeDataprocBatchApi)
+    batch = batches[0]
+    with pytest.raises(TaskDeferred) as deferred:
+        batch.execute({})
+    trigger = deferred.value.trigger
+    assert isinstance(trigger, DataprocBatchTrigger)
+    assert trigger.batch_id == batch.batch_id
+    assert trigger.polling_interval_seconds == 60
+    assert FakeDataprocBatchApi.batches[batch.batch_id] == batch.batch
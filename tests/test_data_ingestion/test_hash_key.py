@@ -0,0 +1,123 @@
+import hashlib
+import json
+
+import pytest
+
+from tests.resource.pyspark_scripts import load_jdbc_to_gcs_script
+
+from debussy_concert.pipeline.data_ingestion.config.movement_parameters.rdbms_data_ingestion import (
+    HashKey,
+)
+
+
+def test_invalid_hash_key_raises():
+    with pytest.raises(ValueError):
+        HashKey(algorithm="crc32")
+    with pytest.raises(ValueError):
+        HashKey(encoding="base64")
+
+
+def test_hash_key_movements_run_the_hash_key_script(rdbms_composition):
+    hash_key = {"algorithm": "xxhash64", "columns": ["id", "name"]}
+    dag = rdbms_composition(hash_key=hash_key).auto_play()
+    job = dag.get_task(
+        "DataIngestionMovement_table_00000.IngestionSourceToRawVaultStoragePhrase."
+        "DataprocExportRdbmsTableToGcsMotif.jdbc_to_raw_vault"
+    ).job["pyspark_job"]
+    assert job["main_python_file_uri"].endswith("/jdbc_to_gcs_hash_key.py")
+    assert [uri.rsplit("/", 1)[-1] for uri in job["python_file_uris"]] == [
+        "jdbc_common.py"
+    ]
+    flag, value = job["args"][-1].split("=", 1)
+    assert flag == "--hash-key"
+    assert json.loads(value) == {**hash_key, "encoding": "safe"}
+
+
+def test_safe_encoding_tells_apart_shifted_values_and_nulls():
+    jdbc_common = load_jdbc_to_gcs_script("jdbc_common")
+    encode = jdbc_common.safe_encoding
+    assert encode(["a", "bc"]) == "1:a2:bc"
+    assert encode(["a", "bc"]) != encode(["ab", "c"])
+    assert encode([None, "x"]) == "\u0000" + "1:x"
+    assert encode([None, "x"]) != encode(["", "x"])
+    assert encode(["", None]) != encode([None, ""])
+
+
+ROWS = [("a", "bc"), ("ab", "c"), (None, "x"), ("", "x")]
+
+
+@pytest.fixture(scope="module")
+def hash_key_rows():
+    """Hashes ROWS with the hash key script in a local spark session"""
+    pytest.importorskip("pyspark")
+    from pyspark.sql import SparkSession
+
+    hash_key_script = load_jdbc_to_gcs_script("jdbc_to_gcs_hash_key")
+    spark = SparkSession.builder.master("local[1]").getOrCreate()
+    df = spark.createDataFrame(ROWS, "first string, second string")
+
+    def hash_rows(hash_key):
+        return hash_key_script.add_hash_key(df, hash_key).collect()
+
+    yield hash_rows
+    spark.stop()
+
+
+@pytest.mark.parametrize("algorithm", ["md5", "sha2-256", "xxhash64"])
+def test_safe_hash_keys_are_distinct(hash_key_rows, algorithm):
+    rows = hash_key_rows({"algorithm": algorithm, "encoding": "safe"})
+    assert len({row["_hash_key"] for row in rows}) == len(ROWS)
+
+
+@pytest.mark.parametrize(
+    "algorithm, hash_fn", [("md5", hashlib.md5), ("sha2-256", hashlib.sha256)]
+)
+def test_safe_hash_keys_match_the_python_encoding(hash_key_rows, algorithm, hash_fn):
+    jdbc_common = load_jdbc_to_gcs_script("jdbc_common")
+    rows = hash_key_rows({"algorithm": algorithm})
+    assert [row["_hash_key"] for row in rows] == [
+        hash_fn(jdbc_common.safe_encoding(values).encode()).hexdigest()
+        for values in ROWS
+    ]
+
+
+def test_concat_hash_keys_collide(hash_key_rows):
+    rows = hash_key_rows({"algorithm": "md5", "encoding": "concat"})
+    assert rows[0]["_hash_key"] == rows[1]["_hash_key"]
+    assert rows[0]["_hash_key"] == hashlib.md5(b"abc").hexdigest()
+
+
+def test_default_hash_key_is_the_md5_of_the_concatenated_columns(hash_key_rows):
+    rows = hash_key_rows(None)
+    assert [row["_hash_key"] for row in rows] == [
+        hashlib.md5("".join(value or "" for value in values).encode()).hexdigest()
+        for values in ROWS
+    ]
+
+
+def test_none_hash_key_adds_no_column(hash_key_rows):
+    rows = hash_key_rows({"algorithm": "none"})
+    assert "_hash_key" not in rows[0].asDict()
+
+
+def test_invalid_hash_key_algorithm_fails_in_the_script(hash_key_rows):
+    with pytest.raises(ValueError):
+        hash_key_rows({"algorithm": "crc32"})
+
+
+def test_metadata_is_added_after_the_hash_key(hash_key_rows):
+    import datetime as dt
+
+    from pyspark.sql import SparkSession
+
+    jdbc_common = load_jdbc_to_gcs_script("jdbc_common")
+    hash_key_script = load_jdbc_to_gcs_script("jdbc_to_gcs_hash_key")
+    spark = SparkSession.builder.getOrCreate()
+    df = spark.createDataFrame(ROWS, "first string, second string")
+    df = hash_key_script.add_hash_key(df, {"algorithm": "md5"})
+    rows = jdbc_common.add_metadata(df, "20220101T000000").collect()
+    assert [row["_hash_key"] for row in rows] == [
+        row["_hash_key"] for row in hash_key_rows({"algorithm": "md5"})
+    ]
+    assert rows[0]["METADATA"]["IngestionDate"] == dt.datetime(2022, 1, 1)
+    assert len(rows[0]["METADATA"]["Id"]) == 30
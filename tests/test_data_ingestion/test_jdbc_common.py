@@ -0,0 +1,111 @@
+import pytest
+
+from tests.resource.pyspark_scripts import load_jdbc_to_gcs_script
+
+jdbc_common = load_jdbc_to_gcs_script("jdbc_common")
+
+
+def test_pop_flag_removes_the_json_argument():
+    argv = ["driver", '--output-files={"rowsPerFile": 10}', "url"]
+    assert jdbc_common.pop_flag(argv, jdbc_common.OUTPUT_FILES_FLAG) == {
+        "rowsPerFile": 10
+    }
+    assert argv == ["driver", "url"]
+    assert jdbc_common.pop_read_options(argv) == {}
+
+
+def test_probe_query_wraps_the_extraction_query():
+    assert jdbc_common.probe_query("SELECT * FROM film", "film_id") == (
+        "SELECT MIN(film_id) AS lower_bound, MAX(film_id) AS upper_bound,"
+        " COUNT(*) AS row_count FROM (SELECT * FROM film) debussy_query"
+    )
+
+
+@pytest.mark.parametrize(
+    "row_count, rows_per_partition, max_partitions, expected",
+    [
+        (1000, 100, 8, 8),
+        (1000, 300, 8, 4),
+        (1000, 1000, 8, 1),
+        (0, 100, 8, 1),
+        (1000, None, 8, 8),
+        (1000, 100, None, 1),
+    ],
+)
+def test_num_partitions(row_count, rows_per_partition, max_partitions, expected):
+    assert (
+        jdbc_common.num_partitions(row_count, rows_per_partition, max_partitions)
+        == expected
+    )
+
+
+def test_planned_read_options_use_the_probe_bounds():
+    read_options = {"partitionColumn": "id", "numPartitions": 16, "fetchsize": 500}
+    probe = {"lower_bound": 10, "upper_bound": 5000, "row_count": 2500}
+    assert jdbc_common.planned_read_options(read_options, probe, 1000) == {
+        "partitionColumn": "id",
+        "numPartitions": 3,
+        "fetchsize": 500,
+        "lowerBound": 10,
+        "upperBound": 5000,
+    }
+
+
+def test_planned_read_options_of_an_empty_table_read_one_partition():
+    read_options = {"partitionColumn": "id", "numPartitions": 16, "fetchsize": 500}
+    probe = {"lower_bound": None, "upper_bound": None, "row_count": 0}
+    assert jdbc_common.planned_read_options(read_options, probe, 1000) == {
+        "fetchsize": 500
+    }
+
+
+def test_partition_plan_keeps_given_bounds_without_probing():
+    read_options = {
+        "partitionColumn": "id",
+        "lowerBound": 1,
+        "upperBound": 10,
+        "numPartitions": 2,
+        "rowsPerPartition": 5,
+    }
+    planned = jdbc_common.partition_plan(
+        None, "driver", "url", "user", "password", "SELECT 1", read_options
+    )
+    assert planned == {
+        "partitionColumn": "id",
+        "lowerBound": 1,
+        "upperBound": 10,
+        "numPartitions": 2,
+    }
+
+
+@pytest.mark.parametrize(
+    "row_count, size_in_bytes, target_file_size_mb, expected",
+    [
+        # 3000 in-memory bytes make a 1000 bytes parquet row
+        (1000, 3_000_000, 1, 1048),
+        (1000, 3_000_000, 128, 134217),
+        # rows of less than a byte count as a byte
+        (1000, 0, 1, 1024**2),
+        (0, 0, 1, 1024**2),
+    ],
+)
+def test_rows_per_target_file(row_count, size_in_bytes, target_file_size_mb, expected):
+    assert (
+        jdbc_common.rows_per_target_file(row_count, size_in_bytes, target_file_size_mb)
+        == expected
+    )
+
+
+@pytest.mark.parametrize(
+    "row_count, rows_per_file, expected", [(0, 10, 1), (100, 10, 10), (101, 10, 11)]
+)
+def test_num_files(row_count, rows_per_file, expected):
+    assert jdbc_common.num_files(row_count, rows_per_file) == expected
+
+
+@pytest.mark.parametrize(
+    "num_files, num_partitions, expected",
+    [(4, 8, "coalesce"), (8, 8, "repartition"), (16, 8, "repartition")],
+)
+def test_resize_method(num_files, num_partitions, expected):
+    assert jdbc_common.resize_method(num_files, num_partitions) == expected
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from debussy_concert.pipeline.data_ingestion.config.movement_parameters.rdbms_data_ingestion import (
+    JdbcReadOptions,
+    RdbmsDataIngestionMovementParameters,
+)
+
+
+def test_partition_column_is_capped_by_max_connections():
+    options = JdbcReadOptions(
+        partition_column="id", lower_bound=1, upper_bound=1000, max_connections=8
+    )
+    assert options.spark_options(default_num_partitions=60) == {
+        "partitionColumn": "id",
+        "lowerBound": 1,
+        "upperBound": 1000,
+        "numPartitions": 8,
+    }
+
+
+def test_bounds_are_discovered_without_bounds():
+    options = JdbcReadOptions(partition_column="id", rows_per_partition=500)
+    assert options.discover_bounds
+    assert options.spark_options(default_num_partitions=60) == {
+        "partitionColumn": "id",
+        "numPartitions": 60,
+        "rowsPerPartition": 500,
+    }
+
+
+def test_predicates_are_grouped_up_to_max_connections():
+    predicates = [f"region = '{region}'" for region in "abcde"]
+    options = JdbcReadOptions(predicates=predicates, fetchsize=1000, max_connections=2)
+    assert options.spark_options() == {
+        "fetchsize": 1000,
+        "predicates": [
+            "(region = 'a') OR (region = 'c') OR (region = 'e')",
+            "(region = 'b') OR (region = 'd')",
+        ],
+    }
+
+
+def test_invalid_options_raise():
+    with pytest.raises(ValueError):
+        JdbcReadOptions(partition_column="id", predicates=["id < 10"])
+    with pytest.raises(ValueError):
+        JdbcReadOptions(partition_column="id", lower_bound=1)
+    with pytest.raises(ValueError):
+        JdbcReadOptions(partition_column="id", upper_bound=1)
+
+
+def test_movement_parameters_load_read_options():
+    parameters = RdbmsDataIngestionMovementParameters.load_from_dict(
+        {
+            "name": "table",
+            "extract_connection_id": "conn",
+            "data_partitioning": {
+                "gcs_partition_schema": "schema",
+                "destination_partition": "partition",
+            },
+            "raw_table_definition": None,
+            "extraction_query": "SELECT 1",
+            "jdbc_read_options": {"predicates": ["id < 10", "id >= 10"]},
+        }
+    )
+    assert isinstance(parameters.jdbc_read_options, JdbcReadOptions)
+
+
+def test_export_motif_passes_read_options():
+    pytest.importorskip("airflow")
+    from debussy_concert.pipeline.data_ingestion.motif.export_table import (
+        JDBC_READ_OPTIONS_FLAG,
+        jdbc_read_options_args,
+    )
+
+    options = JdbcReadOptions(partition_column="id", lower_bound=1, upper_bound=10)
+    parameters = RdbmsDataIngestionMovementParameters(
+        name="table",
+        extract_connection_id="conn",
+        data_partitioning={"gcs_partition_schema": "s", "destination_partition": "p"},
+        raw_table_definition=None,
+        extraction_query="SELECT 1",
+        jdbc_read_options=options,
+    )
+    [arg] = jdbc_read_options_args(parameters, {"parallelism": 4})
+    assert arg.startswith(JDBC_READ_OPTIONS_FLAG)
+    assert json.loads(arg[len(JDBC_READ_OPTIONS_FLAG):])["numPartitions"] == 4
@@ -0,0 +1,26 @@
+import json
+
+import pytest
+
+from debussy_concert.pipeline.data_ingestion.config.movement_parameters.rdbms_data_ingestion import (
+    OutputFiles,
+)
+
+
+def test_invalid_output_files_raise():
+    with pytest.raises(ValueError):
+        OutputFiles(target_file_size_mb=256, rows_per_file=1000)
+    with pytest.raises(ValueError):
+        OutputFiles(compression="lz4")
+
+
+def test_output_files_are_sent_to_the_script(rdbms_composition):
+    output_files = {"target_file_size_mb": 256, "compression": "zstd"}
+    dag = rdbms_composition(output_files=output_files).auto_play()
+    job = dag.get_task(
+        "DataIngestionMovement_table_00000.IngestionSourceToRawVaultStoragePhrase."
+        "DataprocExportRdbmsTableToGcsMotif.jdbc_to_raw_vault"
+    ).job["pyspark_job"]
+    flag, value = job["args"][-1].split("=", 1)
+    assert flag == "--output-files"
+    assert json.loads(value) == {"targetFileSizeMb": 256, "compression": "zstd"}
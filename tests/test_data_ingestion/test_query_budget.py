@@ -0,0 +1,144 @@
+import pytest
+
+from debussy_concert.core.config.movement_parameters.query_budget import (
+    QueryBudget,
+    parse_bytes,
+)
+
+QUERY_CONFIGURATION = {"query": {"query": "SELECT * FROM t", "useLegacySql": False}}
+
+
+class FakeBigQueryDryRunApi:
+    """Local stand-in for BigQueryHook, every dry run estimates bytes_processed"""
+
+    bytes_processed = 0
+    dry_runs = []
+
+    def __init__(self, **kwargs):
+        pass
+
+    def get_client(self):
+        return self
+
+    def query(self, query, job_config):
+        assert job_config.dry_run
+        self.dry_runs.append(query)
+
+        class Job:
+            total_bytes_processed = self.bytes_processed
+
+        return Job()
+
+
+@pytest.fixture
+def fake_dry_run_api(monkeypatch):
+    pytest.importorskip("airflow")
+    from airflow.providers.google.cloud.hooks import bigquery
+
+    monkeypatch.setattr(bigquery, "BigQueryHook", FakeBigQueryDryRunApi)
+    FakeBigQueryDryRunApi.dry_runs = []
+    return FakeBigQueryDryRunApi
+
+
+def test_parse_bytes():
+    assert parse_bytes(100) == 100
+    assert parse_bytes("10GB") == 10 * 10**9
+    assert parse_bytes("1.5 TiB") == int(1.5 * 2**40)
+    with pytest.raises(ValueError):
+        parse_bytes("10 parsecs")
+    with pytest.raises(ValueError):
+        QueryBudget(max_bytes_processed="1GB", on_exceed="ignore")
+
+
+def test_dry_run_over_budget_fails_or_warns(fake_dry_run_api):
+    from debussy_concert.core.motif.mixins.bigquery_job import dry_run_query
+
+    fake_dry_run_api.bytes_processed = 2000
+    kwargs = dict(
+        configuration=QUERY_CONFIGURATION, cache=None, gcp_conn_id=None, motif="m"
+    )
+    assert dry_run_query(max_bytes=5000, on_exceed="fail", **kwargs) == 2000
+    with pytest.raises(ValueError, match="over the budget"):
+        dry_run_query(max_bytes=1000, on_exceed="fail", **kwargs)
+    assert dry_run_query(max_bytes=1000, on_exceed="warn", **kwargs) == 2000
+
+
+def test_dry_run_estimates_cached_by_query_hash(tmp_path, fake_dry_run_api):
+    from debussy_concert.core.motif.mixins.bigquery_job import dry_run_query
+
+    fake_dry_run_api.bytes_processed = 2000
+    cache = {"type": "local", "path": str(tmp_path / "dry_runs.json")}
+    kwargs = dict(max_bytes=5000, on_exceed="fail", cache=cache, gcp_conn_id=None)
+    dry_run_query(configuration=QUERY_CONFIGURATION, motif="m", **kwargs)
+    fake_dry_run_api.bytes_processed = 3000
+    assert dry_run_query(configuration=QUERY_CONFIGURATION, motif="m", **kwargs) == 2000
+    assert len(fake_dry_run_api.dry_runs) == 1
+
+    other = {"query": {"query": "SELECT 1"}}
+    assert dry_run_query(configuration=other, motif="m", **kwargs) == 3000
+    assert len(fake_dry_run_api.dry_runs) == 2
+
+
+def test_dry_run_estimates_expire(tmp_path, fake_dry_run_api, monkeypatch):
+    from debussy_concert.core.motif.mixins import bigquery_job
+
+    now = [1000.0]
+    monkeypatch.setattr(bigquery_job.time, "time", lambda: now[0])
+    fake_dry_run_api.bytes_processed = 2000
+    cache = {"type": "local", "path": str(tmp_path / "dry_runs.json")}
+    kwargs = dict(
+        configuration=QUERY_CONFIGURATION,
+        max_bytes=5000,
+        on_exceed="fail",
+        cache=cache,
+        gcp_conn_id=None,
+        motif="m",
+        cache_ttl=60,
+    )
+    bigquery_job.dry_run_query(**kwargs)
+    # the source tables grew
+    fake_dry_run_api.bytes_processed = 3000
+    now[0] += 59
+    assert bigquery_job.dry_run_query(**kwargs) == 2000
+    now[0] += 1
+    assert bigquery_job.dry_run_query(**kwargs) == 3000
+    assert len(fake_dry_run_api.dry_runs) == 2
+
+
+def test_query_budget_dry_runs_before_export(bigquery_composition):
+    from debussy_concert.core.operators.bigquery import BigQueryInsertJobOperator
+
+    dag = bigquery_composition(
+        query_budget={"max_bytes_processed": "10GB", "on_exceed": "warn"}
+    ).auto_play()
+    dry_runs = [task for task in dag.tasks if task.task_id.endswith("_dry_run")]
+    assert len(dry_runs) == 3
+    for dry_run in dry_runs:
+        (export,) = dry_run.downstream_list
+        assert isinstance(export, BigQueryInsertJobOperator)
+        assert dry_run.op_kwargs["configuration"] == export.configuration
+        assert dry_run.op_kwargs["max_bytes"] == 10 * 10**9
+
+    dag = bigquery_composition().auto_play()
+    assert not any(task.task_id.endswith("_dry_run") for task in dag.tasks)
+
+
+def test_dry_run_waits_for_the_motifs_before_it(bigquery_composition):
+    import datetime as dt
+
+    from airflow import DAG
+    from debussy_concert.core.motif.bigquery_query_job import BigQueryQueryJobMotif
+    from debussy_concert.core.motif.motif_base import DummyMotif
+    from debussy_concert.core.phrase.phrase_base import PhraseBase
+
+    bigquery_composition(size=1)
+    query = BigQueryQueryJobMotif(
+        name="query", query_budget=QueryBudget(max_bytes_processed="10GB")
+    ).setup(sql_query="SELECT 1")
+    dag = DAG(dag_id="phrase_dag", start_date=dt.datetime(2022, 1, 1))
+    PhraseBase(name="phrase", motifs=[DummyMotif(name="before"), query]).build(
+        dag, None
+    )
+    dry_run = dag.get_task("phrase.query.query_dry_run")
+    assert dry_run.upstream_task_ids == {"phrase.before"}
+    assert dry_run.downstream_task_ids == {"phrase.query.query"}
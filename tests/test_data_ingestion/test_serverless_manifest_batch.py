@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("airflow")
+
+GROUP = "shared_dataproc_serverless"
+
+
+def test_composition_scope_submits_one_serverless_batch(rdbms_composition):
+    dag = rdbms_composition("composition", dataproc_type="serverless").auto_play()
+    batches = [
+        task.task_id
+        for task in dag.tasks
+        if task.task_id.endswith("create_dataproc_serverless")
+    ]
+    assert batches == [f"{GROUP}.create_dataproc_serverless"]
+
+    upload = dag.get_task(f"{GROUP}.upload_manifest")
+    manifest = upload.op_kwargs["manifest"]
+    assert [table["name"] for table in manifest["tables"]] == [
+        "table_00000",
+        "table_00001",
+        "table_00002",
+    ]
+    assert manifest["status_uri"].endswith("{{ ts_nodash }}.status.json")
+    assert len(upload.upstream_task_ids) == 4  # batch id and every movement start
+
+    checks = [
+        task for task in dag.tasks if task.task_id.endswith("check_extraction_status")
+    ]
+    assert len(checks) == 3
+    for check in checks:
+        assert batches[0] in check.upstream_task_ids
+        assert check.trigger_rule == "all_done"
+
+    batch = dag.get_task(batches[0]).batch
+    assert batch["pyspark_batch"]["args"] == [upload.op_kwargs["manifest_uri"]]
+    assert [
+        uri.rsplit("/", 1)[-1] for uri in batch["pyspark_batch"]["python_file_uris"]
+    ] == ["jdbc_common.py", "jdbc_to_gcs.py", "jdbc_to_gcs_hash_key.py"]
+    assert batch["runtime_config"]["properties"]["spark.scheduler.mode"] == "FAIR"
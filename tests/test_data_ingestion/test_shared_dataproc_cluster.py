@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("airflow")
+
+
+def jdbc_tasks(dag):
+    return [task for task in dag.tasks if task.task_id.endswith(".jdbc_to_raw_vault")]
+
+
+def test_composition_scope_shares_one_cluster(rdbms_composition):
+    dag = rdbms_composition("composition").auto_play()
+    create_task_id = "shared_dataproc_cluster.create_dataproc_cluster"
+    create_tasks = [
+        task.task_id
+        for task in dag.tasks
+        if task.task_id.endswith("create_dataproc_cluster")
+    ]
+    assert create_tasks == [create_task_id]
+    delete_task = dag.get_task("shared_dataproc_cluster.delete_dataproc_cluster")
+    assert delete_task.trigger_rule == "all_done"
+    jobs = jdbc_tasks(dag)
+    assert len(jobs) == 3
+    for job in jobs:
+        assert create_task_id in job.upstream_task_ids
+        assert delete_task.task_id in job.downstream_task_ids
+        cluster_name = job.job["placement"]["cluster_name"]
+        assert "shared_dataproc_cluster.cluster_name_id" in cluster_name
+
+
+def test_movement_scope_creates_a_cluster_per_movement(rdbms_composition):
+    dag = rdbms_composition("movement").auto_play()
+    create_tasks = [
+        task for task in dag.tasks if task.task_id.endswith("create_dataproc_cluster")
+    ]
+    assert len(create_tasks) == len(jdbc_tasks(dag)) == 3
@@ -0,0 +1,110 @@
+import datetime as dt
+
+import pytest
+
+QUERY_CONFIGURATION = {"query": {"query": "SELECT * FROM p.d.t"}}
+
+
+class FakeBigQueryTablesApi:
+    """Local stand-in for BigQueryHook, tables keep a last modified time"""
+
+    modified = {}
+
+    def __init__(self, **kwargs):
+        pass
+
+    def get_client(self):
+        return self
+
+    def query(self, query, job_config=None):
+        from google.cloud.bigquery import TableReference
+
+        class DryRun:
+            referenced_tables = [
+                TableReference.from_string(table) for table in self.modified
+            ]
+
+        return DryRun()
+
+    def get_table(self, table):
+        class Table:
+            modified = self.modified[str(table)]
+
+        return Table()
+
+
+@pytest.fixture
+def fake_tables_api(monkeypatch):
+    pytest.importorskip("airflow")
+    from airflow.providers.google.cloud.hooks import bigquery
+
+    monkeypatch.setattr(bigquery, "BigQueryHook", FakeBigQueryTablesApi)
+    FakeBigQueryTablesApi.modified = {"p.d.t": dt.datetime(2022, 1, 1)}
+    return FakeBigQueryTablesApi
+
+
+def test_check_query_changed(tmp_path, fake_tables_api):
+    from debussy_concert.core.motif.mixins.bigquery_job import (
+        check_query_changed,
+        save_fingerprint,
+    )
+
+    store = {"type": "local", "path": str(tmp_path / "fingerprints.json")}
+    kwargs = dict(freshness_query=None, store=store, gcp_conn_id=None, key="c/m")
+    fingerprint = check_query_changed(QUERY_CONFIGURATION, **kwargs)
+    assert fingerprint
+    save_fingerprint(store, None, "c/m", fingerprint)
+    assert check_query_changed(QUERY_CONFIGURATION, **kwargs) is None
+
+    other_query = {"query": {"query": "SELECT a FROM p.d.t"}}
+    assert check_query_changed(other_query, **kwargs)
+    fake_tables_api.modified["p.d.t"] = dt.datetime(2022, 1, 2)
+    assert check_query_changed(QUERY_CONFIGURATION, **kwargs) not in (None, fingerprint)
+
+
+def test_skip_if_unchanged_short_circuits_movement(tmp_path, bigquery_composition):
+    from airflow.operators.python import ShortCircuitOperator
+
+    store = {"type": "local", "path": str(tmp_path / "fingerprints.json")}
+    dag = bigquery_composition(
+        size=2, skip_if_unchanged={"store": store}
+    ).auto_play()
+    checks = [task for task in dag.tasks if isinstance(task, ShortCircuitOperator)]
+    assert len(checks) == 2
+    keys = {check.op_kwargs["key"] for check in checks}
+    assert len(keys) == 2
+    for check in checks:
+        (export,) = check.downstream_list
+        (save,) = [
+            task for task in export.downstream_list
+            if task.task_id.endswith("_save_fingerprint")
+        ]
+        assert check.task_id in save.op_kwargs["fingerprint"]
+        skipped = {task.task_id for task in check.get_flat_relatives(upstream=False)}
+        assert any("load" in task_id.lower() for task_id in skipped)
+
+
+def test_check_changed_waits_for_the_motifs_before_it(tmp_path, bigquery_composition):
+    from airflow import DAG
+    from debussy_concert.core.config.movement_parameters.skip_unchanged import (
+        SkipIfUnchanged,
+    )
+    from debussy_concert.core.motif.bigquery_query_job import BigQueryQueryJobMotif
+    from debussy_concert.core.motif.motif_base import DummyMotif
+    from debussy_concert.core.phrase.phrase_base import PhraseBase
+
+    bigquery_composition(size=1)
+    store = {"type": "local", "path": str(tmp_path / "fingerprints.json")}
+    query = BigQueryQueryJobMotif(
+        name="query", skip_if_unchanged=SkipIfUnchanged(store=store)
+    ).setup(sql_query="SELECT 1")
+    after = DummyMotif(name="after")
+    dag = DAG(dag_id="phrase_dag", start_date=dt.datetime(2022, 1, 1))
+    PhraseBase(
+        name="phrase", motifs=[DummyMotif(name="before"), query, after]
+    ).build(dag, None)
+    # fingerprinted only once the motifs before it wrote the sources
+    check_changed = dag.get_task("phrase.query.query_check_changed")
+    assert check_changed.upstream_task_ids == {"phrase.before"}
+    save = dag.get_task("phrase.query.query_save_fingerprint")
+    assert dag.get_task("phrase.after").upstream_task_ids == {save.task_id}
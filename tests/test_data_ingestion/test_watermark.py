@@ -0,0 +1,107 @@
+import pytest
+
+from debussy_concert.core.service.key_value.store import (
+    LocalFileKeyValueStore,
+    key_value_store_from_dict,
+)
+from debussy_concert.pipeline.data_ingestion.config.movement_parameters.rdbms_data_ingestion import (
+    RdbmsDataIngestionMovementParameters,
+)
+
+EXTRACTION_QUERY = "SELECT * FROM source WHERE last_update > '{{ watermark }}'"
+
+
+def movement_parameters(extraction_query, watermark):
+    return RdbmsDataIngestionMovementParameters(
+        name="table",
+        extract_connection_id="conn",
+        data_partitioning={"gcs_partition_schema": "s", "destination_partition": "p"},
+        raw_table_definition=None,
+        extraction_query=extraction_query,
+        watermark=watermark,
+    )
+
+
+def watermark(tmp_path):
+    return {
+        "column": "last_update",
+        "store": {"type": "local", "path": str(tmp_path / "watermarks.json")},
+        "initial_value": "1970-01-01 00:00:00",
+    }
+
+
+def test_local_file_store(tmp_path):
+    store = key_value_store_from_dict(
+        {"type": "local", "path": str(tmp_path / "w.json")}
+    )
+    assert isinstance(store, LocalFileKeyValueStore)
+    assert store.get("composition/table") is None
+    store.set("composition/table", "2022-01-01 00:00:00")
+    assert store.get("composition/table") == "2022-01-01 00:00:00"
+
+
+def test_local_file_store_concurrent_sets(tmp_path):
+    import threading
+
+    store = LocalFileKeyValueStore(str(tmp_path / "w.json"))
+
+    def set_keys(writer):
+        for index in range(20):
+            store.set(f"composition/table_{writer}_{index}", str(index))
+
+    writers = [threading.Thread(target=set_keys, args=(writer,)) for writer in range(4)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    # no set lost to a concurrent read-modify-write
+    assert len(store._load()) == 80
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_read_watermark_falls_back_to_initial_value(tmp_path):
+    pytest.importorskip("airflow")
+    from debussy_concert.pipeline.data_ingestion.motif.watermark import read_watermark
+
+    class TaskInstance:
+        xcom = {}
+
+        def xcom_push(self, key, value):
+            self.xcom[key] = value
+
+    ti = TaskInstance()
+    store = watermark(tmp_path)["store"]
+    kwargs = dict(store=store, gcp_conn_id=None, key="c/t", xcom_key="w", ti=ti)
+    assert read_watermark(initial_value="0", **kwargs) == "0"
+    key_value_store_from_dict(store).set("c/t", "10")
+    assert read_watermark(initial_value="0", **kwargs) == "10"
+    assert ti.xcom == {"w": "10"}
+
+
+def test_watermark_is_injected_in_extraction_query(tmp_path):
+    parameters = movement_parameters(EXTRACTION_QUERY, watermark(tmp_path))
+    assert parameters.extraction_query == (
+        "SELECT * FROM source WHERE last_update > "
+        "'{{ ti.xcom_pull(key='watermark__table') }}'"
+    )
+    with pytest.raises(ValueError):
+        movement_parameters("SELECT * FROM source", watermark(tmp_path))
+
+
+def test_watermark_phrases_wrap_extraction_and_load(tmp_path, rdbms_composition):
+    composition = rdbms_composition(
+        extraction_query=EXTRACTION_QUERY, watermark=watermark(tmp_path)
+    )
+    dag = composition.auto_play()
+    movement = "DataIngestionMovement_table_00000"
+    read = dag.get_task(f"{movement}.ReadWatermarkPhrase.read_watermark")
+    advance = dag.get_task(f"{movement}.AdvanceWatermarkPhrase.advance_watermark")
+    extraction = f"{movement}.IngestionSourceToRawVaultStoragePhrase"
+    load = f"{movement}.RawVaultStorageLoadToDataWarehouseRawPhrase"
+    assert all(task_id.startswith(extraction) for task_id in read.downstream_task_ids)
+    assert all(task_id.startswith(load) for task_id in advance.upstream_task_ids)
+    assert advance.op_kwargs["key"] == "benchmark_rdbms_ingestion_3/table_00000"
+    assert advance.op_kwargs["max_value_query"] == (
+        "SELECT FORMAT_TIMESTAMP('%Y-%m-%d %H:%M:%E6S', MAX(last_update))"
+        " AS watermark FROM `benchmark-project.raw.mysql_benchmark_table_00000`"
+    )
@@ -0,0 +1,79 @@
+import re
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("airflow")
+
+# every dag file imports the workflow service, so the airflow core is already paid for
+PRELOADED_MODULE = "debussy_concert.core.service.workflow.airflow"
+IMPORT_TIME_BUDGET_SECONDS = 0.5
+# only imported when a motif that needs them is built
+PROVIDER_MODULES = [
+    "airflow.providers.google.cloud.operators.bigquery",
+    "airflow.providers.google.cloud.operators.dataproc",
+    "airflow.providers.amazon",
+    "google.cloud.bigquery",
+    "google.protobuf",
+    "airflow_dbt",
+    "pandas",
+    "paramiko",
+]
+COMPOSITION_MODULES = [
+    "debussy_concert.pipeline.data_ingestion.composition.bigquery_ingestion",
+    "debussy_concert.pipeline.data_ingestion.composition.rdbms_ingestion",
+    "debussy_concert.pipeline.reverse_etl.composition.bigquery_to_mysql",
+    "debussy_concert.pipeline.reverse_etl.composition.bigquery_to_rdbms",
+    "debussy_concert.pipeline.reverse_etl.composition.bigquery_to_storage",
+    "debussy_concert.pipeline.data_transformation.composition.dbt_transformation",
+]
+IMPORT_TIME_REGEXP = re.compile(
+    r"^import time:\s+\d+ \|\s+(?P<cumulative>\d+) \|(?P<indent> +)(?P<module>\S+)$"
+)
+
+
+def import_time(module):
+    """Returns the imported modules and the cumulative seconds spent importing module"""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import {PRELOADED_MODULE}; import {module}",
+        ],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    imported_modules = []
+    top_level_imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_REGEXP.match(line)
+        if match is None:
+            continue
+        imported_modules.append(match.group("module"))
+        if len(match.group("indent")) == 1:
+            top_level_imports.append(
+                (match.group("module"), int(match.group("cumulative")))
+            )
+    names = [name for name, _ in top_level_imports]
+    after_preloaded = top_level_imports[names.index(PRELOADED_MODULE) + 1:]
+    seconds = sum(cumulative for _, cumulative in after_preloaded) / 1e6
+    return imported_modules, seconds
+
+
+@pytest.mark.parametrize("module", COMPOSITION_MODULES)
+def test_composition_import_time(module):
+    imported_modules, seconds = import_time(module)
+    imported_providers = [
+        name
+        for name in imported_modules
+        if any(
+            name == provider or name.startswith(provider + ".")
+            for provider in PROVIDER_MODULES
+        )
+    ]
+    assert imported_providers == []
+    assert seconds < IMPORT_TIME_BUDGET_SECONDS
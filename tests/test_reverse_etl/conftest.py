@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.fixture
+def reverse_etl_composition(synthetic_composition):
+    """Creates a synthetic reverse etl composition, to storage by default"""
+
+    def create(size=2, composition_cls=None, **movement_parameters):
+        from debussy_concert.pipeline.reverse_etl.composition.bigquery_to_storage import (
+            ReverseEtlBigQueryToStorageComposition,
+        )
+
+        composition_cls = composition_cls or ReverseEtlBigQueryToStorageComposition
+
+        def update_fn(composition):
+            for parameters in composition["extraction_movements"]:
+                parameters.update(movement_parameters)
+
+        synthetic_composition("reverse_etl", size, update_fn)
+        return composition_cls()
+
+    return create
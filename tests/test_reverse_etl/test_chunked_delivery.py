@@ -0,0 +1,18 @@
+from debussy_concert.core.service.storage.transfer import chunked_transfer
+
+
+def test_chunked_transfer_delivery(reverse_etl_composition):
+    composition = reverse_etl_composition(
+        chunked_transfer={"chunk_size": "8MiB", "parallelism": 2}
+    )
+    dag = composition.play(composition.bigquery_to_storage_reverse_etl_movement_builder)
+    transfers = [
+        task
+        for task in dag.tasks
+        if getattr(task, "python_callable", None) is chunked_transfer
+    ]
+    assert len(transfers) == 2
+    for transfer in transfers:
+        assert transfer.op_kwargs["origin_uri"].startswith("gs://")
+        assert transfer.op_kwargs["chunk_size"] == 8 * 2**20
+        assert transfer.op_kwargs["parallelism"] == 2
@@ -0,0 +1,58 @@
+import pytest
+
+from debussy_concert.pipeline.reverse_etl.config.movement_parameters.reverse_etl import (
+    AvroFile,
+    JsonFile,
+    ParquetFile,
+    output_factory,
+)
+
+
+def test_output_factory_formats():
+    parquet = output_factory(
+        {"format": "parquet", "file_name": "x.parquet", "compression": "ZSTD"}
+    )
+    assert isinstance(parquet, ParquetFile)
+    assert parquet.extract_options() == {
+        "destination_format": "PARQUET",
+        "compression": "ZSTD",
+    }
+    avro = output_factory({"format": "avro", "file_name": "x.avro"})
+    assert isinstance(avro, AvroFile)
+    assert avro.extract_options()["use_avro_logical_types"] is True
+    json = output_factory({"format": "json", "file_name": "x.json", "compression": "GZIP"})
+    assert isinstance(json, JsonFile)
+    with pytest.raises(ValueError):
+        output_factory({"format": "avro", "file_name": "x.avro", "compression": "ZSTD"})
+
+
+def test_parquet_extract_job(reverse_etl_composition):
+    from debussy_concert.core.operators.bigquery import BigQueryInsertJobOperator
+
+    composition = reverse_etl_composition(
+        output_config={
+            "format": "parquet",
+            "file_name": "x.parquet",
+            "compression": "ZSTD",
+        }
+    )
+    dag = composition.play(composition.bigquery_to_storage_reverse_etl_movement_builder)
+    extracts = [
+        task.configuration["extract"]
+        for task in dag.tasks
+        if isinstance(task, BigQueryInsertJobOperator)
+        and "extract" in task.configuration
+    ]
+    assert len(extracts) == 2
+    for extract in extracts:
+        assert extract["destinationFormat"] == "PARQUET"
+        assert extract["compression"] == "ZSTD"
+        assert "printHeader" not in extract
+        assert "fieldDelimiter" not in extract
+
+    composition = reverse_etl_composition(
+        single_pass=True,
+        output_config={"format": "parquet", "file_name": "x.parquet"},
+    )
+    with pytest.raises(ValueError):
+        composition.play(composition.bigquery_to_storage_reverse_etl_movement_builder)
@@ -0,0 +1,58 @@
+import pytest
+
+from debussy_concert.core.service.rdbms.bulk_load import bulk_load_csv
+from debussy_concert.core.service.rdbms.parallel_load import parallel_bulk_load_csv
+from debussy_concert.pipeline.reverse_etl.composition.bigquery_to_rdbms import (
+    BigQueryToMssql,
+    BigQueryToPostgresql,
+)
+
+CSV_OUTPUT = {"format": "csv", "file_name": "x.csv", "print_header": True}
+
+
+def bulk_loads(composition):
+    dag = composition.play(
+        composition.bigquery_to_storage_reverse_etl_to_rdbms_movement_builder
+    )
+    return [
+        task
+        for task in dag.tasks
+        if getattr(task, "python_callable", None)
+        in (bulk_load_csv, parallel_bulk_load_csv)
+    ]
+
+
+@pytest.mark.parametrize(
+    "composition_cls, batch_size",
+    [(BigQueryToPostgresql, 50000), (BigQueryToMssql, 4000)],
+)
+def test_rdbms_destination_bulk_load(
+    reverse_etl_composition, composition_cls, batch_size
+):
+    composition = reverse_etl_composition(
+        composition_cls=composition_cls,
+        output_config=CSV_OUTPUT,
+        destination_uri="dbo.audience",
+        write_mode="upsert",
+        merge_key=["id"],
+    )
+    tasks = bulk_loads(composition)
+    assert len(tasks) == 2
+    for task in tasks:
+        assert task.python_callable is bulk_load_csv
+        assert task.op_kwargs["dialect"] == composition_cls.dialect
+        assert task.op_kwargs["batch_size"] == batch_size
+        assert task.op_kwargs["write_mode"] == "upsert"
+
+
+def test_sharded_extract_loads_in_parallel(reverse_etl_composition):
+    composition = reverse_etl_composition(
+        composition_cls=BigQueryToMssql,
+        output_config={**CSV_OUTPUT, "sharded": True},
+        destination_uri="dbo.audience",
+        bulk_load={"parallel_connections": 4},
+    )
+    for task in bulk_loads(composition):
+        assert task.python_callable is parallel_bulk_load_csv
+        assert task.op_kwargs["storage_uri"].endswith("/x.csv.shards/")
+        assert task.op_kwargs["parallel_connections"] == 4
@@ -0,0 +1,155 @@
+import threading
+import time
+
+import pytest
+
+from debussy_concert.pipeline.reverse_etl.config.movement_parameters.reverse_etl import (
+    output_factory,
+)
+
+
+def build(composition):
+    return composition.play(
+        composition.bigquery_to_storage_reverse_etl_movement_builder
+    )
+
+
+def extract_jobs(dag):
+    from debussy_concert.core.operators.bigquery import BigQueryInsertJobOperator
+
+    return [
+        task
+        for task in dag.tasks
+        if isinstance(task, BigQueryInsertJobOperator)
+        and "extract" in task.configuration
+    ]
+
+
+def test_sharded_extract_is_delivered_in_parallel(reverse_etl_composition):
+    from debussy_concert.core.operators.storage import ParallelStorageToStorageOperator
+
+    dag = build(
+        reverse_etl_composition(
+            output_config={
+                "format": "csv",
+                "file_name": "x.csv.gz",
+                "compression": "GZIP",
+                "sharded": True,
+                "max_parallel_transfers": 4,
+            }
+        )
+    )
+    jobs = extract_jobs(dag)
+    assert len(jobs) == 2
+    for job in jobs:
+        (destination_uri,) = job.configuration["extract"]["destinationUris"]
+        assert destination_uri.endswith("/x.csv.gz.shards/part-*.csv.gz")
+        (clear_shards,) = job.upstream_list
+        assert "_clear_shards" in clear_shards.task_id
+        # the motif is entered by clearing the shards, after the temp table query
+        (query,) = clear_shards.upstream_list
+        assert "query" in query.configuration
+        shards_folder = destination_uri[: -len("part-*.csv.gz")]
+        assert clear_shards.op_kwargs["uri_prefix"] == shards_folder
+    transfers = [
+        task for task in dag.tasks if isinstance(task, ParallelStorageToStorageOperator)
+    ]
+    assert len(transfers) == 2
+    for transfer in transfers:
+        assert transfer.origin_file_uri.endswith("/x.csv.gz.shards/")
+        assert transfer.max_parallel_transfers == 4
+
+
+def test_composed_extract_is_delivered_as_one_file(reverse_etl_composition):
+    from debussy_concert.core.operators.storage import ParallelStorageToStorageOperator
+
+    dag = build(
+        reverse_etl_composition(
+            output_config={
+                "format": "csv",
+                "file_name": "x.csv",
+                "sharded": True,
+                "compose": True,
+            }
+        )
+    )
+    for job in extract_jobs(dag):
+        assert job.configuration["extract"]["printHeader"] is False
+        (compose,) = job.downstream_list
+        assert compose.task_id.endswith("gcs_compose_shards_motif")
+        assert compose.op_kwargs["header_query"].startswith("SELECT * FROM `")
+        assert compose.op_kwargs["destination_uri"].endswith("/x.csv")
+        assert compose.op_kwargs["shards_uri_prefix"].endswith("/x.csv.shards/")
+    assert not any(
+        isinstance(task, ParallelStorageToStorageOperator) for task in dag.tasks
+    )
+
+
+def test_compose_requires_concatenable_shards():
+    with pytest.raises(ValueError):
+        output_factory(
+            {"format": "parquet", "file_name": "x", "sharded": True, "compose": True}
+        )
+    with pytest.raises(ValueError):
+        output_factory({"format": "csv", "file_name": "x", "compose": True})
+    with pytest.raises(ValueError):
+        output_factory(
+            {
+                "format": "csv",
+                "file_name": "x",
+                "compression": "GZIP",
+                "sharded": True,
+                "compose": True,
+            }
+        )
+
+
+class FakeStorageHook:
+    def __init__(self, files=()):
+        self.files = {name: f"{name} data" for name in files}
+        self.uploaded = {}
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def basename(self, uri):
+        return uri.rsplit("/", 1)[-1]
+
+    def list_dir(self, uri):
+        return list(self.files)
+
+    def download_file(self, remote_file_uri, local_file_uri):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.01)
+        with open(local_file_uri, "w") as f:
+            f.write(self.files[self.basename(remote_file_uri)])
+        with self.lock:
+            self.running -= 1
+
+    def upload_file(self, remote_file_uri, local_file_uri):
+        with open(local_file_uri) as f:
+            self.uploaded[remote_file_uri] = f.read()
+
+
+def test_parallel_storage_to_storage_operator(tmp_path):
+    pytest.importorskip("airflow")
+    from debussy_concert.core.operators.storage import ParallelStorageToStorageOperator
+
+    shards = [f"part-{index:012}.csv" for index in range(20)]
+    origin, destination = FakeStorageHook(shards), FakeStorageHook()
+    operator = ParallelStorageToStorageOperator(
+        task_id="transfer",
+        max_parallel_transfers=3,
+        origin_storage_hook=origin,
+        origin_file_uri="gs://b/x.csv.shards/",
+        destination_storage_hook=destination,
+        destination_file_uri="gs://d/x/",
+        temp_folder=str(tmp_path),
+    )
+    operator.execute({})
+    assert destination.uploaded == {
+        f"gs://d/x/{shard}": f"{shard} data" for shard in shards
+    }
+    assert 1 < origin.max_running <= 3
@@ -0,0 +1,96 @@
+import pytest
+
+
+def build(composition):
+    return composition.play(
+        composition.bigquery_to_storage_reverse_etl_movement_builder
+    )
+
+
+def test_single_pass_exports_without_temp_table(reverse_etl_composition):
+    from debussy_concert.core.operators.bigquery import BigQueryInsertJobOperator
+
+    dag = build(reverse_etl_composition(single_pass=True))
+    jobs = [task for task in dag.tasks if isinstance(task, BigQueryInsertJobOperator)]
+    assert len(jobs) == 2
+    for job in jobs:
+        script = job.configuration["query"]["query"]
+        assert "temp" not in script
+        assert script.count("INSERT INTO `benchmark-project.reverse_etl.") == 1
+        assert "PARTITION BY TIMESTAMP_TRUNC(_logical_ts, DAY)" in script
+        assert "EXPORT DATA OPTIONS" in script
+        # a retried script replaces the rows of its earlier try
+        table = script.split("`")[1]
+        statements = script.split(";\n")
+        assert statements[1:5] == [
+            "BEGIN TRANSACTION",
+            f"DELETE FROM `{table}` WHERE _logical_ts IN (SELECT DISTINCT _logical_ts"
+            f" FROM ({statements[3].split('` ', 1)[1]}))",
+            statements[3],
+            "COMMIT TRANSACTION",
+        ]
+        assert statements[3].startswith(f"INSERT INTO `{table}` ")
+        (clear_shards,) = job.upstream_list
+        assert clear_shards.task_id.endswith("_clear_shards")
+        assert clear_shards.upstream_list
+        assert clear_shards.op_kwargs["uri_prefix"].endswith(".csv.shards/")
+        (compose,) = job.downstream_list
+        assert compose.task_id.endswith("_compose")
+        (destination,) = compose.downstream_list
+        assert destination.task_id.endswith("gcs_to_gcs_motif")
+        assert compose.op_kwargs["shards_uri_prefix"].startswith(
+            compose.op_kwargs["destination_uri"]
+        )
+
+    dag = build(reverse_etl_composition())
+    jobs = [task for task in dag.tasks if isinstance(task, BigQueryInsertJobOperator)]
+    assert len(jobs) == 6
+
+
+class FakeGcsApi:
+    objects = {}
+    composed = []
+
+    def __init__(self, **kwargs):
+        pass
+
+    def list(self, bucket, prefix):
+        return [name for name in self.objects if name.startswith(prefix)]
+
+    def upload(self, bucket, object_name, data):
+        self.objects[object_name] = data
+
+    def compose(self, bucket, source_objects, destination_object):
+        self.composed.append(list(source_objects))
+        data = "".join(self.objects[name] for name in source_objects)
+        self.objects[destination_object] = data
+
+    def rewrite(self, source_bucket, source_object, destination_bucket, destination):
+        self.objects[destination] = self.objects[source_object]
+
+    def delete(self, bucket, object_name):
+        del self.objects[object_name]
+
+
+def test_compose_export_shards(monkeypatch):
+    pytest.importorskip("airflow")
+    from airflow.providers.google.cloud.hooks import gcs
+    from debussy_concert.pipeline.reverse_etl.motif.bigquery_export_data import (
+        compose_export_shards,
+    )
+
+    monkeypatch.setattr(gcs, "GCSHook", FakeGcsApi)
+    shards = {f"out.csv.shards/{index:012}.csv": f"{index}\n" for index in range(40)}
+    FakeGcsApi.objects = dict(shards)
+    compose_export_shards(
+        "gs://b/out.csv.shards/", "gs://b/out.csv", None, ",", None
+    )
+    composed = "".join(f"{index}\n" for index in range(40))
+    assert FakeGcsApi.objects == {**shards, "out.csv": composed}
+    assert all(len(sources) <= 32 for sources in FakeGcsApi.composed)
+
+    # a retry composes the same file from the kept shards
+    compose_export_shards(
+        "gs://b/out.csv.shards/", "gs://b/out.csv", None, ",", None
+    )
+    assert FakeGcsApi.objects == {**shards, "out.csv": composed}
@@ -0,0 +1,102 @@
+import pytest
+
+from debussy_concert.core.config.movement_parameters.snapshot_diff import SnapshotDiff
+from debussy_concert.core.service.rdbms.bulk_load import bulk_delete_csv
+from debussy_concert.pipeline.reverse_etl.composition.bigquery_to_rdbms import (
+    BigQueryToPostgresql,
+)
+from debussy_concert.pipeline.reverse_etl.motif.bigquery_snapshot_diff import (
+    BigQuerySnapshotDiffMotif,
+)
+
+
+def tasks_by_motif(dag):
+    return {task.task_id.rpartition(".")[2]: task for task in dag.tasks}
+
+
+def test_tombstone_uri():
+    snapshot_diff = SnapshotDiff(key=["id"])
+    assert snapshot_diff.tombstone_uri("gs://bucket/dir/x.csv.gz") == (
+        "gs://bucket/dir/x.tombstones.csv.gz"
+    )
+    assert snapshot_diff.tombstone_uri("x") == "x.tombstones"
+
+
+def test_snapshot_diff_script(inject_testing):
+    motif = BigQuerySnapshotDiffMotif(key=["id", "day"]).setup(
+        "p.d.current", "p.d.delta", "p.d.tombstones", "p.d.snapshot", "p.d.pending"
+    )
+    assert motif.script == (
+        "CREATE TEMP TABLE current_rows AS SELECT current_row.*, "
+        "FARM_FINGERPRINT(TO_JSON_STRING(STRUCT(`id`, `day`))) AS _key_hash, "
+        "FARM_FINGERPRINT(TO_JSON_STRING(current_row)) AS _row_hash "
+        "FROM `p.d.current` AS current_row;\n"
+        "CREATE TABLE IF NOT EXISTS `p.d.snapshot` AS "
+        "SELECT `id`, `day`, _key_hash, _row_hash FROM current_rows LIMIT 0;\n"
+        "CREATE OR REPLACE TABLE `p.d.delta` AS "
+        "SELECT current_rows.* EXCEPT (_key_hash, _row_hash) FROM current_rows "
+        "JOIN (SELECT _key_hash, _row_hash FROM current_rows EXCEPT DISTINCT "
+        "SELECT _key_hash, _row_hash FROM `p.d.snapshot`) "
+        "USING (_key_hash, _row_hash);\n"
+        "CREATE OR REPLACE TABLE `p.d.tombstones` AS "
+        "SELECT `id`, `day` FROM `p.d.snapshot` "
+        "JOIN (SELECT _key_hash FROM `p.d.snapshot` EXCEPT DISTINCT "
+        "SELECT _key_hash FROM current_rows) USING (_key_hash);\n"
+        "CREATE OR REPLACE TABLE `p.d.pending` AS "
+        "SELECT `id`, `day`, _key_hash, _row_hash FROM current_rows;"
+    )
+
+
+def test_snapshot_diff_delivers_the_delta(reverse_etl_composition):
+    composition = reverse_etl_composition(size=1, snapshot_diff={"key": ["id"]})
+    tasks = tasks_by_motif(
+        composition.play(composition.bigquery_to_storage_reverse_etl_movement_builder)
+    )
+    script = tasks["bq_snapshot_diff_motif"].configuration["query"]["query"]
+    assert "EXCEPT DISTINCT" in script
+    export = tasks["bq_export_temp_table_to_gcs_motif"].configuration["extract"]
+    assert export["sourceTable"]["tableId"].endswith("_delta")
+    tombstones = tasks["bq_export_tombstones_to_gcs_motif"].configuration["extract"]
+    assert tombstones["sourceTable"]["tableId"].endswith("_tombstones")
+    (tombstones_uri,) = tombstones["destinationUris"]
+    assert tombstones_uri.endswith("/table_00000.tombstones.csv")
+    assert tasks["gcs_tombstones_to_gcs_motif"].destination_file_uri == (
+        "gs://benchmark-destination/table_00000.tombstones.csv"
+    )
+    # the snapshot is only replaced once the delta was delivered
+    promote = tasks["bq_promote_snapshot_motif"]
+    assert promote.upstream_list == [tasks["gcs_tombstones_to_gcs_motif"]]
+    assert promote.configuration["query"]["query"].startswith(
+        "CREATE OR REPLACE TABLE `benchmark-project.reverse_etl."
+    )
+
+
+def test_snapshot_diff_deletes_rdbms_tombstones(reverse_etl_composition):
+    composition = reverse_etl_composition(
+        size=1,
+        composition_cls=BigQueryToPostgresql,
+        destination_uri="public.audience",
+        snapshot_diff={"key": ["id"]},
+        write_mode="upsert",
+        merge_key=["id"],
+    )
+    tasks = tasks_by_motif(
+        composition.play(
+            composition.bigquery_to_storage_reverse_etl_to_rdbms_movement_builder
+        )
+    )
+    delete = tasks["file_storage_tombstones_delete_from_rdbms_motif"]
+    assert delete.python_callable is bulk_delete_csv
+    assert delete.op_kwargs["key"] == ["id"]
+    assert delete.op_kwargs["storage_file_uri"].endswith(".tombstones.csv")
+    assert delete.upstream_list == [tasks["file_storage_bulk_load_to_rdbms_motif"]]
+
+    with pytest.raises(ValueError):
+        composition = reverse_etl_composition(
+            size=1,
+            composition_cls=BigQueryToPostgresql,
+            snapshot_diff={"key": ["id"]},
+        )
+        composition.play(
+            composition.bigquery_to_storage_reverse_etl_to_rdbms_movement_builder
+        )